@@ -0,0 +1,49 @@
+"""
+双向搜索基准：不同地图尺寸下，单向与双向 focal 搜索的扩展节点数、耗时与路径次优比。
+
+每个 (布局, 尺寸, w) 配置在 --seeds 个场景上求和；起终点位于地图两端（scenarios.make_scenario），即长距离查询。
+
+用法（在仓库根目录）：
+    python -m benchmarks.bench_bidirectional --sizes 50 100 200 --w 0.2 1.2
+"""
+import argparse
+import time
+
+from focal_search import FocalSearch
+from scenarios import make_scenario, shortest_path_length
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[50, 100, 200])
+    parser.add_argument("--density", type=float, default=0.2)
+    parser.add_argument("--layouts", nargs="+", default=["uniform", "clustered"], choices=["uniform", "clustered"])
+    parser.add_argument("--w", type=float, nargs="+", default=[0.2, 1.2])
+    parser.add_argument("--seeds", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'布局':>10}{'地图':>6}{'w':>6}{'方式':>6}{'扩展':>10}{'相对单向':>10}{'耗时(s)':>10}{'次优比':>8}")
+    for layout in args.layouts:
+        for size in args.sizes:
+            scenarios = [make_scenario(size, args.density, layout, seed) for seed in range(args.seeds)]
+            optimal = [shortest_path_length(s.grid_map, s.start, s.goal) for s in scenarios]
+            for w in args.w:
+                baseline = None
+                for bidirectional in (False, True):
+                    expansions, elapsed, ratio = 0, 0.0, 0.0
+                    for scenario, opt in zip(scenarios, optimal):
+                        planner = FocalSearch(scenario.grid_map, w, bidirectional=bidirectional)
+                        t0 = time.perf_counter()
+                        path, n = planner._search(scenario.start, scenario.goal)
+                        elapsed += time.perf_counter() - t0
+                        expansions += n
+                        ratio += (len(path) - 1) / opt if opt else 1.0
+                    baseline = baseline or expansions
+                    print(
+                        f"{layout:>10}{size:>6}{w:>6g}{'双向' if bidirectional else '单向':>6}{expansions:>10}"
+                        f"{expansions / baseline:>10.1%}{elapsed:>10.3f}{ratio / len(scenarios):>8.3f}"
+                    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+"""
+结果缓存基准：模拟车队在少数固定站点（停靠点、货架）之间往返的查询流，对比开启 / 关闭 PathCache 的总耗时。
+
+用法（在仓库根目录）：
+    python -m benchmarks.bench_cache --size 100 --stations 8 --queries 500
+"""
+import argparse
+import random
+import time
+
+from focal_search import FocalSearch
+from path_cache import PathCache
+from scenarios import make_scenario
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size", type=int, default=100)
+    parser.add_argument("--density", type=float, default=0.2)
+    parser.add_argument("--stations", type=int, default=8)
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--candidates", type=int, default=0, help="大于 0 时改测 generate_candidate_paths（固定 seed）")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    grid_map = make_scenario(args.size, args.density, seed=args.seed).grid_map
+    rng = random.Random(args.seed)
+    free = [(x, y) for y in range(args.size) for x in range(args.size) if grid_map.is_valid(x, y)]
+    stations = rng.sample(free, args.stations)
+    queries = [tuple(rng.sample(stations, 2)) for _ in range(args.queries)]
+
+    print(f"{'缓存':>6}{'耗时(s)':>10}{'查询/s':>10}{'命中率':>8}{'条目':>6}{'占用(KiB)':>11}")
+    for cached in (False, True):
+        planner = FocalSearch(grid_map)
+        planner.cache = PathCache() if cached else None
+        t0 = time.perf_counter()
+        for start, goal in queries:
+            if args.candidates:
+                planner.generate_candidate_paths(start, goal, args.candidates, 4 * args.candidates, 0.0, 3.0, seed=1)
+            else:
+                planner.search_once(start, goal)
+        elapsed = time.perf_counter() - t0
+        cache = planner.cache
+        print(
+            f"{'开' if cached else '关':>6}{elapsed:>10.3f}{len(queries) / elapsed:>10.1f}"
+            f"{cache.hit_rate if cache else 0.0:>8.1%}{len(cache) if cache else 0:>6}"
+            f"{(cache.nbytes if cache else 0) / 1024:>11.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
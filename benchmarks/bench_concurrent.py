@@ -0,0 +1,54 @@
+"""
+并发基准：一个 FocalSearch 实例被多个线程共享时的吞吐扩展性。
+
+在带 GIL 的 CPython 上纯 Python 搜索无法并行，线程数增加基本不会提升吞吐；
+在自由线程（free-threaded）构建上才能看到随线程数增长的扩展。
+
+用法（在仓库根目录）：
+    python -m benchmarks.bench_concurrent --size 60 --queries 200 --threads 1 2 4 8
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+from env import GridMap
+from focal_search import FocalSearch
+from obsracle_generate import ObstacleGenerator
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size", type=int, default=60)
+    parser.add_argument("--density", type=float, default=0.1)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--w", type=float, default=0.5)
+    parser.add_argument("--threads", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    generator = ObstacleGenerator(args.size, args.size, (0, 0), (args.size - 1, args.size - 1))
+    grid_map = GridMap.from_obstacle_generator(generator, "density", args.density, seed=args.seed)
+    rng = random.Random(args.seed)
+    free = [(x, y) for y in range(grid_map.height) for x in range(grid_map.width) if grid_map.is_valid(x, y)]
+    queries = [(rng.choice(free), rng.choice(free)) for _ in range(args.queries)]
+
+    planner = FocalSearch(grid_map, args.w)
+    expected = [planner.search_once(s, g) for s, g in queries]
+
+    gil = getattr(sys, "_is_gil_enabled", lambda: True)()
+    print(f"地图 {args.size}x{args.size}，查询 {len(queries)} 个，CPU {os.cpu_count()}，GIL {'开启' if gil else '关闭'}")
+    print(f"{'线程数':>6}{'总耗时(s)':>12}{'查询/秒':>12}{'加速比':>10}")
+    baseline = None
+    for threads in args.threads:
+        t0 = time.perf_counter()
+        results = planner.search_concurrent(queries, max_workers=threads)
+        elapsed = time.perf_counter() - t0
+        assert [r.path for r in results] == expected, "并发结果与顺序结果不一致"
+        baseline = baseline or elapsed
+        print(f"{threads:>6}{elapsed:>12.3f}{len(queries) / elapsed:>12.1f}{baseline / elapsed:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""
+启发式基准：聚类地图上 曼哈顿距离 / 地标（ALT）下界 / 终点精确距离表 三种启发式的扩展节点数与耗时对比。
+
+每个 (尺寸, w) 配置在 --seeds 个聚类场景上求和；“建表”列为地标表与终点表的预计算耗时（每张图一次）。
+
+用法（在仓库根目录）：
+    python -m benchmarks.bench_heuristics --sizes 50 100 --density 0.3 --w 0 0.2 1.2
+"""
+import argparse
+import time
+
+from focal_search import FocalSearch
+from heuristics import HeuristicTables
+from scenarios import make_scenario
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[50, 100])
+    parser.add_argument("--density", type=float, default=0.3)
+    parser.add_argument("--w", type=float, nargs="+", default=[0.0, 0.2, 1.2])
+    parser.add_argument("--landmarks", type=int, default=8)
+    parser.add_argument("--seeds", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'地图':>6}{'w':>6}{'启发式':>12}{'扩展':>10}{'相对曼哈顿':>12}{'搜索(s)':>10}{'建表(s)':>10}")
+    for size in args.sizes:
+        scenarios = [make_scenario(size, args.density, "clustered", seed) for seed in range(args.seeds)]
+        tables = {"manhattan": [None] * len(scenarios), "landmarks": [], "exact": []}
+        build_time = {"manhattan": 0.0, "landmarks": 0.0, "exact": 0.0}
+        for scenario in scenarios:
+            t0 = time.perf_counter()
+            tables["landmarks"].append(HeuristicTables.build(scenario.grid_map, args.landmarks))
+            t1 = time.perf_counter()
+            tables["exact"].append(HeuristicTables(scenario.grid_map, goals=[scenario.goal]))
+            build_time["landmarks"] += t1 - t0
+            build_time["exact"] += time.perf_counter() - t1
+
+        for w in args.w:
+            baseline = None
+            for kind in ("manhattan", "landmarks", "exact"):
+                expansions, elapsed = 0, 0.0
+                for scenario, kind_tables in zip(scenarios, tables[kind]):
+                    scenario.grid_map.heuristic_tables = kind_tables  # 规划器从地图上取缓存的表
+                    planner = FocalSearch(scenario.grid_map, w, "manhattan" if kind_tables is None else "landmarks")
+                    t0 = time.perf_counter()
+                    _, n = planner._search(scenario.start, scenario.goal)
+                    elapsed += time.perf_counter() - t0
+                    expansions += n
+                baseline = baseline or expansions
+                print(
+                    f"{size:>6}{w:>6g}{kind:>12}{expansions:>10}{expansions / baseline:>12.1%}"
+                    f"{elapsed:>10.3f}{build_time[kind]:>10.3f}"
+                )
+
+
+if __name__ == "__main__":
+    main()
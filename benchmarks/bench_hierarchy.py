@@ -0,0 +1,82 @@
+"""
+分层规划基准：大地图上 HierarchicalPlanner（抽象层 focal 搜索 + 细化）与逐格 FocalSearch 的查询耗时、扩展数与路径长度，
+以及抽象图的构建耗时、局部障碍物变化后的增量重建耗时。
+
+每个 (尺寸, 簇边长) 配置在一个均匀随机场景上测 --queries 个随机起终点；逐格搜索只在不超过 --flat-max 的地图上运行。
+
+用法（在仓库根目录）：
+    python -m benchmarks.bench_hierarchy --sizes 256 512 1024 --clusters 16 32 --w 0 1.2
+"""
+import argparse
+import random
+import time
+
+from focal_search import FocalSearch
+from hierarchy import HierarchicalPlanner
+from scenarios import make_scenario
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[256, 512, 1024])
+    parser.add_argument("--clusters", type=int, nargs="+", default=[16, 32])
+    parser.add_argument("--density", type=float, default=0.2)
+    parser.add_argument("--w", type=float, nargs="+", default=[0.0, 1.2])
+    parser.add_argument("--queries", type=int, default=5)
+    parser.add_argument("--flat-max", type=int, default=512)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    print(f"{'地图':>6}{'簇':>4}{'节点':>8}{'建表(s)':>9}{'增量(s)':>9}{'w':>5}"
+          f"{'分层扩展':>10}{'分层(s)':>9}{'逐格扩展':>10}{'逐格(s)':>9}{'长度比':>8}")
+    for size in args.sizes:
+        scenario = make_scenario(size, args.density, "uniform", args.seed)
+        grid_map = scenario.grid_map
+        rng = random.Random(args.seed)
+        free = [(x, y) for y in range(size) for x in range(size) if grid_map.is_valid(x, y)]
+        queries = [(scenario.start, scenario.goal)] + [tuple(rng.sample(free, 2)) for _ in range(args.queries - 1)]
+        flat_results = {}
+        for cluster_size in args.clusters:
+            planner = HierarchicalPlanner(grid_map, cluster_size)
+            # 增量重建：在地图中部放一小块障碍物，再移除
+            block = [(size // 2 + dx, size // 2 + dy) for dx in range(3) for dy in range(3)]
+            t0 = time.perf_counter()
+            grid_map.add_obstacles(block)
+            planner.update()
+            grid_map.remove_obstacles(block)
+            planner.update()
+            update_time = (time.perf_counter() - t0) / 2
+            for w in args.w:
+                expansions, elapsed, length = 0, 0.0, 0
+                for start, goal in queries:
+                    t0 = time.perf_counter()
+                    waypoints, n = planner.abstract_path(start, goal, w)
+                    path = planner.refine(waypoints)
+                    elapsed += time.perf_counter() - t0
+                    expansions += n
+                    length += len(path) - 1
+                flat = "-"
+                if size <= args.flat_max:
+                    if w not in flat_results:
+                        flat_planner = FocalSearch(grid_map, w)
+                        fe, ft, fl = 0, 0.0, 0
+                        for start, goal in queries:
+                            t0 = time.perf_counter()
+                            path, n = flat_planner._search(start, goal)
+                            ft += time.perf_counter() - t0
+                            fe += n
+                            fl += len(path) - 1
+                        flat_results[w] = (fe, ft, fl)
+                    flat = flat_results[w]
+                summary = planner.as_dict()
+                row = (f"{size:>6}{cluster_size:>4}{summary['nodes']:>8}{summary['build_time']:>9.3f}{update_time:>9.4f}"
+                       f"{w:>5g}{expansions:>10}{elapsed:>9.3f}")
+                if flat == "-":
+                    row += f"{'-':>10}{'-':>9}{'-':>8}"
+                else:
+                    row += f"{flat[0]:>10}{flat[1]:>9.3f}{length / flat[2]:>8.3f}"
+                print(row)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+"""
+候选路径增量生成基准：每条不同路径平均消耗的节点扩展数（从头重搜 vs. 前缀分叉复用）。
+
+用法（在仓库根目录）：
+    python -m benchmarks.bench_incremental --sizes 40 80 --candidates 10
+"""
+import argparse
+import time
+
+from env import GridMap
+from focal_search import FocalSearch
+from search_stats import SearchStats
+from obsracle_generate import ObstacleGenerator
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[40, 80])
+    parser.add_argument("--density", type=float, default=0.2)
+    parser.add_argument("--candidates", type=int, default=10)
+    parser.add_argument("--max-tries", type=int, default=60)
+    parser.add_argument("--seed", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'地图':>8}{'模式':>8}{'路径数':>8}{'总扩展':>10}{'扩展/路径':>12}{'平均长度':>10}{'耗时(s)':>10}")
+    for size in args.sizes:
+        start, goal = (size - 1, size - 1), (0, 0)
+        generator = ObstacleGenerator(size, size, start, goal)
+        grid_map = GridMap.from_obstacle_generator(generator, "density", args.density, seed=args.seed)
+        for incremental in (False, True):
+            planner = FocalSearch(grid_map)
+            planner.stats = SearchStats()
+            t0 = time.perf_counter()
+            paths = planner.generate_candidate_paths(
+                start, goal, args.candidates, args.max_tries, 0.0, 3.0, seed=args.seed, incremental=incremental
+            )
+            elapsed = time.perf_counter() - t0
+            n = max(len(paths), 1)
+            mean_len = sum(len(p) - 1 for p in paths) / n
+            print(
+                f"{size:>8}{'增量' if incremental else '重搜':>8}{len(paths):>8}{planner.stats.expansions:>10}"
+                f"{planner.stats.expansions / n:>12.1f}{mean_len:>10.1f}{elapsed:>10.3f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
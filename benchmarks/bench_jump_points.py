@@ -0,0 +1,54 @@
+"""
+跳点剪枝基准：密度 0–0.3 的均匀随机地图上，逐格 focal 搜索与跳点剪枝搜索的扩展节点数、耗时与路径长度。
+
+每个 (尺寸, 密度, w) 配置在 --seeds 个场景上求和；“建表”为跳点位图的预计算耗时（每张图一次，之后的查询共享）。
+
+用法（在仓库根目录）：
+    python -m benchmarks.bench_jump_points --sizes 100 200 --densities 0 0.01 0.05 0.1 0.2 0.3 --w 0 1.2
+"""
+import argparse
+import time
+
+from focal_search import FocalSearch
+from jump_points import get_jump_tables
+from scenarios import make_scenario
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 200])
+    parser.add_argument("--densities", type=float, nargs="+", default=[0.0, 0.01, 0.05, 0.1, 0.2, 0.3])
+    parser.add_argument("--w", type=float, nargs="+", default=[0.0, 1.2])
+    parser.add_argument("--seeds", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'地图':>6}{'密度':>6}{'w':>6}{'逐格扩展':>10}{'跳点扩展':>10}{'扩展比':>8}"
+          f"{'逐格(s)':>9}{'跳点(s)':>9}{'建表(s)':>9}{'长度比':>8}")
+    for size in args.sizes:
+        for density in args.densities:
+            scenarios = [make_scenario(size, density, "uniform", seed) for seed in range(args.seeds)]
+            t0 = time.perf_counter()
+            for scenario in scenarios:
+                get_jump_tables(scenario.grid_map)
+            build = time.perf_counter() - t0
+            for w in args.w:
+                totals = {}
+                for jump_points in (False, True):
+                    expansions, elapsed, length = 0, 0.0, 0
+                    for scenario in scenarios:
+                        planner = FocalSearch(scenario.grid_map, w, jump_points=jump_points)
+                        t0 = time.perf_counter()
+                        path, n = planner._search(scenario.start, scenario.goal)
+                        elapsed += time.perf_counter() - t0
+                        expansions += n
+                        length += len(path) - 1
+                    totals[jump_points] = (expansions, elapsed, length)
+                (e0, t0_, l0), (e1, t1_, l1) = totals[False], totals[True]
+                print(
+                    f"{size:>6}{density:>6g}{w:>6g}{e0:>10}{e1:>10}{e1 / e0:>8.1%}"
+                    f"{t0_:>9.3f}{t1_:>9.3f}{build:>9.3f}{l1 / l0:>8.3f}"
+                )
+
+
+if __name__ == "__main__":
+    main()
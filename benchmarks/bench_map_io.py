@@ -0,0 +1,61 @@
+"""
+地图加载基准：从障碍物坐标列表构建 GridMap vs. GridMap.open 打开二进制地图文件。
+
+用法（在仓库根目录）：
+    python -m benchmarks.bench_map_io --sizes 1000 4000 --density 0.2
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+
+from env import GridMap
+
+
+def _random_mask(size: int, density: float, seed: int) -> bytes:
+    """每格一字节的随机障碍物掩码（按字节阈值转换，避免逐格 Python 循环）"""
+    threshold = int(density * 256)
+    table = bytes(1 if b < threshold else 0 for b in range(256))
+    return random.Random(seed).randbytes(size * size).translate(table)
+
+
+def _timed(fn):
+    t0 = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - t0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 4000])
+    parser.add_argument("--density", type=float, default=0.2)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    print(f"{'地图':>7}{'坐标列表构建(s)':>16}{'open mmap(s)':>14}{'mmap+邻接(s)':>14}{'open 读入(s)':>14}{'文件(MiB)':>11}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in args.sizes:
+            mask = _random_mask(size, args.density, args.seed)
+            obstacles = [(i % size, i // size) for i, v in enumerate(mask) if v]
+            grid_map, build = _timed(lambda: GridMap(size, size, obstacles))
+            del obstacles
+
+            path = os.path.join(tmp, f"map_{size}.fsgm")
+            grid_map.save(path)
+            bare = os.path.join(tmp, f"map_{size}_bare.fsgm")
+            grid_map.save(bare, include_adjacency=False)
+
+            opened, mmap_time = _timed(lambda: GridMap.open(path, mmap=True))
+            assert opened.to_mask() == grid_map.to_mask()
+            _, lazy_time = _timed(lambda: GridMap.open(bare, mmap=True).adjacency())
+            _, read_time = _timed(lambda: GridMap.open(path, mmap=False))
+            print(
+                f"{size:>7}{build:>16.3f}{mmap_time:>14.5f}{lazy_time:>14.3f}{read_time:>14.4f}"
+                f"{os.path.getsize(path) / 2 ** 20:>11.1f}"
+            )
+    print("mmap+邻接：文件中不带邻接段，打开后现场构建邻居方向掩码的耗时")
+
+
+if __name__ == "__main__":
+    main()
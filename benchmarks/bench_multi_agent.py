@@ -0,0 +1,73 @@
+"""
+多智能体基准：可复现的 ObstacleGenerator 场景上，MultiAgentPlanner 一起规划全部智能体的吞吐（智能体/s）与成功率，
+并与“各智能体独立调用 FocalSearch.search_once”对照（后者不处理冲突，表中给出其遗留的冲突数）。
+
+每个 (尺寸, 智能体数) 配置在 --seeds 个场景上求和；起终点从地图连通区域中按种子随机选取、互不重复。
+
+用法（在仓库根目录）：
+    python -m benchmarks.bench_multi_agent --sizes 32 64 --agents 10 20 40 --seeds 3
+"""
+import argparse
+import random
+import time
+
+from focal_search import FocalSearch
+from heuristics import bfs_distances
+from multi_agent import MultiAgentPlanner, _find_conflicts
+from scenarios import make_scenario
+
+
+def make_agents(scenario, count: int, seed: int):
+    """在起点所在的连通区域内取 count 对互不重复的起终点"""
+    grid_map = scenario.grid_map
+    dist = bfs_distances(grid_map, grid_map.index(*scenario.start))
+    reachable = [grid_map.coord(i) for i, d in enumerate(dist) if d < float("inf")]
+    cells = random.Random(seed).sample(reachable, 2 * count)
+    return cells[:count], cells[count:]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[32, 64])
+    parser.add_argument("--agents", type=int, nargs="+", default=[10, 20, 40])
+    parser.add_argument("--density", type=float, default=0.2)
+    parser.add_argument("--w", type=float, default=0.2)
+    parser.add_argument("--seeds", type=int, default=3)
+    parser.add_argument("--time-limit", type=float, default=30.0)
+    args = parser.parse_args()
+
+    print(f"{'地图':>6}{'智能体':>8}{'成功':>6}{'总代价':>9}{'高层节点':>10}{'低层扩展':>10}{'耗时(s)':>9}{'智能体/s':>10}"
+          f"{'独立(s)':>9}{'独立/s':>9}{'独立冲突':>10}")
+    for size in args.sizes:
+        for count in args.agents:
+            solved = cost = nodes = low = 0
+            elapsed = independent_time = 0.0
+            independent_conflicts = 0
+            for seed in range(args.seeds):
+                scenario = make_scenario(size, args.density, "uniform", seed)
+                starts, goals = make_agents(scenario, count, seed)
+                grid_map = scenario.grid_map
+
+                result = MultiAgentPlanner(grid_map, args.w).plan(starts, goals, time_limit=args.time_limit)
+                solved += result.solved
+                cost += result.cost
+                nodes += result.high_level_expansions
+                low += result.low_level_expansions
+                elapsed += result.elapsed
+
+                planner = FocalSearch(grid_map, args.w)
+                t0 = time.perf_counter()
+                paths = [planner.search_once(start, goal) for start, goal in zip(starts, goals)]
+                independent_time += time.perf_counter() - t0
+                index = grid_map.index
+                independent_conflicts += _find_conflicts([[index(*cell) for cell in path] for path in paths])[0]
+            agents = count * args.seeds
+            print(
+                f"{size:>6}{count:>8}{solved:>4}/{args.seeds}{cost:>9}{nodes:>10}{low:>10}{elapsed:>9.3f}"
+                f"{agents / elapsed:>10.1f}{independent_time:>9.3f}{agents / independent_time:>9.1f}"
+                f"{independent_conflicts:>10}"
+            )
+
+
+if __name__ == "__main__":
+    main()
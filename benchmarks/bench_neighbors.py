@@ -0,0 +1,86 @@
+"""
+邻居展开微基准：列表栅格 + 逐方向 is_valid（原实现） vs. 预计算方向掩码 + 下标偏移。
+
+用法（在仓库根目录）：
+    python -m benchmarks.bench_neighbors --size 300 --density 0.2
+"""
+import argparse
+import sys
+import time
+
+from env import GridMap
+from obsracle_generate import ObstacleGenerator
+
+
+class _ListGrid:
+    """原 GridMap 的存储与邻居获取方式：list-of-lists 的 bool 栅格，每次调用重建方向表"""
+
+    def __init__(self, grid_map: GridMap):
+        self.width, self.height = grid_map.width, grid_map.height
+        self.grid = [[grid_map.is_valid(x, y) for x in range(self.width)] for y in range(self.height)]
+
+    def is_valid(self, x: int, y: int) -> bool:
+        return 0 <= x < self.width and 0 <= y < self.height and self.grid[y][x]
+
+    def get_neighbors(self, x: int, y: int):
+        directions = [(-1, 0), (1, 0), (0, -1), (0, 1)]
+        neighbors = []
+        for dx, dy in directions:
+            nx, ny = x + dx, y + dy
+            if self.is_valid(nx, ny):
+                neighbors.append((nx, ny))
+        return neighbors
+
+    def nbytes(self) -> int:
+        return sys.getsizeof(self.grid) + sum(sys.getsizeof(row) for row in self.grid)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size", type=int, default=300)
+    parser.add_argument("--density", type=float, default=0.2)
+    parser.add_argument("--rounds", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    generator = ObstacleGenerator(args.size, args.size, (0, 0), (args.size - 1, args.size - 1))
+    t0 = time.perf_counter()
+    grid_map = GridMap.from_obstacle_generator(generator, "density", args.density, seed=args.seed)
+    build_time = time.perf_counter() - t0
+    legacy = _ListGrid(grid_map)
+    free = [grid_map.index(x, y) for y in range(args.size) for x in range(args.size) if grid_map.is_valid(x, y)]
+    free_xy = [grid_map.coord(i) for i in free]
+
+    def run_legacy():
+        count = 0
+        for x, y in free_xy:
+            count += len(legacy.get_neighbors(x, y))
+        return count
+
+    def run_adjacency():
+        masks, deltas = grid_map.adjacency()
+        count = 0
+        for index in free:
+            for delta in deltas[masks[index]]:
+                neighbor = index + delta
+                count += 1
+        return count
+
+    print(f"地图 {args.size}x{args.size}，密度 {args.density}，可行栅格 {len(free)}，GridMap 构建 {build_time:.3f}s")
+    print(f"{'实现':<28}{'邻居数':>10}{'最佳耗时(s)':>14}{'百万邻居/秒':>14}{'存储(KiB)':>12}")
+    masks, _ = grid_map.adjacency()
+    storage = {
+        "list 栅格 + is_valid": legacy.nbytes(),
+        "方向掩码 + 偏移": len(grid_map._blocked) + len(masks),
+    }
+    for name, fn in (("list 栅格 + is_valid", run_legacy), ("方向掩码 + 偏移", run_adjacency)):
+        best = float("inf")
+        for _ in range(args.rounds):
+            t0 = time.perf_counter()
+            count = fn()
+            best = min(best, time.perf_counter() - t0)
+        print(f"{name:<28}{count:>10}{best:>14.4f}{count / best / 1e6:>14.2f}{storage[name] / 1024:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
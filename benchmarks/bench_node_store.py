@@ -0,0 +1,148 @@
+"""
+内存基准：Node 对象 + node_map 字典 vs. SearchState 扁平数组。
+
+用法（在仓库根目录）：
+    python -m benchmarks.bench_node_store --size 300 --density 0.1
+"""
+import argparse
+import time
+import tracemalloc
+from typing import Dict, List, Optional, Tuple, Type
+
+from env import GridMap, Node
+from focal_search import FocalSearch
+from indexed_heap import IndexedHeap
+from obsracle_generate import ObstacleGenerator
+
+
+class _DictNode(Node):
+    """带 __dict__ 的 Node，还原加 __slots__ 之前每个节点的内存占用"""
+
+
+def node_based_search(
+    grid_map: GridMap, start: Tuple[int, int], goal: Tuple[int, int], w: float, node_cls: Type[Node]
+) -> Tuple[Optional[List[Tuple[int, int]]], int]:
+    """与 FocalSearch.search_once 相同的 OPEN/FOCAL 逻辑，但节点状态放在 Node 对象 + node_map 中"""
+    fs = FocalSearch(grid_map, w)
+    open_, focal, waiting = IndexedHeap(), IndexedHeap(), IndexedHeap()
+    node_map: Dict[Tuple[int, int], Node] = {}
+    seq = 0
+
+    def push(node: Node, bound: float):
+        nonlocal seq
+        seq += 1
+        key = (node.x, node.y)
+        open_.push(key, (node.f, -node.g, seq))
+        if node.f <= bound:
+            focal.push(key, (node.focal_value, node.f, -node.g, seq))
+        else:
+            waiting.push(key, (node.f, -node.g, seq))
+
+    start_node = node_cls(*start)
+    start_node.h = fs._calculate_heuristic(start, goal)
+    start_node.f = start_node.h
+    start_node.focal_value = fs._calculate_focal_value(start, None, 0.0, goal)
+    node_map[start] = start_node
+    bound = (w + 1) * start_node.f
+    push(start_node, bound)
+
+    while open_:
+        new_bound = (w + 1) * open_.peek_key()[0]
+        if new_bound > bound:
+            while waiting and waiting.peek_key()[0] <= new_bound:
+                key = waiting.pop()
+                focal.push(key, (node_map[key].focal_value,) + open_.key(key))
+        bound = new_bound
+        current = None
+        while focal:
+            key = focal.pop()
+            if open_.key(key)[0] <= bound:
+                open_.remove(key)
+                current = node_map[key]
+                break
+            waiting.push(key, open_.key(key))
+        if current is None:
+            break
+        current.visited = True
+        if (current.x, current.y) == goal:
+            path = []
+            while current:
+                path.append((current.x, current.y))
+                current = current.parent
+            return path[::-1], len(node_map)
+        new_g = current.g + 1.0
+        for dx, dy in ((-1, 0), (1, 0), (0, -1), (0, 1)):
+            x, y = current.x + dx, current.y + dy
+            if not grid_map.is_valid(x, y):
+                continue
+            key = (x, y)
+            existing = node_map.get(key)
+            if existing is None:
+                neighbor = node_cls(x, y)
+                neighbor.g = new_g
+                neighbor.h = fs._calculate_heuristic(key, goal)
+                neighbor.f = new_g + neighbor.h
+                neighbor.focal_value = fs._calculate_focal_value(key, None, new_g, goal)
+                neighbor.parent = current
+                node_map[key] = neighbor
+                push(neighbor, bound)
+            elif not existing.visited and new_g < existing.g:
+                open_.remove(key)
+                focal.remove(key)
+                waiting.remove(key)
+                existing.g = new_g
+                existing.f = new_g + existing.h
+                existing.focal_value = fs._calculate_focal_value(
+                    key, (existing.parent.x, existing.parent.y), new_g, goal
+                )
+                existing.parent = current
+                push(existing, bound)
+    return None, len(node_map)
+
+
+def _measure(fn):
+    tracemalloc.start()
+    t0 = time.perf_counter()
+    result = fn()
+    elapsed = time.perf_counter() - t0
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, peak, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size", type=int, default=300)
+    parser.add_argument("--density", type=float, default=0.1)
+    parser.add_argument("--w", type=float, default=0.0, help="w=0 时扩展最多，最能体现节点存储开销")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    start, goal = (0, 0), (args.size - 1, args.size - 1)
+    generator = ObstacleGenerator(args.size, args.size, start, goal)
+    grid_map = GridMap.from_obstacle_generator(generator, "density", args.density, seed=args.seed)
+
+    rows = []
+    for name, node_cls in (("Node + __dict__ + node_map", _DictNode), ("Node + __slots__ + node_map", Node)):
+        (path, touched), peak, elapsed = _measure(
+            lambda: node_based_search(grid_map, start, goal, args.w, node_cls)
+        )
+        rows.append((name, path, touched, peak, elapsed))
+
+    planner = FocalSearch(grid_map, args.w)
+    path, peak, elapsed = _measure(lambda: planner.search_once(start, goal))
+    touched = len(planner._contexts[0].state.touched)
+    rows.append(("SearchState (首次，含预分配)", path, touched, peak, elapsed))
+    path, peak, elapsed = _measure(lambda: planner.search_once(start, goal))
+    rows.append(("SearchState (复用)", path, touched, peak, elapsed))
+
+    print(f"地图 {args.size}x{args.size}，密度 {args.density}，w={args.w}")
+    print(f"{'后端':<32}{'生成节点':>10}{'峰值内存(KiB)':>16}{'B/节点':>10}{'耗时(s)':>10}")
+    for name, path, touched, peak, elapsed in rows:
+        print(f"{name:<32}{touched:>10}{peak / 1024:>16.1f}{peak / max(touched, 1):>10.1f}{elapsed:>10.3f}")
+    if len({tuple(r[1]) if r[1] else None for r in rows}) != 1:
+        print("警告：各后端返回的路径不一致")
+
+
+if __name__ == "__main__":
+    main()
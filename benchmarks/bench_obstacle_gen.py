@@ -0,0 +1,51 @@
+"""
+障碍物生成基准：列表接口（坐标元组）vs. NumPy 掩码接口，含构建 GridMap 的时间。
+
+用法（在仓库根目录）：
+    python -m benchmarks.bench_obstacle_gen --sizes 20 64 256 1024 4096 --list-max 1024
+"""
+import argparse
+import time
+
+from env import GridMap
+from obsracle_generate import ObstacleGenerator
+
+
+def _timed(fn):
+    t0 = time.perf_counter()
+    fn()
+    return time.perf_counter() - t0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[20, 64, 256, 1024, 4096])
+    parser.add_argument("--density", type=float, default=0.2)
+    parser.add_argument("--list-max", type=int, default=1024, help="超过该边长时跳过列表接口（太慢）")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    print(f"{'地图':>6}{'方式':>10}{'列表接口(s)':>14}{'掩码接口(s)':>14}{'加速比':>10}")
+    for size in args.sizes:
+        generator = ObstacleGenerator(size, size, (0, 0), (size - 1, size - 1))
+        count = int(generator.max_obstacle_count * args.density)
+        clusters = max(count // 25, 1)  # 半径 2 的方块每块 25 格
+        cases = (
+            ("density", args.density, {}),
+            ("clustered", count, dict(cluster_num=clusters, cluster_radius=2)),
+        )
+        for gen_type, value, kwargs in cases:
+            def build(vectorized):
+                return lambda: GridMap.from_obstacle_generator(
+                    generator, gen_type, value, seed=args.seed, vectorized=vectorized, **kwargs
+                )
+            mask_time = _timed(build(True))
+            if size <= args.list_max:
+                list_time = _timed(build(False))
+                print(f"{size:>6}{gen_type:>10}{list_time:>14.4f}{mask_time:>14.4f}{list_time / mask_time:>10.1f}")
+            else:
+                print(f"{size:>6}{gen_type:>10}{'-':>14}{mask_time:>14.4f}{'-':>10}")
+
+
+if __name__ == "__main__":
+    main()
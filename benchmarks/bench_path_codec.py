@@ -0,0 +1,98 @@
+"""
+紧凑路径与多样性索引基准：
+  1. 坐标元组 与 PackedPath 的内存占用、编码/哈希耗时、批量导出大小；
+  2. 不同近似重复阈值 max_overlap 下候选路径生成的结果：收录数、近似重复数（其中分叉前缀即被剪掉、未搜索的次数）、
+     总扩展数，以及收录路径两两之间的最大重叠率。
+
+用法（在仓库根目录）：
+    python -m benchmarks.bench_path_codec --size 100 --overlaps 1.0 0.9 0.8 0.7
+    python -m benchmarks.bench_path_codec --w-min 0 --w-max 0.5   # w 较小时分叉结果长度上界较紧，前缀剪枝更常生效
+"""
+import argparse
+import sys
+import time
+
+from focal_search import FocalSearch
+from path_codec import DiversityIndex, PackedPath, export_paths
+from scenarios import make_scenario
+from search_stats import SearchStats
+
+
+def tuple_nbytes(path) -> int:
+    """tuple(tuple(...)) 形式（原去重集合中的键）的内存占用"""
+    return sys.getsizeof(path) + sum(sys.getsizeof(cell) for cell in path)
+
+
+def max_pairwise_overlap(paths) -> float:
+    best = 0.0
+    for i, path in enumerate(paths):
+        cells = set(path)
+        for other in paths[:i]:
+            best = max(best, len(cells & set(other)) / len(cells))
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size", type=int, default=100)
+    parser.add_argument("--density", type=float, default=0.2)
+    parser.add_argument("--candidates", type=int, default=5)
+    parser.add_argument("--tries", type=int, default=60)
+    parser.add_argument("--w-min", type=float, default=1.0)
+    parser.add_argument("--w-max", type=float, default=3.0)
+    parser.add_argument("--overlaps", type=float, nargs="+", default=[1.0, 0.9, 0.8, 0.7])
+    parser.add_argument("--seeds", type=int, default=3)
+    args = parser.parse_args()
+
+    scenarios = [make_scenario(args.size, args.density, "uniform", seed) for seed in range(args.seeds)]
+
+    # 1. 编码本身：用各场景默认参数生成的候选路径
+    paths = []
+    for scenario in scenarios:
+        planner = FocalSearch(scenario.grid_map)
+        paths += planner.generate_candidate_paths(scenario.start, scenario.goal, args.candidates, args.tries, seed=0)
+    tuples = [tuple(path) for path in paths]
+    t0 = time.perf_counter()
+    packed = [PackedPath.from_cells(path) for path in paths]
+    encode = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    for _ in range(100):
+        set(tuple(path) for path in paths)
+    tuple_hash = (time.perf_counter() - t0) / 100
+    t0 = time.perf_counter()
+    for _ in range(100):
+        set(packed)
+    packed_hash = (time.perf_counter() - t0) / 100
+    cells = sum(map(len, paths))
+    print(f"{len(paths)} 条路径，共 {cells} 格")
+    print(f"{'表示':>10}{'内存(KiB)':>12}{'每格(B)':>10}{'建集合(ms)':>12}")
+    print(f"{'坐标元组':>10}{sum(map(tuple_nbytes, tuples)) / 1024:>12.1f}"
+          f"{sum(map(tuple_nbytes, tuples)) / cells:>10.1f}{tuple_hash * 1e3:>12.3f}")
+    print(f"{'PackedPath':>10}{sum(p.nbytes for p in packed) / 1024:>12.1f}"
+          f"{sum(p.nbytes for p in packed) / cells:>10.1f}{packed_hash * 1e3:>12.3f}")
+    print(f"编码耗时 {encode * 1e3:.2f} ms，批量导出 {len(export_paths(packed))} 字节\n")
+
+    # 2. 近似重复阈值
+    print(f"{'阈值':>6}{'增量':>6}{'收录':>6}{'近似重复':>10}{'前缀剪枝':>10}{'扩展':>10}{'最大重叠':>10}")
+    for incremental in (False, True):
+        for max_overlap in args.overlaps:
+            accepted = near = pruned = expansions = 0
+            worst = 0.0
+            for scenario in scenarios:
+                planner = FocalSearch(scenario.grid_map)
+                planner.stats = SearchStats()
+                found = list(planner.iter_candidate_paths(
+                    scenario.start, scenario.goal, args.candidates, args.tries, args.w_min, args.w_max, seed=0,
+                    incremental=incremental, max_overlap=max_overlap, index=DiversityIndex(max_overlap)
+                ))
+                accepted += len(found)
+                near += sum(t.outcome == "near_duplicate" for t in planner.stats.tries)
+                pruned += sum(t.outcome == "near_duplicate" and t.expansions == 0 for t in planner.stats.tries)
+                expansions += sum(t.expansions for t in planner.stats.tries)
+                worst = max(worst, max_pairwise_overlap(found))
+            print(f"{max_overlap:>6g}{'是' if incremental else '否':>6}{accepted:>6}{near:>10}{pruned:>10}"
+                  f"{expansions:>10}{worst:>10.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""
+出图基准：逐格散点绘制（visualize_grid_and_paths 原方式，show=False）与光栅化绘制（render_grid_and_paths）的出图耗时，
+以及超大地图分块出图（render_tiles）的耗时。全部写入临时目录，使用无显示的 Agg 后端。
+
+逐格绘制只在不超过 --scatter-max 的地图上运行（默认参数下 50×50 已需十几秒）。
+
+用法（在仓库根目录）：
+    python -m benchmarks.bench_render --sizes 25 50 100 1000 4000 --scatter-max 50
+"""
+import argparse
+import os
+import tempfile
+import time
+
+import matplotlib
+
+matplotlib.use("Agg")
+import matplotlib.pyplot as plt  # noqa: E402
+
+from focal_search import FocalSearch  # noqa: E402
+from hierarchy import HierarchicalPlanner  # noqa: E402
+from plot import render_grid_and_paths, render_tiles, visualize_grid_and_paths  # noqa: E402
+from scenarios import make_scenario  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[25, 50, 100, 1000, 4000])
+    parser.add_argument("--density", type=float, default=0.2)
+    parser.add_argument("--paths", type=int, default=5)
+    parser.add_argument("--scatter-max", type=int, default=50)
+    parser.add_argument("--dpi", type=int, default=600, help="逐格绘制的 dpi（原默认 600）")
+    parser.add_argument("--tile-size", type=int, default=512)
+    args = parser.parse_args()
+
+    print(f"{'地图':>6}{'路径':>6}{'逐格(s)':>10}{'光栅(s)':>10}{'加速':>9}{'分块(s)':>10}{'块数':>6}")
+    with tempfile.TemporaryDirectory() as out_dir:
+        for size in args.sizes:
+            scenario = make_scenario(size, args.density, "uniform", 0)
+            grid_map, start, goal = scenario.grid_map, scenario.start, scenario.goal
+            # 大地图用分层规划生成候选路径，避免出图基准被搜索耗时拖住
+            if size <= 200:
+                paths = FocalSearch(grid_map).generate_candidate_paths(start, goal, args.paths, seed=0)
+            else:
+                paths = HierarchicalPlanner(grid_map).generate_candidate_paths(start, goal, args.paths, seed=0)
+
+            scatter = None
+            if size <= args.scatter_max:
+                t0 = time.perf_counter()
+                visualize_grid_and_paths(
+                    grid_map, start, goal, paths, save_path=os.path.join(out_dir, "scatter.png"),
+                    dpi=args.dpi, show=False
+                )
+                plt.close("all")
+                scatter = time.perf_counter() - t0
+
+            t0 = time.perf_counter()
+            render_grid_and_paths(grid_map, start, goal, paths).savefig(os.path.join(out_dir, "raster.png"))
+            raster = time.perf_counter() - t0
+
+            t0 = time.perf_counter()
+            tiles = render_tiles(
+                grid_map, start, goal, paths, os.path.join(out_dir, "tile_{ty}_{tx}.png"), args.tile_size
+            )
+            tiled = time.perf_counter() - t0
+
+            row = f"{size:>6}{len(paths):>6}"
+            row += f"{scatter:>10.2f}" if scatter is not None else f"{'-':>10}"
+            row += f"{raster:>10.2f}"
+            row += f"{scatter / raster:>8.0f}x" if scatter is not None else f"{'-':>9}"
+            print(row + f"{tiled:>10.2f}{len(tiles):>6}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""
+增量重规划基准：在候选路径上放置少量新障碍物后，IncrementalReplanner.replan 与完整重新规划的耗时对比。
+
+用法（在仓库根目录）：
+    python -m benchmarks.bench_replan --size 150 --edits 3 --rounds 5
+"""
+import argparse
+import random
+import time
+
+from env import GridMap
+from focal_search import FocalSearch
+from obsracle_generate import ObstacleGenerator
+from replanner import IncrementalReplanner
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size", type=int, default=150)
+    parser.add_argument("--density", type=float, default=0.1)
+    parser.add_argument("--candidates", type=int, default=5)
+    parser.add_argument("--edits", type=int, default=3, help="每轮新增的障碍物数（落在候选路径上）")
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    start, goal = (0, 0), (args.size - 1, args.size - 1)
+    generator = ObstacleGenerator(args.size, args.size, start, goal)
+    grid_map = GridMap.from_obstacle_generator(generator, "density", args.density, seed=args.seed)
+    candidate_kwargs = dict(candidate_num=args.candidates, max_tries=4 * args.candidates, seed=args.seed)
+    replanner = IncrementalReplanner(FocalSearch(grid_map))
+    t0 = time.perf_counter()
+    replanner.plan(start, goal, **candidate_kwargs)
+    print(f"地图 {args.size}x{args.size}，首次完整规划 {time.perf_counter() - t0:.3f}s，候选 {len(replanner.paths)} 条")
+
+    rng = random.Random(args.seed)
+    print(f"{'轮次':>4}{'增量(s)':>10}{'完整(s)':>10}{'比例':>8}{'增量候选':>10}{'完整候选':>10}{'退回完整':>10}")
+    for round_no in range(1, args.rounds + 1):
+        cells = [c for path in replanner.paths for c in path[1:-1]]
+        grid_map.add_obstacles(rng.sample(cells, min(args.edits, len(cells))))
+
+        t0 = time.perf_counter()
+        repaired = replanner.replan()
+        incremental = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        full = FocalSearch(grid_map).generate_candidate_paths(start, goal, **candidate_kwargs)
+        full_time = time.perf_counter() - t0
+        for p in repaired:
+            assert all(grid_map.is_valid(*c) for c in p), "修补后的路径穿过障碍物"
+            assert all(abs(a[0] - b[0]) + abs(a[1] - b[1]) == 1 for a, b in zip(p, p[1:])), "修补后的路径不连续"
+            assert len(set(p)) == len(p) and p[0] == start and p[-1] == goal
+        print(
+            f"{round_no:>4}{incremental:>10.4f}{full_time:>10.3f}{incremental / full_time:>8.1%}"
+            f"{len(repaired):>10}{len(full):>10}{'是' if replanner.last_replan_full else '否':>10}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""
+吞吐基准：search_many 批量查询 vs. 循环调用 search_once。
+
+用法（在仓库根目录）：
+    python -m benchmarks.bench_search_many --size 100 --queries 500
+"""
+import argparse
+import random
+import time
+
+from env import GridMap
+from focal_search import FocalSearch
+from obsracle_generate import ObstacleGenerator
+
+
+def _random_queries(grid_map: GridMap, count: int, seed: int):
+    rng = random.Random(seed)
+    free = [(x, y) for y in range(grid_map.height) for x in range(grid_map.width) if grid_map.is_valid(x, y)]
+    return [(rng.choice(free), rng.choice(free)) for _ in range(count)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size", type=int, default=100)
+    parser.add_argument("--density", type=float, default=0.1)
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--w", type=float, default=0.5)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    generator = ObstacleGenerator(args.size, args.size, (0, 0), (args.size - 1, args.size - 1))
+    grid_map = GridMap.from_obstacle_generator(generator, "density", args.density, seed=args.seed)
+    queries = _random_queries(grid_map, args.queries, args.seed)
+
+    # 基线 1：每个查询新建一个规划器（生产中的用法）
+    t0 = time.perf_counter()
+    fresh = [FocalSearch(grid_map, args.w).search_once(s, g) for s, g in queries]
+    fresh_time = time.perf_counter() - t0
+
+    # 基线 2：共享一个规划器，循环调用 search_once
+    planner = FocalSearch(grid_map, args.w)
+    t0 = time.perf_counter()
+    looped = [planner.search_once(s, g) for s, g in queries]
+    loop_time = time.perf_counter() - t0
+
+    # search_many
+    planner = FocalSearch(grid_map, args.w)
+    t0 = time.perf_counter()
+    results = list(planner.search_many(queries))
+    many_time = time.perf_counter() - t0
+
+    assert fresh == looped == [r.path for r in results], "search_many 与 search_once 结果不一致"
+
+    latencies = sorted(r.latency for r in results)
+    expansions = sum(r.expansions for r in results)
+    print(f"地图 {args.size}x{args.size}，密度 {args.density}，w={args.w}，查询 {len(queries)} 个")
+    print(f"{'方式':<30}{'总耗时(s)':>12}{'查询/秒':>12}")
+    for name, elapsed in (
+        ("每次新建 FocalSearch", fresh_time),
+        ("共享规划器循环 search_once", loop_time),
+        ("search_many", many_time),
+    ):
+        print(f"{name:<30}{elapsed:>12.3f}{len(queries) / elapsed:>12.1f}")
+    print(
+        f"search_many：平均扩展 {expansions / len(results):.1f}，"
+        f"延迟 p50 {latencies[len(latencies) // 2] * 1e3:.2f}ms，"
+        f"p99 {latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] * 1e3:.2f}ms"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+"""
+搜索正确性检查：在随机地图上把各搜索模式的结果与 BFS 最短路对照，任何一项不符即以退出码 1 结束。
+
+对每个模式（启发式 manhattan / landmarks × 普通 / 双向 / 跳点）检查：
+  1. 可达性与 BFS 一致（BFS 可达则必须找到路径，不可达则必须返回 None）；
+  2. 路径有效：首尾为起终点，相邻两格四连通相邻，且每格都不是障碍物；
+  3. 代价不超过 (1+w) × 最短路长度；w=0 时必须等于最短路长度；
+  4. 候选路径（generate_candidate_paths）每条都有效，且不超过 (1+w_max) × 最短路长度。
+每张地图检查完后随机增删一批障碍物再检查一遍，覆盖地图变更后启发式表的重建。
+
+用法（在仓库根目录）：
+    python -m benchmarks.check_search --sizes 20 50 --maps 20 --queries 8
+"""
+import argparse
+import random
+import sys
+
+from focal_search import FocalSearch
+from heuristics import bfs_distances
+from scenarios import make_scenario
+
+MODES = {
+    "manhattan": {},
+    "bidirectional": {"bidirectional": True},
+    "jump_points": {"jump_points": True},
+    "landmarks": {"heuristic": "landmarks"},
+    "landmarks+bidirectional": {"heuristic": "landmarks", "bidirectional": True},
+    "landmarks+jump_points": {"heuristic": "landmarks", "jump_points": True},
+}
+
+
+def path_error(grid_map, path, start, goal):
+    """路径无效时返回原因，否则返回 None"""
+    if path[0] != start or path[-1] != goal:
+        return f"首尾为 {path[0]} / {path[-1]}"
+    for (x0, y0), (x1, y1) in zip(path, path[1:]):
+        if abs(x1 - x0) + abs(y1 - y0) != 1:
+            return f"({x0},{y0}) 与 ({x1},{y1}) 不相邻"
+    for cell in path:
+        if not grid_map.is_valid(*cell):
+            return f"经过障碍物 {cell}"
+    return None
+
+
+def check_map(grid_map, rng, args, label, failures):
+    """在当前地图上随机取起终点，检查所有模式；返回检查的查询数"""
+    free = [(x, y) for y in range(grid_map.height) for x in range(grid_map.width) if grid_map.is_valid(x, y)]
+    if len(free) < 2:
+        return 0
+    planners = {
+        (mode, w): FocalSearch(grid_map, w, **options) for mode, options in MODES.items() for w in args.w
+    }
+    checked = 0
+    for _ in range(args.queries):
+        start, goal = rng.sample(free, 2)
+        d = bfs_distances(grid_map, grid_map.index(*start))[grid_map.index(*goal)]
+        optimal = None if d == float("inf") else int(d)
+        for (mode, w), planner in planners.items():
+            checked += 1
+            where = f"{label} {mode} w={w:g} {start}->{goal}"
+            path = planner.search_once(start, goal)
+            if (path is None) != (optimal is None):
+                failures.append(f"{where}：可达性不符（BFS 最短路 {optimal}，搜索结果 {path and len(path) - 1}）")
+                continue
+            if path is None:
+                continue
+            error = path_error(grid_map, path, start, goal)
+            if error:
+                failures.append(f"{where}：{error}")
+            elif len(path) - 1 > (1 + w) * optimal + 1e-9 or (w == 0 and len(path) - 1 != optimal):
+                failures.append(f"{where}：代价 {len(path) - 1} 超出界限（最短路 {optimal}）")
+            # 候选生成只取决于 w_min / w_max，与规划器的 w 无关，每个模式只在 w 最大的规划器上检查一次
+            w_max = max(args.w)
+            if args.candidates <= 1 or w != w_max:
+                continue
+            candidates = planner.generate_candidate_paths(
+                start, goal, args.candidates, 2 * args.candidates, w_max=w_max, seed=0
+            )
+            for candidate in candidates:
+                error = path_error(grid_map, candidate, start, goal)
+                if error:
+                    failures.append(f"{where} 候选：{error}")
+                elif len(candidate) - 1 > (1 + w_max) * optimal + 1e-9:
+                    failures.append(f"{where} 候选：代价 {len(candidate) - 1} 超出界限（最短路 {optimal}）")
+    return checked
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[20, 50])
+    parser.add_argument("--densities", type=float, nargs="+", default=[0.0, 0.1, 0.3])
+    parser.add_argument("--layouts", nargs="+", default=["uniform", "clustered"], choices=["uniform", "clustered"])
+    parser.add_argument("--w", type=float, nargs="+", default=[0.0, 0.5, 1.2])
+    parser.add_argument("--maps", type=int, default=3, help="每个 (尺寸, 密度, 布局) 的地图数")
+    parser.add_argument("--queries", type=int, default=4, help="每张地图（每次变更后）的起终点对数")
+    parser.add_argument("--candidates", type=int, default=3, help="每个查询生成的候选路径数，<=1 时不检查候选")
+    parser.add_argument("--changes", type=int, default=20, help="每张地图变更时增、删的障碍物数")
+    args = parser.parse_args(argv)
+
+    failures = []
+    checked = 0
+    for size in args.sizes:
+        for density in args.densities:
+            for layout in args.layouts:
+                for seed in range(args.maps):
+                    grid_map = make_scenario(size, density, layout, seed).grid_map
+                    rng = random.Random(seed)
+                    label = f"{layout}-{size}-d{density:g}-s{seed}"
+                    checked += check_map(grid_map, rng, args, label, failures)
+                    # 先删后加一批障碍物再检查一遍：地标表缓存在地图上，在变更后的第一次查询时按地图版本重建
+                    blocked = [
+                        (x, y) for y in range(size) for x in range(size) if not grid_map.is_valid(x, y)
+                    ]
+                    grid_map.remove_obstacles(rng.sample(blocked, min(args.changes, len(blocked))))
+                    free = [(x, y) for y in range(size) for x in range(size) if grid_map.is_valid(x, y)]
+                    grid_map.add_obstacles(rng.sample(free, min(args.changes, len(free) - 2)))
+                    checked += check_map(grid_map, rng, args, label + "（变更后）", failures)
+
+    print(f"检查 {checked} 个（查询, 模式, w）组合，{len(failures)} 项不符")
+    for line in failures[:50]:
+        print("  " + line)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
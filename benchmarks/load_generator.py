@@ -0,0 +1,106 @@
+"""
+规划服务负载生成器：若干并发客户端持续向 PlanningService 发送请求，报告吞吐与 p50/p99 延迟。
+
+--socket 时在本进程内启动 Unix 套接字服务，客户端经套接字访问（含序列化与传输开销）；
+否则直接调用进程内接口。
+
+用法（在仓库根目录）：
+    python -m benchmarks.load_generator --size 60 --clients 32 --requests 500 --workers 2 --batch-window 0.002
+    python -m benchmarks.load_generator --socket --executor process --workers 4 --timeout 0.5
+"""
+import argparse
+import asyncio
+import collections
+import os
+import random
+import tempfile
+import time
+
+from planning_service import PlanningClient, PlanningService, serve_unix
+from scenarios import make_scenario
+
+
+def percentile(sorted_values, q: float) -> float:
+    if not sorted_values:
+        return float("nan")
+    return sorted_values[min(int(q * len(sorted_values)), len(sorted_values) - 1)]
+
+
+async def run(args) -> None:
+    grid_map = make_scenario(args.size, args.density, seed=args.seed).grid_map
+    rng = random.Random(args.seed)
+    free = [(x, y) for y in range(grid_map.height) for x in range(grid_map.width) if grid_map.is_valid(x, y)]
+    queries = [(rng.choice(free), rng.choice(free)) for _ in range(args.requests)]
+    params = {} if args.op == "plan" else {"candidate_num": args.candidates, "max_tries": 4 * args.candidates, "seed": 0}
+
+    service = PlanningService(
+        {"map": grid_map}, w=args.w, workers=args.workers, executor=args.executor,
+        batch_window=args.batch_window, max_batch=args.max_batch, max_pending=args.max_pending
+    )
+    await service.start()
+    server = client = None
+    if args.socket:
+        path = os.path.join(tempfile.mkdtemp(), "planner.sock")
+        server = await serve_unix(service, path)
+        client = await PlanningClient.connect(path)
+        endpoint = client
+    else:
+        endpoint = service
+
+    latencies, statuses = [], collections.Counter()
+    next_query = iter(queries)
+
+    async def worker():
+        for start, goal in next_query:
+            t0 = time.perf_counter()
+            try:
+                response = await endpoint.request(args.op, "map", start, goal, args.timeout, **params) \
+                    if args.socket else \
+                    await (await endpoint.submit(args.op, "map", start, goal, args.timeout, **params))
+                statuses[response.status] += 1
+            except Exception as exc:
+                statuses[type(exc).__name__] += 1
+            latencies.append(time.perf_counter() - t0)
+
+    t0 = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(args.clients)))
+    elapsed = time.perf_counter() - t0
+
+    if client is not None:
+        await client.close()
+    if server is not None:
+        server.close()
+        await server.wait_closed()
+    await service.close()
+
+    latencies.sort()
+    mode = "Unix 套接字" if args.socket else "进程内"
+    print(f"{mode}，{args.executor} × {args.workers}，批窗口 {args.batch_window * 1000:g}ms，客户端 {args.clients}")
+    print(f"请求 {len(latencies)} 个，耗时 {elapsed:.3f}s，吞吐 {len(latencies) / elapsed:.1f} 请求/s")
+    print(f"延迟 p50 {percentile(latencies, 0.5) * 1000:.2f}ms，p99 {percentile(latencies, 0.99) * 1000:.2f}ms，"
+          f"最大 {latencies[-1] * 1000:.2f}ms")
+    print(f"平均批大小 {service.batched_requests / max(service.batches, 1):.1f}，结果 {dict(statuses)}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size", type=int, default=60)
+    parser.add_argument("--density", type=float, default=0.2)
+    parser.add_argument("--op", choices=["plan", "candidates"], default="plan")
+    parser.add_argument("--candidates", type=int, default=3)
+    parser.add_argument("--w", type=float, default=1.2)
+    parser.add_argument("--clients", type=int, default=32, help="并发客户端数（每个客户端串行发送）")
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--timeout", type=float, default=None, help="每个请求的时限（秒）")
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--executor", choices=["thread", "process"], default="thread")
+    parser.add_argument("--batch-window", type=float, default=0.002)
+    parser.add_argument("--max-batch", type=int, default=32)
+    parser.add_argument("--max-pending", type=int, default=1024)
+    parser.add_argument("--socket", action="store_true")
+    parser.add_argument("--seed", type=int, default=0)
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,187 @@
+"""
+规划器基准套件：在可复现的场景上扫描 地图尺寸 × 密度 × 布局 × w × 候选数，记录性能指标，
+并与基线文件比较以发现回归。
+
+每个配置记录：扩展/生成/重开节点数、OPEN/FOCAL 峰值规模（FocalSearch.stats）、耗时、峰值内存（tracemalloc）、找到的路径数、路径次优比（相对 BFS 最短路）。
+candidates=1 时测 search_once(w)；candidates>1 时测 generate_candidate_paths（w_min=0, w_max=w, 固定 seed）。
+
+用法（在仓库根目录）：
+    python -m benchmarks.suite --sizes 20 50 --densities 0.1 0.2 --w 0.2 1.0 --candidates 1 5 \\
+        --json results.json --csv results.csv
+    python -m benchmarks.suite ... --save-baseline benchmarks/baseline.json   # 记录基线
+    python -m benchmarks.suite ... --baseline benchmarks/baseline.json        # 与基线比较，有回归时退出码为 1
+"""
+import argparse
+import csv
+import gc
+import json
+import platform
+import sys
+import time
+import tracemalloc
+from typing import Dict, List
+
+from focal_search import FocalSearch
+from search_stats import SearchStats
+from scenarios import Scenario, generate_scenarios, shortest_path_length
+
+# 指标名 -> 方向：+1 表示越小越好（增大即回归），-1 表示越大越好
+METRICS = {
+    "expansions": 1,
+    "generated": 1,
+    "wall_time": 1,
+    "peak_memory": 1,
+    "paths_found": -1,
+    "best_suboptimality": 1,
+    "mean_suboptimality": 1,
+}
+
+
+def _plan(scenario: Scenario, w: float, candidates: int, seed: int, stats: SearchStats = None):
+    planner = FocalSearch(scenario.grid_map, w)
+    planner.stats = stats
+    if candidates <= 1:
+        path = planner.search_once(scenario.start, scenario.goal)
+        paths = [path] if path else []
+    else:
+        paths = planner.generate_candidate_paths(
+            scenario.start, scenario.goal, candidate_num=candidates, max_tries=4 * candidates,
+            w_min=0.0, w_max=w, seed=seed
+        )
+    return paths
+
+
+def run_config(scenario: Scenario, w: float, candidates: int, repeat: int) -> Dict:
+    """运行一个配置：计时取 repeat 次中的最小值，峰值内存在预热后单独测一次，计数在开启统计的另一次运行中取得"""
+    best_time = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        paths = _plan(scenario, w, candidates, scenario.seed)
+        best_time = min(best_time, time.perf_counter() - t0)
+
+    # 峰值内存：先跑一次不计入的预热（惰性建立的邻接表等不计入），再清空循环垃圾，
+    # 使测量不随 repeat 及此前运行过的配置变化（否则取决于垃圾回收恰好在测量期间的哪一刻触发）
+    _plan(scenario, w, candidates, scenario.seed)
+    gc.collect()
+    tracemalloc.start()
+    _plan(scenario, w, candidates, scenario.seed)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    stats = SearchStats()
+    _plan(scenario, w, candidates, scenario.seed, stats)
+
+    optimal = shortest_path_length(scenario.grid_map, scenario.start, scenario.goal)
+    ratios = [(len(p) - 1) / optimal for p in paths] if optimal else []
+    return {
+        "key": f"{scenario.name}-w{w:g}-k{candidates}",
+        "layout": scenario.layout,
+        "size": scenario.size,
+        "density": scenario.density,
+        "seed": scenario.seed,
+        "w": w,
+        "candidates": candidates,
+        "expansions": stats.expansions,
+        "generated": stats.generated,
+        "reopenings": stats.reopenings,
+        "open_high_water": stats.open_high_water,
+        "focal_high_water": stats.focal_high_water,
+        "wall_time": best_time,
+        "peak_memory": peak,
+        "paths_found": len(paths),
+        "optimal_length": optimal,
+        "best_suboptimality": min(ratios) if ratios else None,
+        "mean_suboptimality": sum(ratios) / len(ratios) if ratios else None,
+    }
+
+
+def compare(
+    results: List[Dict], baseline: List[Dict], tolerance: float, time_tolerance: float, time_floor: float = 0.01
+) -> List[str]:
+    """
+    与基线逐配置比较，返回回归描述。
+    耗时噪声较大，单独使用 time_tolerance，且增量还须超过 time_floor 秒才算回归：
+    毫秒级的配置在调度抖动下相对波动常超过一倍，只看相对变化会误报。
+    """
+    reference = {r["key"]: r for r in baseline}
+    regressions = []
+    for result in results:
+        base = reference.get(result["key"])
+        if base is None:
+            continue
+        for metric, direction in METRICS.items():
+            new, old = result.get(metric), base.get(metric)
+            if new is None or old is None:
+                if old is not None and new is None:
+                    regressions.append(f"{result['key']}: {metric} 基线为 {old}，本次无结果")
+                continue
+            tol = time_tolerance if metric == "wall_time" else tolerance
+            if metric == "wall_time" and new - old <= time_floor:
+                continue
+            if direction > 0 and new > old * (1 + tol) + 1e-12:
+                regressions.append(f"{result['key']}: {metric} {old:.6g} -> {new:.6g}")
+            elif direction < 0 and new < old * (1 - tol) - 1e-12:
+                regressions.append(f"{result['key']}: {metric} {old:.6g} -> {new:.6g}")
+    return regressions
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[20, 50])
+    parser.add_argument("--densities", type=float, nargs="+", default=[0.1, 0.2])
+    parser.add_argument("--layouts", nargs="+", default=["uniform", "clustered"], choices=["uniform", "clustered"])
+    parser.add_argument("--w", type=float, nargs="+", default=[0.2, 1.0])
+    parser.add_argument("--candidates", type=int, nargs="+", default=[1, 5])
+    parser.add_argument("--seeds", type=int, nargs="+", default=[0])
+    parser.add_argument("--repeat", type=int, default=3, help="计时重复次数，取最小值")
+    parser.add_argument("--json", help="结果写入 JSON 文件")
+    parser.add_argument("--csv", help="结果写入 CSV 文件")
+    parser.add_argument("--baseline", help="与该基线 JSON 文件比较")
+    parser.add_argument("--save-baseline", help="把本次结果保存为基线 JSON 文件")
+    parser.add_argument("--tolerance", type=float, default=0.05, help="确定性指标允许的相对变化")
+    parser.add_argument("--time-tolerance", type=float, default=0.5, help="耗时允许的相对变化")
+    parser.add_argument("--time-floor", type=float, default=0.01, help="耗时增量不超过该秒数时不算回归")
+    args = parser.parse_args(argv)
+
+    results = []
+    header = f"{'配置':<40}{'扩展':>9}{'耗时(s)':>10}{'峰值(KiB)':>11}{'路径':>6}{'最佳比':>8}{'平均比':>8}"
+    print(header)
+    for scenario in generate_scenarios(args.sizes, args.densities, args.layouts, args.seeds):
+        for w in args.w:
+            for candidates in args.candidates:
+                r = run_config(scenario, w, candidates, args.repeat)
+                results.append(r)
+                fmt = lambda v: f"{v:.3f}" if v is not None else "-"
+                print(
+                    f"{r['key']:<40}{r['expansions']:>9}{r['wall_time']:>10.4f}{r['peak_memory'] / 1024:>11.1f}"
+                    f"{r['paths_found']:>6}{fmt(r['best_suboptimality']):>8}{fmt(r['mean_suboptimality']):>8}"
+                )
+
+    document = {
+        "meta": {"python": sys.version.split()[0], "platform": platform.platform(), "argv": sys.argv[1:]},
+        "results": results,
+    }
+    for path in filter(None, (args.json, args.save_baseline)):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(document, f, ensure_ascii=False, indent=2)
+    if args.csv:
+        with open(args.csv, "w", newline="", encoding="utf-8") as f:
+            writer = csv.DictWriter(f, fieldnames=list(results[0]) if results else [])
+            writer.writeheader()
+            writer.writerows(results)
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)["results"]
+        regressions = compare(results, baseline, args.tolerance, args.time_tolerance, args.time_floor)
+        if regressions:
+            print(f"\n发现 {len(regressions)} 项回归：")
+            for line in regressions:
+                print("  " + line)
+            return 1
+        print("\n与基线相比未发现回归")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
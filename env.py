@@ -1,8 +1,13 @@
+import hashlib
 import math
-from typing import List, Tuple, Dict, Optional, Union
+import mmap as _mmap
+import struct
+from typing import List, Tuple, Dict, Optional, Union, Iterable, NamedTuple
 from obsracle_generate import ObstacleGenerator
 
 class Node:
+    __slots__ = ("x", "y", "g", "h", "f", "focal_value", "parent", "visited")
+
     def __init__(self, x: int, y: int):
         self.x = x
         self.y = y
@@ -22,16 +27,123 @@ class Node:
         return self.x == other.x and self.y == other.y
 
 
+class ChangeSet(NamedTuple):
+    """一次（或一段时间内累计的）障碍物变更"""
+    version: int  # 变更后的地图版本号
+    added: List[Tuple[int, int]]  # 新增的障碍物
+    removed: List[Tuple[int, int]]  # 被移除的障碍物
+
+
+_INVERT = bytes([1] + [0] * 255)  # bytes.translate 表：0 -> 1，非 0 -> 0
+
+
+def _pack_rows(cells: bytes, width: int, height: int) -> bytearray:
+    """
+    每格一字节（非 0 = 置位）的行优先数组打包为按行对齐的位图：
+    每行占 (width+7)//8 字节，(x,y) 对应第 y 行第 x>>3 字节的第 x&7 位（小端位序）。
+    逐位拼接借助大整数运算完成，不逐格循环。
+    """
+    row_bytes = (width + 7) // 8
+    padded_width = row_bytes * 8
+    cells = bytes(cells).translate(_INVERT).translate(_INVERT)  # 规整为 0/1
+    if padded_width != width:
+        pad = bytes(padded_width - width)
+        cells = b"".join(cells[y * width:(y + 1) * width] + pad for y in range(height))
+    packed = 0
+    for k in range(8):
+        packed |= int.from_bytes(cells[k::8], "little") << k
+    return bytearray(packed.to_bytes(row_bytes * height, "little"))
+
+
+def _unpack_rows(bits, width: int, height: int) -> bytearray:
+    """_pack_rows 的逆过程：按行对齐的位图展开为每格一字节（0/1）的行优先数组"""
+    row_bytes = (width + 7) // 8
+    size = row_bytes * height
+    value = int.from_bytes(bits[:size], "little")
+    ones = int.from_bytes(b"\x01" * size, "little")
+    cells = bytearray(size * 8)
+    for k in range(8):
+        cells[k::8] = ((value >> k) & ones).to_bytes(size, "little")
+    padded_width = row_bytes * 8
+    if padded_width != width:
+        cells = bytearray(b"".join(cells[y * padded_width:y * padded_width + width] for y in range(height)))
+    return cells
+
+
+# -------------------------- 二进制地图文件格式 --------------------------
+# 文件头：魔数 b"FSGM"、格式版本 u16、保留标志 u16、宽 u32、高 u32、段数 u32（小端）
+# 随后是段表，每项：段类型 u32、偏移 u64、长度 u64；各段起始按 _SECTION_ALIGN 对齐，便于 mmap 零拷贝访问。
+# 占用段的布局与 GridMap._blocked 完全一致（按行对齐的位图，1=障碍物），打开时直接映射使用。
+_MAP_MAGIC = b"FSGM"
+_MAP_FORMAT_VERSION = 1
+_MAP_HEADER = struct.Struct("<4sHHIII")
+_MAP_SECTION = struct.Struct("<IQQ")
+_SECTION_ALIGN = 64
+SECTION_OCCUPANCY = 1  # 占用位图（必需）
+SECTION_NEIGHBOR_MASKS = 2  # 每格一字节的邻居方向掩码（可选，省去打开后的构建）
+SECTION_HEURISTIC_TABLES = 3  # 预计算的地标/目标距离表（可选，格式见 heuristics.HeuristicTables）
+
+
 class GridMap:
+    """
+    四连通、单位代价的栅格地图。
+
+    占用信息存成按行对齐的位图 _blocked（1 位/格，1=障碍物），
+    邻接关系预计算为每格一个方向掩码 _neighbor_masks（1 字节/格：bit0 左、bit1 右、bit2 上、bit3 下），
+    配合 16 组下标偏移 _neighbor_deltas，搜索热循环直接用 “下标 + 偏移” 得到可行邻居。
+    """
+
     def __init__(self, width: int, height: int, obstacles: List[Tuple[int, int]]):
         """原有构造方法：通过障碍物列表初始化（保持兼容）"""
-        self.width = width
-        self.height = height
-        self.grid = [[True for _ in range(width)] for _ in range(height)]  # True=可行，False=障碍物
+        row_bytes = (width + 7) // 8
+        blocked = bytearray(row_bytes * height)
         # 标记障碍物
         for (x, y) in obstacles:
-            if 0 <= x < self.width and 0 <= y < self.height:
-                self.grid[y][x] = False  # 注意：grid[y][x] 对应 (x,y) 栅格（y是行索引）
+            if 0 <= x < width and 0 <= y < height:
+                blocked[y * row_bytes + (x >> 3)] |= 1 << (x & 7)
+        self._setup(width, height, blocked)
+
+    def _setup(self, width: int, height: int, blocked, neighbor_masks=None, build_adjacency: bool = True):
+        """
+        blocked 可以是 bytearray，也可以是可写的 memoryview（如映射自地图文件）。
+        neighbor_masks 为 None 且 build_adjacency=False 时，邻接掩码推迟到第一次 adjacency() 调用再构建。
+        """
+        self.width = width
+        self.height = height
+        self._row_bytes = (width + 7) // 8
+        self._blocked = blocked  # 按行对齐的占用位图，1=障碍物
+        self._neighbor_deltas = tuple(
+            tuple(d for bit, d in enumerate((-1, 1, -width, width)) if mask >> bit & 1)
+            for mask in range(16)
+        )
+        self._neighbor_masks = neighbor_masks
+        if neighbor_masks is None and build_adjacency:
+            self._neighbor_masks = self._build_neighbor_masks()
+        self._mmap = None  # GridMap.open(mmap=True) 时持有映射对象，保证其生命周期不短于地图
+        self.sections: Dict[int, memoryview] = {}  # 从文件打开时读到的附加段
+        self.heuristic_tables = None  # 缓存的 heuristics.HeuristicTables，由 heuristics.get_tables 按需创建
+        self.jump_tables = None  # 缓存的 jump_points.JumpTables，由 jump_points.get_jump_tables 按需创建
+        self.version = 0  # 每次障碍物变更加 1，供增量重规划、缓存等判断地图是否变化
+        self._content_hash: Optional[Tuple[int, bytes]] = None  # (计算时的版本, 摘要)
+        # 变更日志：各条的版本号连续递增，_change_log[i].version == _log_start + i + 1；
+        # _log_start 之前（含）的变更已被 trim_changes 丢弃
+        self._change_log: List[ChangeSet] = []
+        self._log_start = 0
+
+    def _build_neighbor_masks(self) -> bytearray:
+        """一次性计算所有格子的邻居方向掩码（整图大整数位运算，不逐格循环）"""
+        width, height = self.width, self.height
+        size = width * height
+        free = int.from_bytes(_unpack_rows(self._blocked, width, height).translate(_INVERT), "little")
+        all_cells = (1 << (8 * size)) - 1
+        not_first_col = int.from_bytes((b"\x00" + b"\x01" * (width - 1)) * height, "little")
+        not_last_col = int.from_bytes((b"\x01" * (width - 1) + b"\x00") * height, "little")
+        left = (free << 8) & not_first_col
+        right = (free >> 8) & not_last_col
+        up = (free << (8 * width)) & all_cells
+        down = free >> (8 * width)
+        masks = left | (right << 1) | (up << 2) | (down << 3)
+        return bytearray(masks.to_bytes(size, "little"))
 
     @staticmethod
     def from_obstacle_generator(
@@ -39,6 +151,7 @@ class GridMap:
         gen_type: str = "count",  # 生成类型："count"（数量）、"density"（密度）、"clustered"（聚类）
         gen_value: Union[int, float] = 10,  # 对应类型的值：数量（int）、密度（float）
         seed: Optional[int] = None,
+        vectorized: bool = False,  # True：用 NumPy 掩码接口生成，适合大地图
         **kwargs  # 聚类专用参数：cluster_num、cluster_radius
     ) -> "GridMap":
         """
@@ -52,6 +165,8 @@ class GridMap:
                 - gen_type="density" 时：float 类型，障碍物密度（如 0.3 表示 30%）
                 - gen_type="clustered" 时：int 类型，总障碍物数量（如 20）
             seed: 随机种子（固定后复现相同障碍物）
+            vectorized: 为 True 时调用生成器的掩码接口（generate_mask 等），障碍物以数组形式直接
+                交给 from_mask，不经过坐标元组列表；同一 seed 下结果可复现，但与列表接口的结果不同
             **kwargs: 聚类专用参数（仅 gen_type="clustered" 时生效）：
                 - cluster_num: 聚类数量（如 4，默认 3）
                 - cluster_radius: 聚类半径（如 2，默认 2）
@@ -64,13 +179,15 @@ class GridMap:
             # 按数量生成：gen_value 为障碍物数量（int）
             if not isinstance(gen_value, int):
                 raise TypeError(f"gen_type='count' 时，gen_value 必须是整数，当前：{type(gen_value)}")
-            obstacles = generator.generate(obstacle_count=gen_value, seed=seed)
+            generate = generator.generate_mask if vectorized else generator.generate
+            obstacles = generate(obstacle_count=gen_value, seed=seed)
         
         elif gen_type == "density":
             # 按密度生成：gen_value 为密度（float）
             if not isinstance(gen_value, float):
                 raise TypeError(f"gen_type='density' 时，gen_value 必须是浮点数，当前：{type(gen_value)}")
-            obstacles = generator.generate_by_density(density=gen_value, seed=seed)
+            generate = generator.generate_mask_by_density if vectorized else generator.generate_by_density
+            obstacles = generate(density=gen_value, seed=seed)
         
         elif gen_type == "clustered":
             # 按聚类生成：gen_value 为总障碍物数量（int），需额外传 cluster_num 和 cluster_radius
@@ -78,7 +195,8 @@ class GridMap:
                 raise TypeError(f"gen_type='clustered' 时，gen_value 必须是整数，当前：{type(gen_value)}")
             cluster_num = kwargs.get("cluster_num", 3)
             cluster_radius = kwargs.get("cluster_radius", 2)
-            obstacles = generator.generate_clustered(
+            generate = generator.generate_clustered_mask if vectorized else generator.generate_clustered
+            obstacles = generate(
                 obstacle_count=gen_value,
                 cluster_num=cluster_num,
                 cluster_radius=cluster_radius,
@@ -89,16 +207,197 @@ class GridMap:
             raise ValueError(f"不支持的 gen_type：{gen_type}，可选值：'count'/'density'/'clustered'")
 
         # 用生成器的地图尺寸 + 生成的障碍物创建 GridMap
+        if vectorized:
+            return GridMap.from_mask(generator.map_width, generator.map_height, obstacles)
         return GridMap(
             width=generator.map_width,
             height=generator.map_height,
             obstacles=obstacles
         )
 
+    @staticmethod
+    def from_mask(width: int, height: int, mask) -> "GridMap":
+        """
+        通过障碍物掩码创建地图：mask 为按行展开的 width*height 个字节（非 0 = 障碍物），
+        可以是 bytes/bytearray/memoryview 等任意字节缓冲区，也可以是 C 连续的 (height, width) bool/uint8 数组
+        """
+        mask = memoryview(mask).cast('B')
+        if len(mask) != width * height:
+            raise ValueError(f"掩码长度必须为 width*height={width * height}，当前：{len(mask)}")
+        grid_map = GridMap.__new__(GridMap)
+        grid_map._setup(width, height, _pack_rows(mask, width, height))
+        return grid_map
+
+    def to_mask(self) -> bytearray:
+        """导出障碍物掩码（与 from_mask 格式一致：1=障碍物，0=可行）"""
+        return _unpack_rows(self._blocked, self.width, self.height)
+
+    # -------------------------- 文件读写 --------------------------
+    def save(self, path: str, include_adjacency: bool = True, extra_sections: Optional[Dict[int, bytes]] = None):
+        """
+        保存为二进制地图文件（格式见文件头注释）。
+        :param include_adjacency: 是否同时写入邻居方向掩码段，打开后无需重新构建
+        :param extra_sections: 附加段 {段类型: 内容}，如预计算的启发式表
+        """
+        sections = [(SECTION_OCCUPANCY, bytes(self._blocked))]
+        if include_adjacency:
+            sections.append((SECTION_NEIGHBOR_MASKS, bytes(self.adjacency()[0])))
+        for kind, payload in (extra_sections or {}).items():
+            sections.append((kind, bytes(payload)))
+
+        offset = _MAP_HEADER.size + _MAP_SECTION.size * len(sections)
+        table, layout = [], []
+        for kind, payload in sections:
+            offset = -(-offset // _SECTION_ALIGN) * _SECTION_ALIGN
+            table.append(_MAP_SECTION.pack(kind, offset, len(payload)))
+            layout.append((offset, payload))
+            offset += len(payload)
+
+        with open(path, "wb") as f:
+            f.write(_MAP_HEADER.pack(_MAP_MAGIC, _MAP_FORMAT_VERSION, 0, self.width, self.height, len(sections)))
+            f.write(b"".join(table))
+            for section_offset, payload in layout:
+                f.write(bytes(section_offset - f.tell()))
+                f.write(payload)
+
+    @staticmethod
+    def open(path: str, mmap: bool = True) -> "GridMap":
+        """
+        打开 save() 写出的地图文件。
+        mmap=True 时以写时复制方式映射文件：占用位图与邻接掩码直接引用映射内存，打开近乎瞬时，
+        同一主机上打开同一文件的多个进程共享物理页；之后的 add_obstacles 等修改只影响本进程，不写回文件。
+        mmap=False 时把文件整体读入内存。
+        """
+        with open(path, "rb") as f:
+            if mmap:
+                data = memoryview(_mmap.mmap(f.fileno(), 0, access=_mmap.ACCESS_COPY))
+            else:
+                data = memoryview(bytearray(f.read()))
+        magic, version, _, width, height, count = _MAP_HEADER.unpack_from(data, 0)
+        if magic != _MAP_MAGIC:
+            raise ValueError(f"不是地图文件（魔数不符）：{path}")
+        if version != _MAP_FORMAT_VERSION:
+            raise ValueError(f"不支持的地图文件版本：{version}，当前支持：{_MAP_FORMAT_VERSION}")
+        sections = {}
+        for i in range(count):
+            kind, offset, length = _MAP_SECTION.unpack_from(data, _MAP_HEADER.size + i * _MAP_SECTION.size)
+            sections[kind] = data[offset:offset + length]
+        if SECTION_OCCUPANCY not in sections:
+            raise ValueError(f"地图文件缺少占用位图段：{path}")
+        blocked = sections.pop(SECTION_OCCUPANCY)
+        if len(blocked) != (width + 7) // 8 * height:
+            raise ValueError(f"占用位图长度与地图尺寸 {width}x{height} 不符：{path}")
+        neighbor_masks = sections.pop(SECTION_NEIGHBOR_MASKS, None)
+
+        grid_map = GridMap.__new__(GridMap)
+        grid_map._setup(width, height, blocked, neighbor_masks, build_adjacency=False)
+        grid_map._mmap = data.obj if mmap else None
+        grid_map.sections = sections  # 其余（附加）段，按段类型索引
+        return grid_map
+
+    def content_hash(self) -> bytes:
+        """
+        地图内容（尺寸 + 占用位图）的 16 字节摘要：内容相同的地图摘要相同，与版本号、来源无关；
+        按版本缓存，地图不变时重复调用不再重新计算
+        """
+        cached = self._content_hash
+        if cached is not None and cached[0] == self.version:
+            return cached[1]
+        digest = hashlib.blake2b(struct.pack("<II", self.width, self.height), digest_size=16)
+        digest.update(self._blocked)
+        self._content_hash = (self.version, digest.digest())
+        return self._content_hash[1]
+
+    # -------------------------- 动态障碍物 --------------------------
+    def add_obstacles(self, cells: Iterable[Tuple[int, int]]) -> ChangeSet:
+        """把 cells 标为障碍物，返回实际发生的变更（已是障碍物或越界的栅格被忽略）"""
+        return self._apply_change(cells, True)
+
+    def remove_obstacles(self, cells: Iterable[Tuple[int, int]]) -> ChangeSet:
+        """把 cells 恢复为可行，返回实际发生的变更（本就可行或越界的栅格被忽略）"""
+        return self._apply_change(cells, False)
+
+    @property
+    def oldest_version(self) -> int:
+        """changes_since 可接受的最小版本（更早的变更已被 trim_changes 丢弃）"""
+        return self._log_start
+
+    def changes_since(self, version: int) -> ChangeSet:
+        """
+        汇总 version 之后的净变更（同一栅格先加后删等相互抵消的变更会被消去），
+        返回的 ChangeSet.version 为当前版本。
+        只遍历 version 之后的日志条目（版本号连续，直接按下标定位），耗时与地图的变更历史总长无关；
+        version 早于 oldest_version 时所需的变更已被丢弃，抛出 ValueError，调用方应改为整体重建。
+        """
+        if version < self._log_start:
+            raise ValueError(f"版本 {version} 之后的变更已被丢弃，最早可查询版本：{self._log_start}")
+        first_event: Dict[Tuple[int, int], bool] = {}  # 栅格在 version 之后的第一次变更：True=新增
+        log = self._change_log
+        for i in range(max(version - self._log_start, 0), len(log)):
+            change = log[i]
+            for cell in change.added:
+                first_event.setdefault(cell, True)
+            for cell in change.removed:
+                first_event.setdefault(cell, False)
+        added = [c for c, was_added in first_event.items() if was_added and not self.is_valid(*c)]
+        removed = [c for c, was_added in first_event.items() if not was_added and self.is_valid(*c)]
+        return ChangeSet(self.version, added, removed)
+
+    def trim_changes(self, before_version: int) -> int:
+        """
+        丢弃版本不超过 before_version 的变更日志条目，返回丢弃的条数。
+        长期运行的地图应在所有使用者（IncrementalReplanner、HierarchicalPlanner 等）都已同步到 before_version 之后调用；
+        仍停留在更早版本的使用者下次查询时会退回整体重建。
+        """
+        count = min(before_version, self.version) - self._log_start
+        if count <= 0:
+            return 0
+        del self._change_log[:count]
+        self._log_start += count
+        return count
+
+    def _apply_change(self, cells: Iterable[Tuple[int, int]], blocked: bool) -> ChangeSet:
+        row_bytes, width = self._row_bytes, self.width
+        changed = []
+        for (x, y) in cells:
+            if not (0 <= x < width and 0 <= y < self.height):
+                continue
+            byte, bit = y * row_bytes + (x >> 3), 1 << (x & 7)
+            if bool(self._blocked[byte] & bit) == blocked:
+                continue
+            if blocked:
+                self._blocked[byte] |= bit
+            else:
+                self._blocked[byte] &= ~bit & 0xFF
+            changed.append((x, y))
+        if not changed:
+            return ChangeSet(self.version, [], [])
+        # 只有变更栅格的四个邻居的方向掩码会变
+        for (x, y) in changed:
+            self._refresh_neighbor_mask(x - 1, y)
+            self._refresh_neighbor_mask(x + 1, y)
+            self._refresh_neighbor_mask(x, y - 1)
+            self._refresh_neighbor_mask(x, y + 1)
+        self.version += 1
+        change = ChangeSet(self.version, changed, []) if blocked else ChangeSet(self.version, [], changed)
+        self._change_log.append(change)
+        return change
+
+    def _refresh_neighbor_mask(self, x: int, y: int):
+        if self._neighbor_masks is None or not (0 <= x < self.width and 0 <= y < self.height):
+            return
+        is_valid = self.is_valid
+        self._neighbor_masks[y * self.width + x] = (
+            is_valid(x - 1, y) | is_valid(x + 1, y) << 1 | is_valid(x, y - 1) << 2 | is_valid(x, y + 1) << 3
+        )
+
     # -------------------------- 原有辅助方法（保持不变） --------------------------
     def is_valid(self, x: int, y: int) -> bool:
         """判断 (x,y) 栅格是否可行（在地图内 + 非障碍物）"""
-        return 0 <= x < self.width and 0 <= y < self.height and self.grid[y][x]
+        return (
+            0 <= x < self.width and 0 <= y < self.height
+            and not self._blocked[y * self._row_bytes + (x >> 3)] >> (x & 7) & 1
+        )
 
     def get_neighbors(self, node: "Node", node_map: dict) -> List["Node"]:
         """获取节点的可行邻居（四方向移动，复用已存在节点）"""
@@ -108,7 +407,38 @@ class GridMap:
             x, y = node.x + dx, node.y + dy
             if self.is_valid(x, y):
                 key = (x, y)
-                neighbor = node_map[key] if key in node_map else Node(x, y)
-                neighbor.g = node.g + 1.0
+                if key in node_map:
+                    # 已有节点不在此处改写 g：是否更优由搜索比较后再更新
+                    neighbor = node_map[key]
+                else:
+                    neighbor = Node(x, y)
+                    neighbor.g = node.g + 1.0
                 neighbors.append(neighbor)
-        return neighbors
\ No newline at end of file
+        return neighbors
+
+    def in_bounds(self, x: int, y: int) -> bool:
+        """(x,y) 是否在地图范围内（不论是否为障碍物）"""
+        return 0 <= x < self.width and 0 <= y < self.height
+
+    def index(self, x: int, y: int) -> int:
+        """(x,y) 栅格在扁平数组（如 SearchState）中的下标；不做越界检查，调用方需先确认坐标在地图内"""
+        return y * self.width + x
+
+    def coord(self, index: int) -> Tuple[int, int]:
+        """扁平下标还原为 (x,y)"""
+        return index % self.width, index // self.width
+
+    def get_neighbor_indices(self, index: int) -> List[int]:
+        """按下标获取可行邻居下标（四方向，顺序与 get_neighbors 一致），供 SearchState 使用"""
+        masks, deltas = self.adjacency()
+        return [index + delta for delta in deltas[masks[index]]]
+
+    def adjacency(self) -> Tuple[bytearray, Tuple[Tuple[int, ...], ...]]:
+        """
+        预计算的邻接表 (masks, deltas)：下标 i 的可行邻居为 [i + d for d in deltas[masks[i]]]。
+        地图构造时建好（从文件打开且文件中没有邻接段时，在第一次调用时构建），所有查询共享；
+        搜索热循环直接使用，不再逐方向做边界与障碍物检查。
+        """
+        if self._neighbor_masks is None:
+            self._neighbor_masks = self._build_neighbor_masks()
+        return self._neighbor_masks, self._neighbor_deltas
@@ -1,120 +1,727 @@
-from typing import List, Tuple, Dict, Optional
-import heapq
-from env import Node, GridMap
+from env import GridMap
+from search_state import SearchContext, SearchState, INF
+from search_stats import SearchStats, TryStats
+from heuristics import HeuristicTables, get_tables
+from path_cache import MISS, PathCache
+from path_codec import DiversityIndex, PackedPath
+from jump_points import START_DIRS, fill_segments, get_jump_tables, step_back
 import math
+import multiprocessing
 import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from multiprocessing import shared_memory
+from typing import List, Tuple, Dict, Optional, Callable, Iterable, Iterator, NamedTuple
 
-import heapq
-import random
-from typing import List, Tuple, Dict, Optional, Callable
+
+class SearchResult(NamedTuple):
+    """search_many 单个查询的结果"""
+    start: Tuple[int, int]
+    goal: Tuple[int, int]
+    path: Optional[List[Tuple[int, int]]]
+    expansions: int  # 扩展（出 FOCAL）的节点数
+    latency: float  # 该查询的耗时（秒）
+
+
+class TryParams(NamedTuple):
+    """generate_candidate_paths 单次随机化尝试的参数"""
+    w: float
+    dir_weight: float
+    noise_seed: int
 
 
 
 
 class FocalSearch:
-    def __init__(self, grid_map, w: float = 1.2):
+    HEURISTICS = ("manhattan", "landmarks")
+
+    def __init__(
+        self,
+        grid_map,
+        w: float = 1.2,
+        heuristic: str = "manhattan",
+        landmark_count: int = 8,
+        bidirectional: bool = False,
+        jump_points: bool = False
+    ):
+        """
+        :param heuristic: 默认启发式。"manhattan"：曼哈顿距离；"landmarks"：预计算的地标（ALT）下界，
+            终点登记过精确表时直接用真实距离（见 heuristics.HeuristicTables）。表缓存在地图上，同图的规划器共享
+        :param landmark_count: 地图上还没有启发式表时，新建表使用的地标数
+        :param bidirectional: 双向搜索：从起点和终点同时搜索、在中间相遇（见 _search_bidirectional_in），
+            对所有查询方式（含候选路径生成）生效
+        :param jump_points: 跳点剪枝：只在跳点上搜索，跳过开阔区域中大量等价的对称路径（见 _search_jump_points_in）；
+            不能与 bidirectional 同时使用；候选路径生成不受影响，仍逐格扩展（见 _run_try）
+        """
+        if heuristic not in self.HEURISTICS:
+            raise ValueError(f"不支持的 heuristic：{heuristic}，可选值：{self.HEURISTICS}")
+        if bidirectional and jump_points:
+            raise ValueError("bidirectional 与 jump_points 不能同时开启")
         self.grid_map = grid_map
         self.w = w
-        self.open = []
-        self.focal = []
-        self.node_map: Dict[Tuple[int, int], Node] = {}
-        self.f_min = float('inf')
-
-    def _calculate_heuristic(self, node: Node, goal: Node) -> float:
+        self.heuristic = heuristic
+        self.bidirectional = bidirectional
+        self.jump_points = jump_points
+        self.heuristic_tables: Optional[HeuristicTables] = None
+        if heuristic == "landmarks":
+            self.heuristic_tables = get_tables(grid_map, landmark_count)
+            self._calculate_heuristic = self.heuristic_tables.estimate
+        # 空闲的 SearchContext，供后续搜索复用缓冲区；每次搜索独占一个上下文，规划器可被多线程共享
+        self._contexts: List[SearchContext] = []
+        self._contexts_lock = threading.Lock()
+        # 可选的统计与回调（默认关闭）：
+        #   stats：SearchStats 实例，累计各次搜索与各次候选尝试的计数
+        #   on_expand(pos, g, f)：每扩展一个节点调用一次
+        #   on_solution(path, expansions)：每次搜索找到路径时调用
+        self.stats: Optional[SearchStats] = None
+        self.on_expand: Optional[Callable[[Tuple[int, int], float, float], None]] = None
+        self.on_solution: Optional[Callable[[List[Tuple[int, int]], int], None]] = None
+        self._stats_lock = threading.Lock()
+        # 可选的结果缓存（默认关闭）：PathCache 实例，缓存使用默认启发式/二次排序的查询结果，
+        # 以及给定 seed 的候选路径生成结果；地图内容变化后自动失效
+        self.cache: Optional[PathCache] = None
+
+    def _calculate_heuristic(self, pos: Tuple[int, int], goal: Tuple[int, int]) -> float:
         # 曼哈顿距离
-        return abs(node.x - goal.x) + abs(node.y - goal.y)
+        return abs(pos[0] - goal[0]) + abs(pos[1] - goal[1])
 
-    def _dir_consistency(self, node: Node, goal: Node) -> float:
-        if node.parent is None:
+    def _dir_consistency(
+        self, pos: Tuple[int, int], parent_pos: Optional[Tuple[int, int]], goal: Tuple[int, int]
+    ) -> float:
+        if parent_pos is None:
             return 0.0
-        dir_parent = (node.x - node.parent.x, node.y - node.parent.y)
+        dir_parent = (pos[0] - parent_pos[0], pos[1] - parent_pos[1])
         dir_goal = (
-            0 if node.x == goal.x else (1 if node.x < goal.x else -1),
-            0 if node.y == goal.y else (1 if node.y < goal.y else -1)
+            0 if pos[0] == goal[0] else (1 if pos[0] < goal[0] else -1),
+            0 if pos[1] == goal[1] else (1 if pos[1] < goal[1] else -1)
         )
         return 1.0 if dir_parent == dir_goal else 0.0
 
-    def _calculate_focal_value(self, node: Node, goal: Node) -> float:
+    def _calculate_focal_value(
+        self, pos: Tuple[int, int], parent_pos: Optional[Tuple[int, int]], g: float, goal: Tuple[int, int]
+    ) -> float:
         """默认的二次排序值计算"""
-        dir_consistency = self._dir_consistency(node, goal)
+        dir_consistency = self._dir_consistency(pos, parent_pos, goal)
         max_g = self.grid_map.width + self.grid_map.height
-        normalized_g = node.g / max_g if max_g != 0 else 0.0
+        normalized_g = g / max_g if max_g != 0 else 0.0
         # 因为排序时希望较小的 focal_value 优先扩展（可以改成直接取负数排序）
         return 1.0 - (0.6 * dir_consistency + 0.4 * (1 - normalized_g))
 
-    def _update_focal(self):
-        """更新 Focal 集合"""
-        self.focal = []
-        if not self.open:
-            return
-        unvisited_nodes = [n for n in self.open if not n.visited]
-        if not unvisited_nodes:
-            return
-        self.f_min = min(n.f for n in unvisited_nodes)
-        self.focal = [n for n in unvisited_nodes if n.f <= (self.w +1) * self.f_min]
-        self.focal.sort(key=lambda x: x.focal_value)
-
-    def _backtrack_path(self, goal_node: Node) -> List[Tuple[int, int]]:
-        path = []
-        current = goal_node
-        while current:
-            path.append((current.x, current.y))
-            current = current.parent
-        return path[::-1]
-
-    def search_once(self, start: Tuple[int, int], goal: Tuple[int, int]) -> Optional[List[Tuple[int, int]]]:
-        """单次搜索，返回一条路径"""
-        start_node = Node(start[0], start[1])
-        goal_node = Node(goal[0], goal[1])
-
-        start_node.h = self._calculate_heuristic(start_node, goal_node)
-        start_node.f = start_node.g + start_node.h
-        start_node.focal_value = self._calculate_focal_value(start_node, goal_node)
-
-        self.open = []
-        heapq.heappush(self.open, start_node)
-        self.node_map = {(start[0], start[1]): start_node}
-        self.f_min = start_node.f
-
-        while self.open:
-            self._update_focal()
-            if not self.focal:
-                continue
-
-            current = self.focal[0]
-            current.visited = True
-
-            if current == goal_node:
-                return self._backtrack_path(current)
-
-            neighbors = self.grid_map.get_neighbors(current, self.node_map)
-            for neighbor in neighbors:
-                if neighbor.visited:
+    def _acquire_context(self) -> SearchContext:
+        """取出一个空闲上下文（O(touched) 复位后复用）；没有空闲或地图尺寸变化时新建"""
+        width, height = self.grid_map.width, self.grid_map.height
+        with self._contexts_lock:
+            context = self._contexts.pop() if self._contexts else None
+        if context is None or not context.fits(width, height):
+            return SearchContext(width, height)
+        context.reset()
+        return context
+
+    def _release_context(self, context: SearchContext):
+        with self._contexts_lock:
+            self._contexts.append(context)
+
+    def _backtrack_path(
+        self, state: SearchState, goal_index: int, backward_state: Optional[SearchState] = None
+    ) -> List[Tuple[int, int]]:
+        """
+        回溯路径。双向搜索时 goal_index 为相遇点：前向部分从起点回溯到相遇点，
+        后向部分（backward_state）从相遇点沿 parent 走到终点，两段拼接后剪掉可能出现的环。
+        """
+        coord = self.grid_map.coord
+        indices = state.backtrack(goal_index)
+        if backward_state is not None:
+            indices += backward_state.backtrack(goal_index)[-2::-1]
+            # 两段可能经过同一栅格：从该栅格第一次出现处直接跳到最后一次出现处，路径只会变短
+            last = {index: k for k, index in enumerate(indices)}
+            if len(last) != len(indices):
+                simple, k = [], 0
+                while k < len(indices):
+                    simple.append(indices[k])
+                    k = last[indices[k]] + 1
+                indices = simple
+        return [coord(i) for i in indices]
+
+    def search_once(
+        self,
+        start: Tuple[int, int],
+        goal: Tuple[int, int],
+        heuristic: Optional[Callable] = None,
+        focal_fn: Optional[Callable] = None,
+        w: Optional[float] = None
+    ) -> Optional[List[Tuple[int, int]]]:
+        """
+        单次搜索，返回一条路径。
+        heuristic(pos, goal)、focal_fn(pos, parent_pos, g, goal) 与 w 只作用于本次调用，缺省用实例默认值；
+        可在多个线程中对同一实例并发调用。
+        """
+        return self._search_cached(start, goal, heuristic, focal_fn, w)[0]
+
+    def search_many(
+        self, queries: Iterable[Tuple[Tuple[int, int], Tuple[int, int]]]
+    ) -> Iterator[SearchResult]:
+        """
+        批量查询：依次处理 (start, goal) 对，逐个产出 SearchResult。
+        同一地图上的查询共享 SearchState 缓冲区与地图预计算的邻接表，不再为每次查询重新分配。
+        """
+        for start, goal in queries:
+            t0 = time.perf_counter()
+            path, expansions = self._search_cached(start, goal)
+            yield SearchResult(start, goal, path, expansions, time.perf_counter() - t0)
+
+    def search_concurrent(
+        self,
+        queries: Iterable[Tuple[Tuple[int, int], Tuple[int, int]]],
+        max_workers: Optional[int] = None,
+        heuristic: Optional[Callable] = None,
+        focal_fn: Optional[Callable] = None,
+        w: Optional[float] = None
+    ) -> List[SearchResult]:
+        """
+        用线程池并发处理一批 (start, goal) 查询，结果顺序与 queries 一致。
+        所有线程共享本规划器与地图，每个查询各用一个 SearchContext。
+        """
+        def run(query) -> SearchResult:
+            start, goal = query
+            t0 = time.perf_counter()
+            path, expansions = self._search_cached(start, goal, heuristic, focal_fn, w)
+            return SearchResult(start, goal, path, expansions, time.perf_counter() - t0)
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            return list(executor.map(run, queries))
+
+    def _cache_key(self, kind: str, start: Tuple[int, int], goal: Tuple[int, int], *params) -> tuple:
+        """查询的缓存键；同时按地图摘要校验缓存（地图内容变了则先清空）"""
+        map_hash = self.grid_map.content_hash()
+        self.cache.validate(map_hash)
+        tables = self.heuristic_tables
+        heuristic_key = ("manhattan",) if tables is None else tables.signature(goal)
+        if self.bidirectional:
+            heuristic_key += ("bidirectional",)
+        if self.jump_points:
+            heuristic_key += ("jump_points",)
+        # 键里也带上摘要：搜索期间地图被其他线程修改时，旧地图上的结果不会被新地图的查询命中
+        return (map_hash, kind, start, goal, heuristic_key) + params
+
+    def _search_cached(
+        self,
+        start: Tuple[int, int],
+        goal: Tuple[int, int],
+        heuristic: Optional[Callable] = None,
+        focal_fn: Optional[Callable] = None,
+        w: Optional[float] = None
+    ) -> Tuple[Optional[List[Tuple[int, int]]], int]:
+        """
+        先查结果缓存的 _search：只缓存使用实例默认启发式与二次排序的查询（自定义函数无法作为键），
+        命中时不搜索，扩展数记为 0
+        """
+        cache = self.cache
+        if cache is None:
+            return self._search(start, goal, heuristic, focal_fn, w)
+        if heuristic is not None or focal_fn is not None:
+            cache.bypass()
+            return self._search(start, goal, heuristic, focal_fn, w)
+        w = self.w if w is None else w
+        key = self._cache_key("once", start, goal, w)
+        cached = cache.get(key)
+        if cached is not MISS:
+            return (None if cached is None else cached.cells()), 0
+        path, expansions = self._search(start, goal, None, None, w)
+        packed = None if path is None else PackedPath.from_cells(path)
+        cache.put(key, packed, 0 if packed is None else packed.nbytes)
+        return path, expansions
+
+    def _search(
+        self,
+        start: Tuple[int, int],
+        goal: Tuple[int, int],
+        heuristic: Optional[Callable] = None,
+        focal_fn: Optional[Callable] = None,
+        w: Optional[float] = None,
+        max_expansions: Optional[int] = None,
+        deadline: Optional[float] = None,
+        start_g: float = 0.0,
+        blocked: Iterable[Tuple[int, int]] = (),
+        per_cell: bool = False
+    ) -> Tuple[Optional[List[Tuple[int, int]]], int]:
+        """
+        单次搜索的实现，返回 (路径, 扩展节点数)。
+        heuristic / focal_fn / w 缺省时使用实例上的默认值；显式传入则只作用于本次搜索，不改动实例。
+        扩展数达到 max_expansions 或 time.monotonic() 超过 deadline 时放弃，返回 (None, 已扩展数)。
+        start_g 为起点的初始代价（从已有路径中途分叉时取前缀长度），blocked 中的栅格本次视为不可通行。
+        per_cell=True 时即使开启了 jump_points 也逐格扩展（候选路径生成使用，见 _run_try）。
+        start / goal 超出地图范围时抛出 ValueError（扁平下标会落到别的栅格上，不能当作普通的不可达处理）。
+        """
+        for x, y in (start, goal):
+            if not self.grid_map.in_bounds(x, y):
+                raise ValueError(f"栅格 ({x},{y}) 超出地图范围 {self.grid_map.width}x{self.grid_map.height}")
+        heuristic = heuristic or self._calculate_heuristic
+        focal_fn = focal_fn or self._calculate_focal_value
+        w = self.w if w is None else w
+        context = self._acquire_context()
+        try:
+            if self.jump_points and not blocked and not per_cell:
+                return self._search_jump_points_in(
+                    context, start, goal, heuristic, focal_fn, w, max_expansions, deadline, start_g
+                )
+            if not self.bidirectional:
+                return self._search_in(
+                    context, start, goal, heuristic, focal_fn, w, max_expansions, deadline, start_g, blocked
+                )
+            backward = self._acquire_context()
+            try:
+                return self._search_bidirectional_in(
+                    context, backward, start, goal, heuristic, focal_fn, w, max_expansions, deadline, start_g, blocked
+                )
+            finally:
+                self._release_context(backward)
+        finally:
+            self._release_context(context)
+
+    def _search_in(
+        self,
+        context: SearchContext,
+        start: Tuple[int, int],
+        goal: Tuple[int, int],
+        heuristic: Callable,
+        focal_fn: Callable,
+        w: float,
+        max_expansions: Optional[int] = None,
+        deadline: Optional[float] = None,
+        start_g: float = 0.0,
+        blocked: Iterable[Tuple[int, int]] = ()
+    ) -> Tuple[Optional[List[Tuple[int, int]]], int]:
+        """在给定（已复位的）上下文中执行搜索"""
+        grid_map = self.grid_map
+        neighbor_masks, neighbor_deltas = grid_map.adjacency()
+        state = context.state
+        g_arr, h_arr, f_arr = state.g, state.h, state.f
+        focal_arr, parent_arr, visited = state.focal_value, state.parent, state.visited
+        coord = grid_map.coord
+
+        start_index = grid_map.index(start[0], start[1])
+        goal_index = grid_map.index(goal[0], goal[1])
+
+        for x, y in blocked:
+            # 借用 visited 标记屏蔽栅格；登记到 touched 以便 reset 时一并清除
+            blocked_index = grid_map.index(x, y)
+            visited[blocked_index] = 1
+            state.touched.append(blocked_index)
+        first_generated = len(state.touched)
+
+        state.generate(start_index, start_g)
+        h_arr[start_index] = heuristic(start, goal)
+        f_arr[start_index] = start_g + h_arr[start_index]
+        focal_arr[start_index] = focal_fn(start, None, start_g, goal)
+
+        context.f_min = f_arr[start_index]
+        context.bound = (w + 1) * context.f_min
+        context.push_open(start_index)
+        expansions = 0
+        reopenings = 0
+        path = None
+
+        stats, on_expand = self.stats, self.on_expand
+        instrumented = stats is not None or on_expand is not None
+        open_high_water = focal_high_water = 0
+        focal_time = expand_time = 0.0
+        perf_counter = time.perf_counter
+
+        while context.open:
+            if max_expansions is not None and expansions >= max_expansions:
+                break
+            # 每 256 次扩展读一次时钟，避免计时本身拖慢热循环
+            if deadline is not None and not expansions & 0xFF and time.monotonic() >= deadline:
+                break
+            if instrumented:
+                open_high_water = max(open_high_water, len(context.open))
+                focal_high_water = max(focal_high_water, len(context.focal))
+                t0 = perf_counter()
+            context.update_focal(w)
+            current = context.pop_focal()
+            if instrumented:
+                t1 = perf_counter()
+                focal_time += t1 - t0
+            if current is None:
+                break
+            visited[current] = 1
+            expansions += 1
+            if on_expand is not None:
+                on_expand(coord(current), g_arr[current], f_arr[current])
+
+            if current == goal_index:
+                path = self._backtrack_path(state, current)
+                break
+
+            new_g = g_arr[current] + 1.0
+            for delta in neighbor_deltas[neighbor_masks[current]]:
+                neighbor = current + delta
+                if visited[neighbor]:
                     continue
-                neighbor.h = self._calculate_heuristic(neighbor, goal_node)
-                new_f = neighbor.g + neighbor.h
-                key = (neighbor.x, neighbor.y)
-
-                if key not in self.node_map:
-                    neighbor.f = new_f
-                    neighbor.focal_value = self._calculate_focal_value(neighbor, goal_node)
-                    neighbor.parent = current
-                    self.node_map[key] = neighbor
-                    heapq.heappush(self.open, neighbor)
-                    if neighbor.f < self.f_min:
-                        self.f_min = neighbor.f
-                else:# 可能出现一条路径重复经过两次同一个节点的情况
-                    existing = self.node_map[key]
-                    if neighbor.g < existing.g:
-                        existing.g = neighbor.g
-                        existing.f = existing.g + existing.h
-                        existing.focal_value = self._calculate_focal_value(existing, goal_node)
-                        existing.parent = current
-                        heapq.heappush(self.open, existing)
-                        if existing.f < self.f_min:
-                            self.f_min = existing.f
-
-        return None
+                pos = coord(neighbor)
+
+                if g_arr[neighbor] == INF:
+                    # 新节点：focal_value 在设置父节点之前计算（与原实现一致）
+                    state.generate(neighbor, new_g)
+                    h_arr[neighbor] = heuristic(pos, goal)
+                    f_arr[neighbor] = new_g + h_arr[neighbor]
+                    focal_arr[neighbor] = focal_fn(pos, None, new_g, goal)
+                    parent_arr[neighbor] = current
+                    context.push_open(neighbor)
+                elif new_g < g_arr[neighbor]:# 可能出现一条路径重复经过两次同一个节点的情况
+                    context.remove_open(neighbor)
+                    g_arr[neighbor] = new_g
+                    f_arr[neighbor] = new_g + h_arr[neighbor]
+                    focal_arr[neighbor] = focal_fn(pos, coord(parent_arr[neighbor]), new_g, goal)
+                    parent_arr[neighbor] = current
+                    context.push_open(neighbor)
+                    reopenings += 1
+            if instrumented:
+                expand_time += perf_counter() - t1
+
+        if stats is not None:
+            generated = len(state.touched) - first_generated
+            with self._stats_lock:
+                stats.merge_search(
+                    path is not None, expansions, generated, reopenings,
+                    open_high_water, focal_high_water, focal_time, expand_time
+                )
+        if path is not None and self.on_solution is not None:
+            self.on_solution(path, expansions)
+        return path, expansions
+
+    def _search_jump_points_in(
+        self,
+        context: SearchContext,
+        start: Tuple[int, int],
+        goal: Tuple[int, int],
+        heuristic: Callable,
+        focal_fn: Callable,
+        w: float,
+        max_expansions: Optional[int] = None,
+        deadline: Optional[float] = None,
+        start_g: float = 0.0
+    ) -> Tuple[Optional[List[Tuple[int, int]]], int]:
+        """
+        跳点剪枝的 focal 搜索：后继由 jump_points.JumpTables 给出（同行/同列上的下一个跳点，边代价为格数），
+        OPEN/FOCAL、界限与平局裁决与 _search_in 相同。
+
+        剪枝依赖节点的到达方向，而 focal 搜索会以非最优的 g 先扩展节点：同一节点之后经新的方向到达、
+        且新方向需要尚未做过的跳跃时，让节点重新进入 OPEN，只补做这些跳跃，保证跳点图上可达的路径不会被剪掉。
+        二次排序函数收到的 parent_pos 是跳跃线段上的前一格，方向一致性的含义与逐格搜索相同。
+        屏蔽栅格（blocked）不在预计算的位图中，因此带 blocked 的搜索退回逐格的 _search_in。
+        """
+        grid_map = self.grid_map
+        tables = get_jump_tables(grid_map)
+        state = context.state
+        g_arr, h_arr, f_arr = state.g, state.h, state.f
+        focal_arr, parent_arr, visited = state.focal_value, state.parent, state.visited
+        width = grid_map.width
+        coord = grid_map.coord
+        successors, jump_dirs = tables.successors, tables.jump_dirs
+
+        start_index = grid_map.index(start[0], start[1])
+        goal_index = grid_map.index(goal[0], goal[1])
+        arrived = {start_index: START_DIRS}  # 节点下标 -> 已知的到达方向位
+        jumped = {}  # 节点下标 -> 已做过的跳跃方向位
+        first_generated = len(state.touched)
+
+        state.generate(start_index, start_g)
+        h_arr[start_index] = heuristic(start, goal)
+        f_arr[start_index] = start_g + h_arr[start_index]
+        focal_arr[start_index] = focal_fn(start, None, start_g, goal)
+
+        context.f_min = f_arr[start_index]
+        context.bound = (w + 1) * context.f_min
+        context.push_open(start_index)
+        expansions = 0
+        reopenings = 0
+        path = None
+
+        stats, on_expand = self.stats, self.on_expand
+        instrumented = stats is not None or on_expand is not None
+        open_high_water = focal_high_water = 0
+        focal_time = expand_time = 0.0
+        perf_counter = time.perf_counter
+
+        while context.open:
+            if max_expansions is not None and expansions >= max_expansions:
+                break
+            if deadline is not None and not expansions & 0xFF and time.monotonic() >= deadline:
+                break
+            if instrumented:
+                open_high_water = max(open_high_water, len(context.open))
+                focal_high_water = max(focal_high_water, len(context.focal))
+                t0 = perf_counter()
+            context.update_focal(w)
+            current = context.pop_focal()
+            if instrumented:
+                t1 = perf_counter()
+                focal_time += t1 - t0
+            if current is None:
+                break
+            visited[current] = 1
+            expansions += 1
+            current_pos = coord(current)
+            if on_expand is not None:
+                on_expand(current_pos, g_arr[current], f_arr[current])
+
+            if current == goal_index:
+                path = fill_segments(self._backtrack_path(state, current))
+                break
+
+            jumps = jump_dirs(current_pos[0], current_pos[1], arrived[current])
+            done = jumped.get(current, 0)
+            jumped[current] = jumps | done
+            g_current = g_arr[current]
+            for x, y, direction in successors(current_pos[0], current_pos[1], jumps & ~done, goal):
+                neighbor = y * width + x
+                pos = (x, y)
+                new_g = g_current + abs(x - current_pos[0]) + abs(y - current_pos[1])
+
+                if g_arr[neighbor] == INF:
+                    state.generate(neighbor, new_g)
+                    h_arr[neighbor] = heuristic(pos, goal)
+                    f_arr[neighbor] = new_g + h_arr[neighbor]
+                    focal_arr[neighbor] = focal_fn(pos, None, new_g, goal)
+                    parent_arr[neighbor] = current
+                    arrived[neighbor] = direction
+                    context.push_open(neighbor)
+                    continue
+                new_direction = not arrived[neighbor] & direction
+                if new_direction:
+                    arrived[neighbor] |= direction
+                if not visited[neighbor] and new_g < g_arr[neighbor]:
+                    context.remove_open(neighbor)
+                    g_arr[neighbor] = new_g
+                    f_arr[neighbor] = new_g + h_arr[neighbor]
+                    old_parent = step_back(pos, coord(parent_arr[neighbor]))
+                    focal_arr[neighbor] = focal_fn(pos, old_parent, new_g, goal)
+                    parent_arr[neighbor] = current
+                    context.push_open(neighbor)
+                    reopenings += 1
+                elif visited[neighbor] and new_direction and jump_dirs(x, y, direction) & ~jumped[neighbor]:
+                    # 已扩展的节点经新方向到达且需要新的跳跃：重新入 OPEN，出堆时只补做这些跳跃
+                    visited[neighbor] = 0
+                    context.push_open(neighbor)
+                    reopenings += 1
+            if instrumented:
+                expand_time += perf_counter() - t1
+
+        if stats is not None:
+            generated = len(state.touched) - first_generated
+            with self._stats_lock:
+                stats.merge_search(
+                    path is not None, expansions, generated, reopenings,
+                    open_high_water, focal_high_water, focal_time, expand_time
+                )
+        if path is not None and self.on_solution is not None:
+            self.on_solution(path, expansions)
+        return path, expansions
+
+    def _search_bidirectional_in(
+        self,
+        forward: SearchContext,
+        backward: SearchContext,
+        start: Tuple[int, int],
+        goal: Tuple[int, int],
+        heuristic: Callable,
+        focal_fn: Callable,
+        w: float,
+        max_expansions: Optional[int] = None,
+        deadline: Optional[float] = None,
+        start_g: float = 0.0,
+        blocked: Iterable[Tuple[int, int]] = ()
+    ) -> Tuple[Optional[List[Tuple[int, int]]], int]:
+        """
+        双向 focal 搜索：前向从 start 搜向 goal，后向从 goal 搜向 start（四连通单位代价地图是无向的），
+        两个方向各有自己的 OPEN/FOCAL，每步扩展 OPEN 较小的一侧。
+
+        节点在一侧生成或更新时，若另一侧也已生成它，则 g_前 + g_后 是一条经过该点的完整路径的代价，
+        记录其中最小者 best 及相遇点。两侧的 f_min 都是最优代价 C* 的下界（后向一侧再加上 start_g），
+        当 best <= (1+w) * max(前向 f_min, 后向 f_min + start_g) 时停止，返回的路径满足与单向搜索相同的
+        (1+w) 次优界限。启发式与二次排序函数在后向一侧以 start 作为目标调用。
+        """
+        grid_map = self.grid_map
+        neighbor_masks, neighbor_deltas = grid_map.adjacency()
+        coord = grid_map.coord
+        start_index = grid_map.index(start[0], start[1])
+        goal_index = grid_map.index(goal[0], goal[1])
+
+        for context in (forward, backward):
+            for x, y in blocked:
+                blocked_index = grid_map.index(x, y)
+                context.state.visited[blocked_index] = 1
+                context.state.touched.append(blocked_index)
+        first_generated = len(forward.state.touched)
+
+        # (上下文, 另一侧的状态, 本侧的搜索目标)
+        sides = ((forward, backward.state, goal), (backward, forward.state, start))
+        for (context, _, target), origin, g0 in zip(sides, (start, goal), (start_g, 0.0)):
+            state = context.state
+            index = grid_map.index(origin[0], origin[1])
+            state.generate(index, g0)
+            state.h[index] = heuristic(origin, target)
+            state.f[index] = g0 + state.h[index]
+            state.focal_value[index] = focal_fn(origin, None, g0, target)
+            context.f_min = state.f[index]
+            context.bound = (w + 1) * context.f_min
+            context.push_open(index)
+
+        best, meet = INF, -1
+        if start_index == goal_index:
+            best, meet = start_g, start_index
+        expansions = 0
+        reopenings = 0
+
+        stats, on_expand = self.stats, self.on_expand
+        instrumented = stats is not None or on_expand is not None
+        open_high_water = focal_high_water = 0
+        focal_time = expand_time = 0.0
+        perf_counter = time.perf_counter
+
+        while forward.open and backward.open:
+            if max_expansions is not None and expansions >= max_expansions:
+                best = INF  # 预算用尽时与单向搜索一致：放弃，不返回未经界限确认的路径
+                break
+            if deadline is not None and not expansions & 0xFF and time.monotonic() >= deadline:
+                best = INF
+                break
+            if instrumented:
+                open_high_water = max(open_high_water, len(forward.open) + len(backward.open))
+                focal_high_water = max(focal_high_water, len(forward.focal) + len(backward.focal))
+                t0 = perf_counter()
+            forward.update_focal(w)
+            backward.update_focal(w)
+            if best <= (w + 1) * max(forward.f_min, backward.f_min + start_g):
+                break
+            context, other, target = sides[len(forward.open) > len(backward.open)]
+            current = context.pop_focal()
+            if instrumented:
+                t1 = perf_counter()
+                focal_time += t1 - t0
+            if current is None:
+                break
+            state = context.state
+            g_arr, h_arr, f_arr = state.g, state.h, state.f
+            focal_arr, parent_arr, visited = state.focal_value, state.parent, state.visited
+            other_g = other.g
+            visited[current] = 1
+            expansions += 1
+            if on_expand is not None:
+                on_expand(coord(current), g_arr[current], f_arr[current])
+
+            new_g = g_arr[current] + 1.0
+            for delta in neighbor_deltas[neighbor_masks[current]]:
+                neighbor = current + delta
+                if visited[neighbor]:
+                    continue
+                pos = coord(neighbor)
+
+                if g_arr[neighbor] == INF:
+                    state.generate(neighbor, new_g)
+                    h_arr[neighbor] = heuristic(pos, target)
+                    f_arr[neighbor] = new_g + h_arr[neighbor]
+                    focal_arr[neighbor] = focal_fn(pos, None, new_g, target)
+                    parent_arr[neighbor] = current
+                    context.push_open(neighbor)
+                elif new_g < g_arr[neighbor]:
+                    context.remove_open(neighbor)
+                    g_arr[neighbor] = new_g
+                    f_arr[neighbor] = new_g + h_arr[neighbor]
+                    focal_arr[neighbor] = focal_fn(pos, coord(parent_arr[neighbor]), new_g, target)
+                    parent_arr[neighbor] = current
+                    context.push_open(neighbor)
+                    reopenings += 1
+                else:
+                    continue
+                if new_g + other_g[neighbor] < best:
+                    best, meet = new_g + other_g[neighbor], neighbor
+            if instrumented:
+                expand_time += perf_counter() - t1
+
+        path = None
+        if best < INF:
+            path = self._backtrack_path(forward.state, meet, backward.state)
+        if stats is not None:
+            generated = len(forward.state.touched) + len(backward.state.touched) - 2 * first_generated
+            with self._stats_lock:
+                stats.merge_search(
+                    path is not None, expansions, generated, reopenings,
+                    open_high_water, focal_high_water, focal_time, expand_time
+                )
+        if path is not None and self.on_solution is not None:
+            self.on_solution(path, expansions)
+        return path, expansions
+
+    def _run_try(
+        self,
+        start: Tuple[int, int],
+        goal: Tuple[int, int],
+        params: TryParams,
+        noise_strength: float,
+        max_expansions: Optional[int] = None,
+        deadline: Optional[float] = None,
+        start_g: float = 0.0,
+        blocked: Iterable[Tuple[int, int]] = ()
+    ) -> Tuple[Optional[List[Tuple[int, int]]], int]:
+        """
+        按给定参数执行一次随机化搜索：随机 w、随机二次排序权重、带噪声的启发式。
+        参数全部通过局部函数传入 _search，不改动实例，因此同一参数在任何进程中结果都相同。
+        开启 jump_points 时也逐格扩展：跳点搜索只产出“水平优先”的规范路径，二次排序与噪声几乎无从改变路径形状，
+        候选会大量重复。
+        """
+        dir_weight = params.dir_weight
+        g_weight = 1.0 - dir_weight
+        max_g = self.grid_map.width + self.grid_map.height
+        noise_rng = random.Random(params.noise_seed)
+        base_heuristic = self._calculate_heuristic
+
+        def focal_calc(pos, parent_pos, g, goal) -> float:
+            dir_consistency = self._dir_consistency(pos, parent_pos, goal)
+            normalized_g = g / max_g if max_g != 0 else 0.0
+            return 1.0 - (dir_weight * dir_consistency + g_weight * (1 - normalized_g))
+
+        # 启发式加噪声
+        def noisy_heuristic(pos, goal) -> float:
+            return base_heuristic(pos, goal) + noise_rng.uniform(-noise_strength, noise_strength)
+
+        return self._search(
+            start, goal, noisy_heuristic, focal_calc, params.w, max_expansions, deadline, start_g, blocked,
+            per_cell=True
+        )
+
+    def _run_branch_try(
+        self,
+        goal: Tuple[int, int],
+        params: TryParams,
+        noise_strength: float,
+        found: List[List[Tuple[int, int]]],
+        max_expansions: Optional[int] = None,
+        deadline: Optional[float] = None,
+        accept_prefix: Optional[Callable[[List[Tuple[int, int]]], bool]] = None
+    ) -> Tuple[Optional[List[Tuple[int, int]]], int]:
+        """
+        增量尝试：不从起点重搜，而是在已找到的某条路径上随机选分叉点 k，
+        复用前缀 path[:k+1]，屏蔽前缀与原路径的下一格 path[k+1]，只从 path[k] 搜索后缀。
+        后缀搜索以 g=k 起步，与整条路径的代价保持一致；分叉越靠后，需要扩展的节点越少。
+        accept_prefix(前缀) 返回 False 时不搜索后缀（结果注定是近似重复），直接返回 (None, 0)。
+        """
+        branch_rng = random.Random(params.noise_seed ^ 0x5EED)
+        base = found[branch_rng.randrange(len(found))]
+        if len(base) < 3:
+            return None, 0
+        k = branch_rng.randrange(len(base) - 2)  # path[k+1] 不取终点，否则后缀无路可走
+        if accept_prefix is not None and not accept_prefix(base[:k + 1]):
+            return None, 0
+        blocked = base[:k] + [base[k + 1]]
+        suffix, expansions = self._run_try(
+            base[k], goal, params, noise_strength, max_expansions, deadline, float(k), blocked
+        )
+        if suffix is None:
+            return None, expansions
+        return base[:k] + suffix, expansions
 
     def generate_candidate_paths(
         self,
@@ -124,7 +731,11 @@ class FocalSearch:
         max_tries: int = 20,
         w_min: float = 1.0,
         w_max: float = 3.0,
-        noise_strength: float = 0.01
+        noise_strength: float = 0.01,
+        seed: Optional[int] = None,
+        workers: Optional[int] = None,
+        incremental: bool = False,
+        max_overlap: float = 1.0
     ) -> List[List[Tuple[int, int]]]:
         """
         稳定生成指定数量的候选路径
@@ -133,49 +744,207 @@ class FocalSearch:
         :param w_min: 次优系数最小值
         :param w_max: 次优系数最大值
         :param noise_strength: 启发式函数噪声强度
+        :param seed: 随机种子；为 None 时使用全局 random 状态
+        :param workers: 并行进程数；None 或 1 时在当前进程中顺序执行
+        :param incremental: 找到第一条路径后，后续尝试从已有路径的前缀分叉搜索（见 _run_branch_try）
+        :param max_overlap: 近似重复阈值：与某条已有候选的栅格重叠率达到该值的路径被舍弃（见 path_codec.DiversityIndex）；
+            默认 1.0 只舍弃完全相同的路径
+        同一 seed 下结果与 workers 无关：每次尝试的参数预先按顺序抽取，结果也按尝试顺序去重。
+        开启 self.cache 时只缓存给定 seed 的调用（结果可复现），seed 为 None 的调用每次重新生成。
         """
-        candidate_paths = []
-        used_paths = set()
-
-        original_heuristic = self._calculate_heuristic
-        original_focal_calc = self._calculate_focal_value
-
-        for _ in range(max_tries):
-            if len(candidate_paths) >= candidate_num:
-                break
-
-            # 随机 w
-            self.w = random.uniform(w_min, w_max)
-
-            # 随机调整二次排序权重
-            dir_weight = random.uniform(0.3, 0.9)
-            g_weight = 1.0 - dir_weight
-
-            def new_focal_calc(node: Node, goal: Node) -> float:
-                dir_consistency = self._dir_consistency(node, goal)
-                max_g = self.grid_map.width + self.grid_map.height
-                normalized_g = node.g / max_g if max_g != 0 else 0.0
-                return 1.0 - (dir_weight * dir_consistency + g_weight * (1 - normalized_g))
-
-            self._calculate_focal_value = new_focal_calc
-
-            # 启发式加噪声
-            def noisy_heuristic(node: Node, goal: Node) -> float:
-                return original_heuristic(node, goal) + random.uniform(-noise_strength, noise_strength)
-
-            self._calculate_heuristic = noisy_heuristic
-
-            # 搜索一次
-            path = self.search_once(start, goal)
-
-            # 恢复原函数
-            self._calculate_heuristic = original_heuristic
-            self._calculate_focal_value = original_focal_calc
-
-            if path:
-                path_tuple = tuple(path)
-                if path_tuple not in used_paths:
-                    used_paths.add(path_tuple)
-                    candidate_paths.append(path)
+        cache = self.cache
+        key = None
+        if cache is not None:
+            if seed is None:
+                cache.bypass()
+            else:
+                key = self._cache_key(
+                    "candidates", start, goal, candidate_num, max_tries, w_min, w_max, noise_strength, seed, incremental,
+                    max_overlap
+                )
+                cached = cache.get(key)
+                if cached is not MISS:
+                    return [path.cells() for path in cached]
+        paths = list(self.iter_candidate_paths(
+            start, goal, candidate_num, max_tries, w_min, w_max, noise_strength,
+            seed=seed, workers=workers, incremental=incremental, max_overlap=max_overlap
+        ))
+        if key is not None:
+            packed = tuple(PackedPath.from_cells(path) for path in paths)
+            cache.put(key, packed, sum(path.nbytes for path in packed))
+        return paths
+
+    def iter_candidate_paths(
+        self,
+        start: Tuple[int, int],
+        goal: Tuple[int, int],
+        candidate_num: int = 3,
+        max_tries: int = 20,
+        w_min: float = 1.0,
+        w_max: float = 3.0,
+        noise_strength: float = 0.01,
+        seed: Optional[int] = None,
+        workers: Optional[int] = None,
+        deadline: Optional[float] = None,
+        max_expansions: Optional[int] = None,
+        incremental: bool = False,
+        max_overlap: float = 1.0,
+        index: Optional[DiversityIndex] = None,
+        should_stop: Optional[Callable[[], bool]] = None
+    ) -> Iterator[List[Tuple[int, int]]]:
+        """
+        流式生成候选路径：每找到一条新的（去重后的）路径就立即产出，参数含义同 generate_candidate_paths。
+        :param deadline: 截止时刻（time.monotonic() 时间戳）；到期后正在进行的搜索被放弃，生成器结束
+        :param max_expansions: 所有尝试累计的节点扩展预算；用尽后生成器结束
+        :param incremental: 增量模式：第一条路径之后的尝试复用已有路径前缀，只搜索分叉后的后缀；
+            结果代价超过 (1+w) 倍当前最短候选的分叉路径被舍弃。只支持顺序执行。
+        :param max_overlap: 近似重复阈值，见 generate_candidate_paths。增量模式下，若分叉前缀本身已使结果注定达到阈值，
+            该次尝试不再搜索后缀
+        :param index: 去重所用的 DiversityIndex；缺省时按 max_overlap 新建，传入时以 index.max_overlap 为准。
+            各候选以 PackedPath 收录在 index.paths 中，
+            可用 index.export() 批量导出
+        :param should_stop: 每次尝试开始前调用，返回 True 时生成器结束（如调用方已取消请求、不再需要结果）
+        消费方提前停止迭代（break / close()）时，剩余尝试不再执行，进程池随之关闭。
+        """
+        if incremental and workers is not None and workers > 1:
+            raise ValueError("incremental 模式依赖前序尝试的结果，只支持顺序执行（workers=None 或 1）")
+        rng = random.Random(seed) if seed is not None else random
+        tries = [_draw_try_params(rng, w_min, w_max) for _ in range(max_tries)]
+        if candidate_num <= 0:
+            return
 
-        return candidate_paths
\ No newline at end of file
+        if workers is None or workers <= 1:
+            pool = None
+        else:
+            pool, shm = _start_pool(self, workers)
+            results = pool.imap(
+                _pool_run_try,
+                [(start, goal, params, noise_strength, max_expansions, deadline) for params in tries],
+                chunksize=1
+            )
+
+        if index is None:
+            index = DiversityIndex(max_overlap)
+        found: List[List[Tuple[int, int]]] = []
+        best_cost = INF
+        spent = 0  # 已消耗的扩展数
+        stats = self.stats
+        pruned = False  # 本次分叉尝试是否因前缀重叠而被跳过
+
+        def accept_prefix(prefix: List[Tuple[int, int]]) -> bool:
+            # 分叉结果至多 (1+w)·best_cost+1 格（更长的会被舍弃），前缀与已有候选的共有栅格数是重叠率的下界
+            nonlocal pruned
+            longest = (1 + params.w) * best_cost + 1
+            pruned = index.shared(prefix) >= index.max_overlap * longest
+            return not pruned
+
+        try:
+            for try_index, params in enumerate(tries):
+                if deadline is not None and time.monotonic() >= deadline:
+                    return
+                if should_stop is not None and should_stop():
+                    return
+                remaining = None if max_expansions is None else max_expansions - spent
+                if remaining is not None and remaining <= 0:
+                    return
+
+                try_start = time.perf_counter() if stats is not None else 0.0
+                branched = incremental and bool(found)
+                rejected = pruned = False
+                if branched:
+                    path, expansions = self._run_branch_try(
+                        goal, params, noise_strength, found, remaining, deadline,
+                        accept_prefix if index.max_overlap < 1.0 else None
+                    )
+                    if path is not None and len(path) - 1 > (1 + params.w) * best_cost:
+                        path, rejected = None, True
+                elif pool is None:
+                    path, expansions = self._run_try(start, goal, params, noise_strength, remaining, deadline)
+                else:
+                    timeout = None if deadline is None else max(0.0, deadline - time.monotonic())
+                    try:
+                        path, expansions = results.next(timeout)
+                    except multiprocessing.TimeoutError:
+                        return
+                    # 工作进程按总预算执行；超出剩余预算的结果视同被截断，与顺序执行保持一致
+                    if remaining is not None and expansions > remaining:
+                        path, expansions = None, remaining
+                spent += expansions
+
+                verdict = None
+                if path:
+                    packed = PackedPath.from_cells(path)
+                    verdict = index.check(path, packed)
+                elif pruned:
+                    verdict = "near_duplicate"
+                is_new = verdict == "new"
+                if stats is not None:
+                    outcome = verdict or ("rejected" if rejected else "failed")
+                    stats.tries.append(TryStats(
+                        try_index, params.w, params.dir_weight, branched, expansions,
+                        len(path) - 1 if path else None, outcome, time.perf_counter() - try_start
+                    ))
+                if is_new:
+                    index.add(path, packed)
+                    found.append(path)
+                    best_cost = min(best_cost, len(path) - 1)
+                    yield path
+                    if len(found) >= candidate_num:
+                        return
+        finally:
+            if pool is not None:
+                # 已凑够候选路径或消费方停止时，剩余任务直接放弃
+                pool.terminate()
+                pool.join()
+                shm.close()
+                shm.unlink()
+
+
+def _draw_try_params(rng, w_min: float, w_max: float) -> TryParams:
+    w = rng.uniform(w_min, w_max)  # 随机 w
+    dir_weight = rng.uniform(0.3, 0.9)  # 随机调整二次排序权重
+    return TryParams(w, dir_weight, rng.getrandbits(32))
+
+
+# -------------------------- 进程池：地图经共享内存只传递一次 --------------------------
+_worker_planner: Optional[FocalSearch] = None
+
+
+def _start_pool(planner: FocalSearch, workers: int):
+    """
+    把地图（及预计算的启发式表）写入共享内存，启动进程池；每个工作进程在初始化时读取一次，
+    启发式表直接复用，不在工作进程中重新 BFS
+    """
+    grid_map = planner.grid_map
+    mask = grid_map.to_mask()
+    tables = planner.heuristic_tables.to_bytes() if planner.heuristic_tables is not None else b""
+    shm = shared_memory.SharedMemory(create=True, size=max(len(mask) + len(tables), 1))
+    shm.buf[:len(mask)] = mask
+    shm.buf[len(mask):len(mask) + len(tables)] = tables
+    pool = multiprocessing.Pool(
+        processes=workers,
+        initializer=_pool_init,
+        initargs=(
+            shm.name, grid_map.width, grid_map.height, planner.w, len(tables),
+            dict(heuristic=planner.heuristic, bidirectional=planner.bidirectional, jump_points=planner.jump_points)
+        )
+    )
+    return pool, shm
+
+
+def _pool_init(shm_name: str, width: int, height: int, w: float, tables_size: int, options: Dict):
+    global _worker_planner
+    shm = shared_memory.SharedMemory(name=shm_name)
+    try:
+        size = width * height
+        grid_map = GridMap.from_mask(width, height, shm.buf[:size])
+        if tables_size:
+            grid_map.heuristic_tables = HeuristicTables.from_bytes(grid_map, bytes(shm.buf[size:size + tables_size]))
+    finally:
+        shm.close()
+    _worker_planner = FocalSearch(grid_map, w, **options)
+
+
+def _pool_run_try(task) -> Tuple[Optional[List[Tuple[int, int]]], int]:
+    start, goal, params, noise_strength, max_expansions, deadline = task
+    return _worker_planner._run_try(start, goal, params, noise_strength, max_expansions, deadline)
@@ -0,0 +1,235 @@
+import random
+import struct
+from array import array
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from env import GridMap, SECTION_HEURISTIC_TABLES
+
+INF = float('inf')
+
+# 启发式表段的布局：头部 (地标数 u32, 目标数 u32)，随后每张表的源栅格下标 u32（先地标后目标），
+# 再依次是各表的 float32 距离数组（width*height 项，不可达为 inf），全部小端。
+_TABLES_HEADER = struct.Struct("<II")
+
+
+def bfs_distances(grid_map: GridMap, source: int) -> array:
+    """
+    从下标 source 出发的 BFS 距离表（array('f')，按下标索引，不可达为 inf）。
+    四连通单位代价的地图是无向的，所以这同时也是所有栅格到 source 的反向距离。
+    """
+    masks, deltas = grid_map.adjacency()
+    dist = array('f', [INF]) * (grid_map.width * grid_map.height)
+    dist[source] = 0.0
+    frontier = [source]
+    d = 0.0
+    while frontier:
+        d += 1.0
+        next_frontier = []
+        for i in frontier:
+            for delta in deltas[masks[i]]:
+                j = i + delta
+                if dist[j] == INF:
+                    dist[j] = d
+                    next_frontier.append(j)
+        frontier = next_frontier
+    return dist
+
+
+def select_landmarks(grid_map: GridMap, count: int, seed: Optional[int] = 0) -> Tuple[List[int], List[array]]:
+    """
+    最远点法选择地标：从随机可行栅格出发，先取离它最远的栅格，之后每次取离已选地标最远的栅格。
+    地标落在地图“边缘”时 ALT 下界最紧。返回 (地标下标, 对应的距离表)，避免重复 BFS。
+    """
+    landmarks, tables = [], []
+    seed_cell = _random_free_cell(grid_map, random.Random(seed))
+    if seed_cell is None:
+        return landmarks, tables
+    nearest = bfs_distances(grid_map, seed_cell)  # 各栅格到已选地标的最小距离（第一轮为到起始栅格）
+    for _ in range(count):
+        best, best_d = -1, 0.0
+        for i, d in enumerate(nearest):
+            if best_d < d < INF:
+                best, best_d = i, d
+        if best < 0:
+            break
+        dist = bfs_distances(grid_map, best)
+        nearest = array('f', map(min, nearest, dist)) if landmarks else dist
+        landmarks.append(best)
+        tables.append(dist)
+    return landmarks, tables
+
+
+def _random_free_cell(grid_map: GridMap, rng: random.Random, attempts: int = 1000) -> Optional[int]:
+    for _ in range(attempts):
+        x, y = rng.randrange(grid_map.width), rng.randrange(grid_map.height)
+        if grid_map.is_valid(x, y):
+            return grid_map.index(x, y)
+    for i in range(grid_map.width * grid_map.height):
+        if grid_map.is_valid(*grid_map.coord(i)):
+            return i
+    return None
+
+
+class HeuristicTables:
+    """
+    一张地图的预计算启发式表：
+      - 地标表（ALT）：从若干地标栅格出发的 BFS 距离 d_L。由三角不等式，
+        |d_L(goal) - d_L(pos)| 是 pos 到 goal 真实距离的下界；取所有地标与曼哈顿距离中的最大值。
+      - 目标表：为常用终点（停靠点、充电桩等）预计算的反向 BFS 距离，即精确的剩余距离。
+    两者都是可采纳且一致的启发式，因此 FOCAL 的 (1+w) 次优界限不受影响。
+
+    表记录构建时的地图版本；地图障碍物变更后（GridMap.version 变化）在下一次查询时整体重建，
+    否则移除障碍物后旧的距离可能高估而失去可采纳性。
+    """
+
+    def __init__(self, grid_map: GridMap, landmarks: Iterable[int] = (), goals: Iterable[Tuple[int, int]] = ()):
+        self.grid_map = grid_map
+        self.version = grid_map.version
+        self._landmark_cells: List[int] = []
+        self._landmark_tables: List = []  # array('f')，从文件载入时为 memoryview
+        self._goal_tables: Dict[int, array] = {}
+        self._bound: Dict[int, tuple] = {}  # 目标下标 -> (精确表, None) 或 (None, ((d_L, d_L(goal)), ...))
+        self.add_landmarks(landmarks)
+        self.add_goals(goals)
+
+    @staticmethod
+    def build(grid_map: GridMap, landmark_count: int = 8, goals: Iterable[Tuple[int, int]] = (), seed: Optional[int] = 0):
+        """按最远点法选择 landmark_count 个地标，并为 goals 建精确表"""
+        tables = HeuristicTables(grid_map, goals=goals)
+        tables._landmark_cells, tables._landmark_tables = select_landmarks(grid_map, landmark_count, seed)
+        return tables
+
+    @property
+    def landmarks(self) -> List[Tuple[int, int]]:
+        return [self.grid_map.coord(i) for i in self._landmark_cells]
+
+    @property
+    def goals(self) -> List[Tuple[int, int]]:
+        return [self.grid_map.coord(i) for i in self._goal_tables]
+
+    def add_landmarks(self, cells: Iterable[int]):
+        """追加地标（栅格下标）"""
+        for cell in cells:
+            if cell not in self._landmark_cells:
+                self._landmark_cells.append(cell)
+                self._landmark_tables.append(bfs_distances(self.grid_map, cell))
+        self._bound.clear()
+
+    def add_goals(self, goals: Iterable[Tuple[int, int]]):
+        """为常用终点建精确的反向距离表"""
+        for x, y in goals:
+            goal_index = self.grid_map.index(x, y)
+            if goal_index not in self._goal_tables:
+                self._goal_tables[goal_index] = bfs_distances(self.grid_map, goal_index)
+            self._bound.pop(goal_index, None)
+
+    def signature(self, goal: Tuple[int, int]) -> tuple:
+        """决定 goal 上启发式取值的表的标识（供结果缓存区分不同的表配置）"""
+        goal_index = self.grid_map.index(goal[0], goal[1])
+        if goal_index in self._goal_tables:
+            return ("exact",)
+        return ("landmarks",) + tuple(self._landmark_cells)
+
+    def distance(self, pos: Tuple[int, int], goal: Tuple[int, int]) -> Optional[float]:
+        """goal 有精确表时返回 pos 到 goal 的真实距离（不可达为 inf），否则返回 None"""
+        table = self._goal_tables.get(self.grid_map.index(goal[0], goal[1]))
+        return None if table is None else table[self.grid_map.index(pos[0], pos[1])]
+
+    def estimate(self, pos: Tuple[int, int], goal: Tuple[int, int]) -> float:
+        """pos 到 goal 的启发式值：有目标表时为精确距离，否则为 ALT 下界与曼哈顿距离的较大者"""
+        if self.version != self.grid_map.version:
+            self.rebuild()
+        width = self.grid_map.width
+        goal_index = goal[1] * width + goal[0]
+        bound = self._bound.get(goal_index)
+        if bound is None:
+            bound = self._bind(goal_index)
+        exact, pairs = bound
+        index = pos[1] * width + pos[0]
+        if exact is not None:
+            return exact[index]
+        h = abs(pos[0] - goal[0]) + abs(pos[1] - goal[1])
+        for table, goal_d in pairs:
+            d = table[index]
+            if d != INF:
+                d = abs(goal_d - d)
+                if d > h:
+                    h = d
+        return h
+
+    def _bind(self, goal_index: int) -> tuple:
+        """为一个目标缓存查询所需的数据：精确表，或与该目标连通的地标表及其在目标处的取值"""
+        exact = self._goal_tables.get(goal_index)
+        if exact is not None:
+            bound = (exact, None)
+        else:
+            bound = (None, tuple(
+                (table, table[goal_index]) for table in self._landmark_tables if table[goal_index] != INF
+            ))
+        self._bound[goal_index] = bound
+        return bound
+
+    def rebuild(self):
+        """地图变更后按原有地标与目标重新计算所有表（已变为障碍物的地标被丢弃）"""
+        grid_map = self.grid_map
+        landmarks = [i for i in self._landmark_cells if grid_map.is_valid(*grid_map.coord(i))]
+        goals = self.goals
+        self.version = grid_map.version
+        self._landmark_cells, self._landmark_tables = [], []
+        self._goal_tables = {}
+        self.add_landmarks(landmarks)
+        self.add_goals(goals)
+
+    # -------------------------- 序列化：作为地图文件的附加段 --------------------------
+    def to_bytes(self) -> bytes:
+        """
+        序列化为地图文件的附加段，用法：
+            grid_map.save(path, extra_sections={SECTION_HEURISTIC_TABLES: tables.to_bytes()})
+        地图在建表后变更过时先重建：from_bytes 会按读入时的地图版本标记各表，过期的表写出去就不会再被重建，
+        障碍物减少后可能高估距离（启发式不再可采纳）。
+        """
+        if self.version != self.grid_map.version:
+            self.rebuild()
+        sources = self._landmark_cells + list(self._goal_tables)
+        tables = self._landmark_tables + list(self._goal_tables.values())
+        header = _TABLES_HEADER.pack(len(self._landmark_cells), len(self._goal_tables))
+        return header + array('I', sources).tobytes() + b"".join(t.tobytes() for t in tables)
+
+    @staticmethod
+    def from_bytes(grid_map: GridMap, data) -> "HeuristicTables":
+        """
+        从 to_bytes() 的结果恢复；data 为 memoryview（如 GridMap.open 映射的附加段）时距离表直接引用映射内存，
+        不复制也不重新 BFS
+        """
+        data = memoryview(data)
+        landmark_count, goal_count = _TABLES_HEADER.unpack_from(data, 0)
+        count = landmark_count + goal_count
+        offset = _TABLES_HEADER.size
+        sources = data[offset:offset + 4 * count].cast('I')
+        offset += 4 * count
+        size = grid_map.width * grid_map.height
+        if len(data) != offset + 4 * size * count:
+            raise ValueError(f"启发式表段长度与地图尺寸 {grid_map.width}x{grid_map.height} 不符")
+        tables = [data[offset + 4 * size * k:offset + 4 * size * (k + 1)].cast('f') for k in range(count)]
+
+        loaded = HeuristicTables(grid_map)
+        loaded._landmark_cells = list(sources[:landmark_count])
+        loaded._landmark_tables = tables[:landmark_count]
+        loaded._goal_tables = dict(zip(sources[landmark_count:], tables[landmark_count:]))
+        return loaded
+
+
+def get_tables(grid_map: GridMap, landmark_count: int = 8) -> HeuristicTables:
+    """
+    取地图上缓存的启发式表；没有时优先从地图文件的附加段（SECTION_HEURISTIC_TABLES）载入，
+    否则按 landmark_count 个地标新建，并缓存到 grid_map.heuristic_tables 上供之后的规划器共享
+    """
+    tables = grid_map.heuristic_tables
+    if tables is None:
+        section = grid_map.sections.get(SECTION_HEURISTIC_TABLES)
+        if section is not None:
+            tables = HeuristicTables.from_bytes(grid_map, section)
+        else:
+            tables = HeuristicTables.build(grid_map, landmark_count)
+        grid_map.heuristic_tables = tables
+    return tables
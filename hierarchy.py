@@ -0,0 +1,493 @@
+import random
+import time
+from typing import Dict, Iterator, List, Optional, Set, Tuple
+
+from env import GridMap
+from focal_search import TryParams, _draw_try_params
+from search_state import SearchContext, INF
+
+
+class _Cluster:
+    """
+    一个簇：地图上的一块矩形区域，可行格存成一个整数位图（局部坐标 (lx,ly) 在第 ly*cw+lx 位）。
+    簇内 BFS 按层推进：一层的所有格用一次位运算扩展，不逐格循环。
+    """
+    __slots__ = ("x0", "y0", "cw", "ch", "free", "not_first_col", "not_last_col", "nodes", "segments")
+
+    def __init__(self, x0: int, y0: int, cw: int, ch: int):
+        self.x0, self.y0, self.cw, self.ch = x0, y0, cw, ch
+        row = (1 << cw) - 1
+        rows = sum(1 << (ly * cw) for ly in range(ch))
+        self.not_first_col = (row ^ 1) * rows  # 每行去掉第 0 列：左移一位后不会从上一行末尾进入本行开头
+        self.not_last_col = (row >> 1) * rows  # 每行去掉最后一列
+        self.free = 0
+        self.nodes: Set[int] = set()  # 位于本簇内的抽象节点
+        self.segments: Dict[Tuple[Tuple[int, int], Tuple[int, int]], Optional[List[Tuple[int, int]]]] = {}
+
+    def load(self, grid_map: GridMap):
+        """从地图的按行占用位图读取本簇的可行格（每行一次切片 + 移位）"""
+        row_bytes, cw = grid_map._row_bytes, self.cw
+        width_mask = (1 << cw) - 1
+        free = 0
+        for ly in range(self.ch):
+            y = self.y0 + ly
+            blocked = int.from_bytes(grid_map._blocked[y * row_bytes:(y + 1) * row_bytes], "little")
+            free |= (~blocked >> self.x0 & width_mask) << (ly * cw)
+        self.free = free
+        self.segments.clear()
+
+    def bit(self, cell: Tuple[int, int]) -> int:
+        return 1 << ((cell[1] - self.y0) * self.cw + cell[0] - self.x0)
+
+    def cell(self, bit: int) -> Tuple[int, int]:
+        k = bit.bit_length() - 1
+        return self.x0 + k % self.cw, self.y0 + k // self.cw
+
+    def expand(self, cells: int) -> int:
+        """cells 的四连通邻居中的可行格（不出簇）"""
+        cw = self.cw
+        return (
+            (cells << 1 & self.not_first_col) | (cells >> 1 & self.not_last_col) | cells << cw | cells >> cw
+        ) & self.free
+
+    def distances(self, source: Tuple[int, int], targets: List[Tuple[int, int]]) -> List[float]:
+        """簇内从 source 到各 target 的最短距离（不出簇），不可达为 inf；全部找到后提前结束"""
+        index = {self.bit(cell): k for k, cell in enumerate(targets)}
+        result = [INF] * len(targets)
+        remaining = sum(index)
+        frontier = seen = self.bit(source)
+        d = 0.0
+        while frontier and remaining:
+            hit = frontier & remaining
+            remaining ^= hit
+            while hit:
+                low = hit & -hit
+                result[index[low]] = d
+                hit ^= low
+            frontier = self.expand(frontier) & ~seen
+            seen |= frontier
+            d += 1.0
+        return result
+
+    def path(self, a: Tuple[int, int], b: Tuple[int, int]) -> Optional[List[Tuple[int, int]]]:
+        """簇内 a 到 b 的一条最短路径：按层 BFS 到 b，再逐层回退取任一相邻的上一层格"""
+        layers = [self.bit(a)]
+        seen, target = layers[0], self.bit(b)
+        while not layers[-1] & target:
+            frontier = self.expand(layers[-1]) & ~seen
+            if not frontier:
+                return None
+            seen |= frontier
+            layers.append(frontier)
+        bit, cells = target, [b]
+        for layer in reversed(layers[:-1]):
+            previous = self.expand(bit) & layer
+            bit = previous & -previous
+            cells.append(self.cell(bit))
+        return cells[::-1]
+
+
+def _sign(v: int) -> int:
+    return (v > 0) - (v < 0)
+
+
+class HierarchicalPlanner:
+    """
+    大地图上的分层（HPA* 式）focal 规划。
+
+    地图切成 cluster_size × cluster_size 的簇；相邻两簇的公共边界上，两侧都可行的连续格段是一个入口，
+    每个入口取一对（段长小于 max_entrance_width 取中点，否则取两端）过境格作为抽象节点，
+    两格之间连一条代价 1 的抽象边；同一簇内的抽象节点之间连上簇内最短距离（预计算）。
+
+    查询时把起点、终点临时接入各自所在的簇，在抽象图上做 focal 搜索（界限、OPEN/FOCAL 与逐格搜索相同，
+    启发式为曼哈顿距离），得到一串航点；航点之间的逐格路段按需细化（簇内按层 BFS，结果按簇缓存），
+    调用方可以只细化最前面的几段。抽象图只包含过境格，因此结果相对真实最优路径还有少量额外绕行。
+
+    地图障碍物变化后，下一次查询前由 update() 只重建变化栅格所在的簇：
+    重新扫描这些簇四周边界上的入口，重算这些簇以及过境格对有变化的边界另一侧簇的簇内距离。
+    规划器不是线程安全的：同一实例只应在一个线程中使用。
+    """
+
+    def __init__(self, grid_map: GridMap, cluster_size: int = 32, w: float = 1.2, max_entrance_width: int = 6):
+        """
+        :param cluster_size: 簇的边长（格）；越大抽象图越小，但簇内距离的预计算与路段细化越慢
+        :param w: 抽象层 focal 搜索的默认次优系数
+        :param max_entrance_width: 入口长度达到该值时取两端两对过境格，否则只取中点一对
+        """
+        self.grid_map = grid_map
+        self.cluster_size = cluster_size
+        self.w = w
+        self.max_entrance_width = max_entrance_width
+        self.cols = (grid_map.width + cluster_size - 1) // cluster_size
+        self.rows = (grid_map.height + cluster_size - 1) // cluster_size
+        self._clusters: List[_Cluster] = []
+        self._node_cells: List[Optional[Tuple[int, int]]] = []  # 节点编号 -> 过境格；None 为已回收的编号
+        self._node_ids: Dict[Tuple[int, int], int] = {}
+        self._edges: List[Dict[int, float]] = []  # 节点编号 -> {邻居编号: 代价}
+        self._refs: List[int] = []  # 节点被多少个过境格对引用（角上的格可能同时属于两条边界）
+        self._free_ids: List[int] = []
+        self._borders: Dict[Tuple[int, int], List[Tuple[int, int]]] = {}  # (簇, 0=右边界/1=下边界) -> 过境节点对
+        self._context: Optional[SearchContext] = None
+        self.version = grid_map.version
+        self.build_time = 0.0
+        self.rebuilt_clusters = 0  # update() 累计重建的簇数
+        self.build()
+
+    # -------------------------- 抽象图的构建与增量重建 --------------------------
+    def build(self):
+        """从头构建全部簇、入口与簇内距离"""
+        t0 = time.perf_counter()
+        grid_map, size = self.grid_map, self.cluster_size
+        self._clusters = []
+        for cy in range(self.rows):
+            for cx in range(self.cols):
+                x0, y0 = cx * size, cy * size
+                cluster = _Cluster(x0, y0, min(size, grid_map.width - x0), min(size, grid_map.height - y0))
+                cluster.load(grid_map)
+                self._clusters.append(cluster)
+        self._node_cells, self._node_ids, self._edges, self._refs, self._free_ids = [], {}, [], [], []
+        self._borders = {}
+        for cid in range(len(self._clusters)):
+            for side in (0, 1):
+                scanned = self._scan_border(cid, side)
+                if scanned is not None:
+                    self._add_border((cid, side), *scanned)
+        for cid in range(len(self._clusters)):
+            self._build_intra(cid)
+        self.version = grid_map.version
+        self.build_time = time.perf_counter() - t0
+
+    def update(self) -> int:
+        """按地图自上次构建/更新以来的净变更，重建受影响的簇；返回本次重建的簇数"""
+        grid_map = self.grid_map
+        if self.version == grid_map.version:
+            return 0
+        if self.version < grid_map.oldest_version:
+            # 所需的变更日志已被 GridMap.trim_changes 丢弃：整体重建
+            self.build()
+            self.rebuilt_clusters += len(self._clusters)
+            return len(self._clusters)
+        changes = grid_map.changes_since(self.version)
+        self.version = changes.version
+        dirty = {self.cluster_of(cell) for cell in changes.added + changes.removed}
+        if not dirty:
+            return 0
+
+        borders = set()
+        for cid in dirty:
+            self._clusters[cid].load(grid_map)
+            cx, cy = cid % self.cols, cid // self.cols
+            borders.update(((cid, 0), (cid, 1)))
+            if cx > 0:
+                borders.add((cid - 1, 0))
+            if cy > 0:
+                borders.add((cid - self.cols, 1))
+        # 只替换过境格对确实变了的边界；边界两侧的簇需要重算簇内距离
+        rebuild = set(dirty)
+        cells = self._node_cells
+        for key in sorted(borders):
+            scanned = self._scan_border(*key)
+            if scanned is None:
+                continue
+            other, chosen = scanned
+            if [(cells[a], cells[b]) for a, b in self._borders.get(key, ())] == chosen:
+                continue
+            self._remove_border(key)
+            self._add_border(key, other, chosen)
+            rebuild.update((key[0], other))
+        for cid in rebuild:
+            self._build_intra(cid)
+        self.rebuilt_clusters += len(rebuild)
+        return len(rebuild)
+
+    def cluster_of(self, cell: Tuple[int, int]) -> int:
+        return cell[1] // self.cluster_size * self.cols + cell[0] // self.cluster_size
+
+    def _scan_border(
+        self, cid: int, side: int
+    ) -> Optional[Tuple[int, List[Tuple[Tuple[int, int], Tuple[int, int]]]]]:
+        """
+        扫描簇 cid 的右边界（side=0）或下边界（side=1），返回 (相邻簇, 各入口选出的过境格对)；
+        地图边缘上没有相邻簇时返回 None
+        """
+        cx, cy = cid % self.cols, cid // self.cols
+        cluster = self._clusters[cid]
+        if side == 0:
+            if cx + 1 >= self.cols:
+                return None
+            other, x = cid + 1, cluster.x0 + cluster.cw - 1
+            pairs = [((x, y), (x + 1, y)) for y in range(cluster.y0, cluster.y0 + cluster.ch)]
+        else:
+            if cy + 1 >= self.rows:
+                return None
+            other, y = cid + self.cols, cluster.y0 + cluster.ch - 1
+            pairs = [((x, y), (x, y + 1)) for x in range(cluster.x0, cluster.x0 + cluster.cw)]
+
+        is_valid = self.grid_map.is_valid
+        chosen, run = [], []
+        for pair in pairs + [None]:
+            if pair is not None and is_valid(*pair[0]) and is_valid(*pair[1]):
+                run.append(pair)
+                continue
+            if run:
+                chosen += [run[0], run[-1]] if len(run) >= self.max_entrance_width else [run[len(run) // 2]]
+                run = []
+        return other, chosen
+
+    def _add_border(self, key: Tuple[int, int], other: int, chosen: List[Tuple[Tuple[int, int], Tuple[int, int]]]):
+        """登记一条边界的过境格对：两格各成为（或复用）一个抽象节点，之间连代价 1 的边"""
+        transitions = []
+        for a, b in chosen:
+            na, nb = self._add_node(a, key[0]), self._add_node(b, other)
+            self._edges[na][nb] = self._edges[nb][na] = 1.0
+            transitions.append((na, nb))
+        self._borders[key] = transitions
+
+    def _remove_border(self, key: Tuple[int, int]):
+        for na, nb in self._borders.pop(key, ()):
+            self._edges[na].pop(nb, None)
+            self._edges[nb].pop(na, None)
+            self._release_node(na)
+            self._release_node(nb)
+
+    def _add_node(self, cell: Tuple[int, int], cid: int) -> int:
+        node = self._node_ids.get(cell)
+        if node is not None:
+            self._refs[node] += 1
+            return node
+        if self._free_ids:
+            node = self._free_ids.pop()
+            self._node_cells[node], self._edges[node], self._refs[node] = cell, {}, 1
+        else:
+            node = len(self._node_cells)
+            self._node_cells.append(cell)
+            self._edges.append({})
+            self._refs.append(1)
+        self._node_ids[cell] = node
+        self._clusters[cid].nodes.add(node)
+        return node
+
+    def _release_node(self, node: int):
+        self._refs[node] -= 1
+        if self._refs[node]:
+            return
+        cell = self._node_cells[node]
+        for neighbor in self._edges[node]:
+            self._edges[neighbor].pop(node, None)
+        self._edges[node] = {}
+        self._node_cells[node] = None
+        del self._node_ids[cell]
+        self._clusters[self.cluster_of(cell)].nodes.discard(node)
+        self._free_ids.append(node)
+
+    def _build_intra(self, cid: int):
+        """重算簇 cid 内各节点两两之间的簇内距离（不连通的节点对之间没有边）"""
+        cluster = self._clusters[cid]
+        cluster.segments.clear()
+        nodes = sorted(cluster.nodes)
+        cells, edges = self._node_cells, self._edges
+        for u in nodes:
+            for v in nodes:
+                edges[u].pop(v, None)
+        for i, u in enumerate(nodes):
+            others = nodes[i + 1:]
+            for v, d in zip(others, cluster.distances(cells[u], [cells[v] for v in others])):
+                if d < INF:
+                    edges[u][v] = edges[v][u] = d
+
+    # -------------------------- 抽象层 focal 搜索 --------------------------
+    def _connect(self, cell: Tuple[int, int]) -> Dict[int, float]:
+        """临时把 cell 接入所在簇：返回 {簇内节点: 簇内距离}"""
+        cluster = self._clusters[self.cluster_of(cell)]
+        nodes = sorted(cluster.nodes)
+        cells = self._node_cells
+        distances = cluster.distances(cell, [cells[v] for v in nodes])
+        return {v: d for v, d in zip(nodes, distances) if d < INF}
+
+    def _abstract_search(
+        self,
+        start: Tuple[int, int],
+        goal: Tuple[int, int],
+        w: float,
+        dir_weight: float = 0.6,
+        noise_rng: Optional[random.Random] = None,
+        noise_strength: float = 0.0,
+        max_expansions: Optional[int] = None
+    ) -> Tuple[Optional[List[Tuple[int, int]]], int]:
+        """
+        抽象图上的 focal 搜索，返回 (航点序列, 扩展节点数)。起点、终点作为两个临时节点（编号紧跟在现有节点之后），
+        二次排序与逐格搜索的默认值相同：方向一致性（父节点到本节点的方向与朝终点的方向逐分量同号）与归一化 g 的加权。
+        """
+        self.update()
+        grid_map = self.grid_map
+        if not (grid_map.is_valid(*start) and grid_map.is_valid(*goal)):
+            return None, 0
+        cells, edges = self._node_cells, self._edges
+        count = len(cells)
+        start_node, goal_node = count, count + 1
+        start_edges = self._connect(start)
+        goal_edges = self._connect(goal)
+        if self.cluster_of(start) == self.cluster_of(goal):
+            d = self._clusters[self.cluster_of(start)].distances(start, [goal])[0]
+            if d < INF:
+                start_edges[goal_node] = d
+
+        def position(node: int) -> Tuple[int, int]:
+            return start if node == start_node else goal if node == goal_node else cells[node]
+
+        max_g = grid_map.width + grid_map.height
+        g_weight = 1.0 - dir_weight
+
+        def heuristic(pos: Tuple[int, int]) -> float:
+            h = abs(pos[0] - goal[0]) + abs(pos[1] - goal[1])
+            if noise_rng is not None:
+                h += noise_rng.uniform(-noise_strength, noise_strength)
+            return h
+
+        def focal_value(pos: Tuple[int, int], parent_pos: Tuple[int, int], g: float) -> float:
+            dir_parent = (_sign(pos[0] - parent_pos[0]), _sign(pos[1] - parent_pos[1]))
+            dir_goal = (_sign(goal[0] - pos[0]), _sign(goal[1] - pos[1]))
+            consistency = 1.0 if dir_parent == dir_goal else 0.0
+            return 1.0 - (dir_weight * consistency + g_weight * (1 - g / max_g))
+
+        context = self._context
+        if context is None or not context.fits(count + 2, 1):
+            context = self._context = SearchContext(count + 2, 1)
+        else:
+            context.reset()
+        state = context.state
+        g_arr, h_arr, f_arr = state.g, state.h, state.f
+        focal_arr, parent_arr, visited = state.focal_value, state.parent, state.visited
+
+        state.generate(start_node, 0.0)
+        h_arr[start_node] = heuristic(start)
+        f_arr[start_node] = h_arr[start_node]
+        focal_arr[start_node] = 1.0 - g_weight
+        context.f_min = f_arr[start_node]
+        context.bound = (w + 1) * context.f_min
+        context.push_open(start_node)
+        expansions = 0
+
+        while context.open:
+            if max_expansions is not None and expansions >= max_expansions:
+                break
+            context.update_focal(w)
+            current = context.pop_focal()
+            if current is None:
+                break
+            visited[current] = 1
+            expansions += 1
+            if current == goal_node:
+                return [position(node) for node in state.backtrack(current)], expansions
+
+            if current == start_node:
+                successors = list(start_edges.items())
+            else:
+                successors = list(edges[current].items())
+                if current in goal_edges:
+                    successors.append((goal_node, goal_edges[current]))
+            current_pos = position(current)
+            for neighbor, cost in successors:
+                if visited[neighbor]:
+                    continue
+                new_g = g_arr[current] + cost
+                if g_arr[neighbor] == INF:
+                    pos = position(neighbor)
+                    state.generate(neighbor, new_g)
+                    h_arr[neighbor] = heuristic(pos)
+                elif new_g < g_arr[neighbor]:
+                    pos = position(neighbor)
+                    context.remove_open(neighbor)
+                    g_arr[neighbor] = new_g
+                else:
+                    continue
+                f_arr[neighbor] = new_g + h_arr[neighbor]
+                focal_arr[neighbor] = focal_value(pos, current_pos, new_g)
+                parent_arr[neighbor] = current
+                context.push_open(neighbor)
+        return None, expansions
+
+    def abstract_path(
+        self, start: Tuple[int, int], goal: Tuple[int, int], w: Optional[float] = None
+    ) -> Tuple[Optional[List[Tuple[int, int]]], int]:
+        """只做抽象层搜索：返回 (航点序列, 扩展节点数)，航点间的逐格路段用 iter_segments / refine 按需细化"""
+        return self._abstract_search(start, goal, self.w if w is None else w)
+
+    # -------------------------- 路段细化 --------------------------
+    def _segment(self, a: Tuple[int, int], b: Tuple[int, int]) -> Optional[List[Tuple[int, int]]]:
+        """相邻两航点间的逐格路段：同簇时簇内最短路（按簇缓存），跨簇时两格本就相邻"""
+        if a == b:
+            return [a]
+        cid = self.cluster_of(a)
+        if cid != self.cluster_of(b):
+            return [a, b]
+        segments = self._clusters[cid].segments
+        segment = segments.get((a, b))
+        if segment is None:
+            segment = segments[(a, b)] = self._clusters[cid].path(a, b)
+        return segment
+
+    def iter_segments(self, waypoints: List[Tuple[int, int]]) -> Iterator[List[Tuple[int, int]]]:
+        """逐段细化航点序列：每次产出一段逐格路径（含两端航点），调用方可以只取前几段"""
+        for a, b in zip(waypoints, waypoints[1:]):
+            yield self._segment(a, b)
+
+    def refine(self, waypoints: List[Tuple[int, int]]) -> List[Tuple[int, int]]:
+        """把航点序列完整细化为逐格路径"""
+        path = waypoints[:1]
+        for segment in self.iter_segments(waypoints):
+            path += segment[1:]
+        return path
+
+    def search_once(
+        self, start: Tuple[int, int], goal: Tuple[int, int], w: Optional[float] = None
+    ) -> Optional[List[Tuple[int, int]]]:
+        """单次查询：抽象层搜索 + 完整细化，返回逐格路径"""
+        waypoints, _ = self.abstract_path(start, goal, w)
+        return None if waypoints is None else self.refine(waypoints)
+
+    # -------------------------- 抽象层候选路径 --------------------------
+    def generate_candidate_paths(
+        self,
+        start: Tuple[int, int],
+        goal: Tuple[int, int],
+        candidate_num: int = 3,
+        max_tries: int = 20,
+        w_min: float = 1.0,
+        w_max: float = 3.0,
+        noise_strength: Optional[float] = None,
+        seed: Optional[int] = None,
+        refine: bool = True
+    ) -> List[List[Tuple[int, int]]]:
+        """
+        与 FocalSearch.generate_candidate_paths 相同的随机化尝试（随机 w、二次排序权重、启发式噪声），
+        但搜索与去重都在抽象层进行：两条候选的航点序列不同才算不同的路径，细化后的路径因而在簇这一级上有差异。
+        :param noise_strength: 启发式噪声强度，缺省为 cluster_size / 2（抽象边的长度以簇边长计）
+        :param refine: False 时返回未细化的航点序列，由调用方按需用 iter_segments / refine 细化
+        """
+        if noise_strength is None:
+            noise_strength = self.cluster_size / 2
+        rng = random.Random(seed) if seed is not None else random
+        tries: List[TryParams] = [_draw_try_params(rng, w_min, w_max) for _ in range(max_tries)]
+        found, seen = [], set()
+        for params in tries:
+            if len(found) >= candidate_num:
+                break
+            waypoints, _ = self._abstract_search(
+                start, goal, params.w, params.dir_weight, random.Random(params.noise_seed), noise_strength
+            )
+            if waypoints is None or tuple(waypoints) in seen:
+                continue
+            seen.add(tuple(waypoints))
+            found.append(waypoints)
+        return [self.refine(waypoints) for waypoints in found] if refine else found
+
+    def as_dict(self) -> Dict:
+        nodes = len(self._node_ids)
+        return {
+            "clusters": len(self._clusters),
+            "nodes": nodes,
+            "edges": sum(len(edges) for edges in self._edges) // 2,
+            "build_time": self.build_time,
+            "rebuilt_clusters": self.rebuilt_clusters,
+        }
@@ -0,0 +1,116 @@
+from typing import Any, Dict, Hashable, List, Optional, Tuple
+
+
+class IndexedHeap:
+    """
+    带位置索引的二叉最小堆：除 push/pop 外，还支持按元素 O(log n) 删除与改键。
+
+    heapq 只能"懒删除"（把旧条目留在堆里、靠 visited 标记跳过），堆会随重复入堆不断膨胀；
+    这里为每个元素记录它在堆数组中的下标，元素出堆即真正移除，同一元素在堆中至多一份。
+    键（key）可以是任意可比较对象，一般用元组表达多级排序与平局裁决。
+    """
+
+    def __init__(self):
+        self._heap: List[Tuple[Any, Hashable]] = []  # [(key, item), ...]
+        self._pos: Dict[Hashable, int] = {}  # item -> 在 _heap 中的下标
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+    def __bool__(self) -> bool:
+        return bool(self._heap)
+
+    def __contains__(self, item: Hashable) -> bool:
+        return item in self._pos
+
+    def clear(self):
+        self._heap.clear()
+        self._pos.clear()
+
+    def key(self, item: Hashable) -> Any:
+        return self._heap[self._pos[item]][0]
+
+    def peek(self) -> Hashable:
+        return self._heap[0][1]
+
+    def peek_key(self) -> Any:
+        return self._heap[0][0]
+
+    def push(self, item: Hashable, key: Any):
+        """入堆；元素已在堆中时等价于 update"""
+        if item in self._pos:
+            self.update(item, key)
+            return
+        self._heap.append((key, item))
+        self._pos[item] = len(self._heap) - 1
+        self._sift_up(len(self._heap) - 1)
+
+    def pop(self) -> Hashable:
+        """弹出并返回键最小的元素"""
+        item = self._heap[0][1]
+        self._remove_at(0)
+        return item
+
+    def remove(self, item: Hashable) -> Optional[Any]:
+        """删除指定元素，返回其键；元素不在堆中时返回 None"""
+        i = self._pos.get(item)
+        if i is None:
+            return None
+        key = self._heap[i][0]
+        self._remove_at(i)
+        return key
+
+    def update(self, item: Hashable, key: Any):
+        """修改已在堆中元素的键（增大或减小均可）"""
+        i = self._pos[item]
+        old_key = self._heap[i][0]
+        self._heap[i] = (key, item)
+        if key < old_key:
+            self._sift_up(i)
+        else:
+            self._sift_down(i)
+
+    # -------------------------- 内部：堆维护 --------------------------
+    def _remove_at(self, i: int):
+        heap = self._heap
+        del self._pos[heap[i][1]]
+        last = heap.pop()
+        if i < len(heap):
+            heap[i] = last
+            self._pos[last[1]] = i
+            self._sift_down(i)
+            self._sift_up(i)
+
+    def _sift_up(self, i: int):
+        heap, pos = self._heap, self._pos
+        entry = heap[i]
+        while i > 0:
+            parent = (i - 1) >> 1
+            if entry[0] < heap[parent][0]:
+                heap[i] = heap[parent]
+                pos[heap[i][1]] = i
+                i = parent
+            else:
+                break
+        heap[i] = entry
+        pos[entry[1]] = i
+
+    def _sift_down(self, i: int):
+        heap, pos = self._heap, self._pos
+        n = len(heap)
+        entry = heap[i]
+        while True:
+            child = 2 * i + 1
+            if child >= n:
+                break
+            right = child + 1
+            if right < n and heap[right][0] < heap[child][0]:
+                child = right
+            if heap[child][0] < entry[0]:
+                heap[i] = heap[child]
+                pos[heap[i][1]] = i
+                i = child
+            else:
+                break
+        heap[i] = entry
+        pos[entry[1]] = i
@@ -0,0 +1,199 @@
+from typing import List, Optional, Tuple
+
+from env import GridMap, _INVERT
+
+_TO_DIGITS = bytes.maketrans(b"\x00\x01", b"01")  # 0/1 字节 -> '0'/'1' 字符，用于整行/整列转为整数位串
+
+# 到达方向位，与 GridMap 邻接掩码的方向位一致：bit0 向左(-x)、bit1 向右(+x)、bit2 向上(-y)、bit3 向下(+y)
+LEFT, RIGHT, UP, DOWN = 1, 2, 4, 8
+START_DIRS = LEFT | RIGHT  # 起点按“水平到达”处理：水平两个方向 + 垂直两个方向都是自然后继
+_DIR_BITS = {(-1, 0): LEFT, (1, 0): RIGHT, (0, -1): UP, (0, 1): DOWN}
+
+
+def _bits(digits: bytes) -> int:
+    """'0'/'1' 字符串（第 k 个字符对应第 k 位）转为整数"""
+    return int(digits[::-1], 2) if digits else 0
+
+
+def _scan(free_bits: int, stop_bits: int, pos: int) -> Tuple[int, int]:
+    """
+    从第 pos 位出发向高位扫描：返回 (前方连续可行格数 run, run 以内第一个停止位的步数)，
+    没有停止位时步数为 0。整段用位运算完成，不逐格循环。
+    """
+    ahead = free_bits >> (pos + 1)
+    run = (~ahead & (ahead + 1)).bit_length() - 1
+    stops = (stop_bits >> (pos + 1)) & ((1 << run) - 1)
+    return run, (stops & -stops).bit_length()
+
+
+class JumpTables:
+    """
+    四连通单位代价栅格上的跳点（JPS）剪枝所需的整行/整列位图。
+
+    规范路径取“水平优先”：等价的最短路径中，水平移动尽量提前。于是
+      - 水平到达的节点：继续同向水平、向上、向下都是自然后继；
+      - 垂直到达（方向 dy）的节点：只继续同向垂直；只有身旁 (x±1, y) 可行而 (x±1, y-dy) 被挡时，
+        才被迫转向水平（强迫邻居）。
+    垂直跳跃沿一列前进，停在 强迫转向格 / 终点 处；水平跳跃沿一行前进，停在 “从该格垂直跳跃能找到跳点” 的格 /
+    终点列（且能垂直直达终点）处。两者都用预计算的位图一次定位，搜索只在跳点上进行。
+
+    “从该格垂直跳跃能找到跳点” 与地图本身有关、与查询无关，构建时用整图大整数的倍增传播一次算出。
+    表记录构建时的地图版本；障碍物变化后由 get_jump_tables 重建。
+    """
+
+    def __init__(self, grid_map: GridMap):
+        self.grid_map = grid_map
+        self.version = grid_map.version
+        width, height = grid_map.width, grid_map.height
+        self.width, self.height = width, height
+        size = width * height
+        free_cells = bytes(grid_map.to_mask().translate(_INVERT))  # 每格一字节，1=可行
+
+        # 整图大整数（每格 8 位，格 i 在第 8i 位）上计算强迫转向格与“垂直跳跃有果”的格
+        ones = int.from_bytes(b"\x01" * size, "little")
+        row_shift = 8 * width
+        free = int.from_bytes(free_cells, "little")
+        not_first_col = int.from_bytes((b"\x00" + b"\x01" * (width - 1)) * height, "little")
+        not_last_col = int.from_bytes((b"\x01" * (width - 1) + b"\x00") * height, "little")
+        left_free = (free << 8) & not_first_col  # (x-1, y) 可行
+        right_free = (free >> 8) & not_last_col  # (x+1, y) 可行
+        # 向下（+y）到达 (x,y) 时被迫转向：身旁可行，而身旁的上一行 (x±1, y-1) 被挡
+        forced_down = free & (
+            (left_free & ~(left_free << row_shift)) | (right_free & ~(right_free << row_shift))
+        ) & ones
+        # 向上（-y）到达时：身旁可行，而身旁的下一行 (x±1, y+1) 被挡
+        forced_up = free & (
+            (left_free & ~(left_free >> row_shift)) | (right_free & ~(right_free >> row_shift))
+        ) & ones
+
+        # reach_down：从该格向下跳跃，在碰到障碍前能遇到强迫转向格。倍增：
+        #   T_k = k 步以内经可行格到达强迫格；E_k = 向下 k 格全部可行
+        #   T_2k = T_k | (E_k & T_k 下移 k 行)；E_2k = E_k & E_k 下移 k 行
+        reach_down, chain = forced_down >> row_shift, free >> row_shift
+        reach_up, chain_up = (forced_up << row_shift) & ones, (free << row_shift) & ones
+        k = 1
+        while k < height:
+            shift = k * row_shift
+            reach_down |= chain & (reach_down >> shift)
+            chain &= chain >> shift
+            reach_up |= chain_up & ((reach_up << shift) & ones)
+            chain_up &= (chain_up << shift) & ones
+            k *= 2
+        stops = (reach_down | reach_up) & free
+        stop_cells = stops.to_bytes(size, "little")
+
+        # 按行、按列切成位串整数；反向扫描（-x / -y）使用位序反转的副本，同样向高位扫描
+        free_digits = free_cells.translate(_TO_DIGITS)
+        stop_digits = stop_cells.translate(_TO_DIGITS)
+        down_digits = forced_down.to_bytes(size, "little").translate(_TO_DIGITS)
+        up_digits = forced_up.to_bytes(size, "little").translate(_TO_DIGITS)
+        rows = range(0, size, width)
+        self.row_free = [_bits(free_digits[i:i + width]) for i in rows]
+        self.row_stop = [_bits(stop_digits[i:i + width]) for i in rows]
+        self.row_free_rev = [_bits(free_digits[i:i + width][::-1]) for i in rows]
+        self.row_stop_rev = [_bits(stop_digits[i:i + width][::-1]) for i in rows]
+        self.col_free = [_bits(free_digits[x::width]) for x in range(width)]
+        self.col_forced_down = [_bits(down_digits[x::width]) for x in range(width)]
+        self.col_free_rev = [_bits(free_digits[x::width][::-1]) for x in range(width)]
+        self.col_forced_up_rev = [_bits(up_digits[x::width][::-1]) for x in range(width)]
+
+    def jump_vertical(self, x: int, y: int, dy: int, goal: Tuple[int, int]) -> int:
+        """从 (x,y) 沿 dy 垂直跳跃，返回跳点的 y 坐标；途中没有跳点（撞墙）时返回 -1"""
+        if dy > 0:
+            run, k = _scan(self.col_free[x], self.col_forced_down[x], y)
+        else:
+            run, k = _scan(self.col_free_rev[x], self.col_forced_up_rev[x], self.height - 1 - y)
+        if goal[0] == x:
+            d = (goal[1] - y) * dy
+            if 0 < d <= run and (k == 0 or d < k):
+                k = d
+        return y + dy * k if k else -1
+
+    def jump_horizontal(self, x: int, y: int, dx: int, goal: Tuple[int, int]) -> int:
+        """从 (x,y) 沿 dx 水平跳跃，返回跳点的 x 坐标；途中没有跳点时返回 -1"""
+        if dx > 0:
+            run, k = _scan(self.row_free[y], self.row_stop[y], x)
+        else:
+            run, k = _scan(self.row_free_rev[y], self.row_stop_rev[y], self.width - 1 - x)
+        gx, gy = goal
+        d = (gx - x) * dx
+        if 0 < d <= run and (k == 0 or d < k):
+            # 终点列：同一行，或从该格能垂直直达终点
+            lo, hi = min(y, gy), max(y, gy)
+            span = (1 << (hi - lo + 1)) - 1
+            if (self.col_free[gx] >> lo) & span == span:
+                k = d
+        return x + dx * k if k else -1
+
+    def jump_dirs(self, x: int, y: int, dirs: int) -> int:
+        """
+        到达方向集合 dirs 下 (x,y) 需要做的跳跃方向（同样用 LEFT/RIGHT/UP/DOWN 位表示）。
+        一个节点可能经不同方向到达，需要的跳跃取各到达方向的并集。
+        """
+        jumps = 0
+        if dirs & (LEFT | RIGHT):
+            jumps |= UP | DOWN | (dirs & (LEFT | RIGHT))
+        for dy, bit in ((-1, UP), (1, DOWN)):
+            if dirs & bit:
+                jumps |= bit
+                # 垂直到达后被迫转向的水平方向
+                if self._free(x - 1, y) and not self._free(x - 1, y - dy):
+                    jumps |= LEFT
+                if self._free(x + 1, y) and not self._free(x + 1, y - dy):
+                    jumps |= RIGHT
+        return jumps
+
+    def successors(self, x: int, y: int, jumps: int, goal: Tuple[int, int]) -> List[Tuple[int, int, int]]:
+        """沿 jumps 中的各方向跳跃，返回找到的后继跳点 [(x', y', 方向位), ...]"""
+        result = []
+        if jumps & LEFT:
+            jx = self.jump_horizontal(x, y, -1, goal)
+            if jx >= 0:
+                result.append((jx, y, LEFT))
+        if jumps & RIGHT:
+            jx = self.jump_horizontal(x, y, 1, goal)
+            if jx >= 0:
+                result.append((jx, y, RIGHT))
+        if jumps & UP:
+            jy = self.jump_vertical(x, y, -1, goal)
+            if jy >= 0:
+                result.append((x, jy, UP))
+        if jumps & DOWN:
+            jy = self.jump_vertical(x, y, 1, goal)
+            if jy >= 0:
+                result.append((x, jy, DOWN))
+        return result
+
+    def _free(self, x: int, y: int) -> bool:
+        return 0 <= x < self.width and 0 <= y < self.height and bool(self.row_free[y] >> x & 1)
+
+
+def get_jump_tables(grid_map: GridMap) -> JumpTables:
+    """取地图上缓存的跳点表；没有或地图已变化时重建，并缓存到 grid_map.jump_tables"""
+    tables = grid_map.jump_tables
+    if tables is None or tables.version != grid_map.version:
+        tables = JumpTables(grid_map)
+        grid_map.jump_tables = tables
+    return tables
+
+
+def fill_segments(path: List[Tuple[int, int]]) -> List[Tuple[int, int]]:
+    """把跳点序列（相邻跳点同行或同列）展开为逐格路径"""
+    if not path:
+        return path
+    cells = [path[0]]
+    for (x0, y0), (x1, y1) in zip(path, path[1:]):
+        dx = (x1 > x0) - (x1 < x0)
+        dy = (y1 > y0) - (y1 < y0)
+        for step in range(1, abs(x1 - x0) + abs(y1 - y0) + 1):
+            cells.append((x0 + dx * step, y0 + dy * step))
+    return cells
+
+
+def step_back(pos: Tuple[int, int], origin: Optional[Tuple[int, int]]) -> Optional[Tuple[int, int]]:
+    """从 origin 跳到 pos 的线段上，pos 的前一格（供按相邻父节点计算方向一致性的二次排序函数使用）"""
+    if origin is None:
+        return None
+    dx = (pos[0] > origin[0]) - (pos[0] < origin[0])
+    dy = (pos[1] > origin[1]) - (pos[1] < origin[1])
+    return pos[0] - dx, pos[1] - dy
@@ -0,0 +1,397 @@
+import time
+from array import array
+from typing import Dict, FrozenSet, List, NamedTuple, Optional, Sequence, Tuple
+
+from env import GridMap
+from heuristics import bfs_distances
+from search_state import SearchContext, INF
+
+
+class MultiAgentResult(NamedTuple):
+    """MultiAgentPlanner.plan 的结果"""
+    paths: List[Optional[List[Tuple[int, int]]]]  # 每个智能体按时刻的位置（path[t]，原地等待时重复），到达后停在终点
+    solved: bool  # 路径之间是否已无冲突；预算用尽时返回冲突最少的一组路径
+    cost: int  # 各智能体到达时刻之和（sum of costs）
+    conflicts: int  # 剩余冲突数
+    high_level_expansions: int  # 约束树上展开的节点数
+    low_level_expansions: int  # 各次单智能体时空搜索的扩展数之和
+    elapsed: float
+
+
+class _SpaceTimeState:
+    """
+    时空搜索的节点存储：接口与 search_state.SearchState 相同（g/h/f/focal_value/parent 按下标读写，reset/backtrack），
+    但用字典按需存放，下标为 t*格数+格下标，时间轴不受预分配大小的限制。
+    focal_value 存的是从起点到该节点累计的冲突数。
+    """
+
+    def __init__(self):
+        self.g: Dict[int, float] = {}
+        self.h: Dict[int, float] = {}
+        self.f: Dict[int, float] = {}
+        self.focal_value: Dict[int, float] = {}
+        self.parent: Dict[int, int] = {}
+        self.visited = set()
+
+    def reset(self):
+        self.g.clear()
+        self.h.clear()
+        self.f.clear()
+        self.focal_value.clear()
+        self.parent.clear()
+        self.visited.clear()
+
+    def backtrack(self, index: int) -> List[int]:
+        indices = []
+        parent = self.parent
+        while index != -1:
+            indices.append(index)
+            index = parent[index]
+        return indices[::-1]
+
+
+class ReservationTable:
+    """
+    共享的时空预约表：记录每个智能体路径占用的 (时刻, 栅格)、移动边，以及到达后停留的终点。
+    路径以栅格下标序列登记（第 t 项为时刻 t 的位置）；count() 给出某一步与其他智能体冲突的次数，
+    作为低层 focal 搜索的二次排序值。sync() 只替换发生变化的路径，约束树各节点之间切换时代价很小。
+    """
+
+    def __init__(self, size: int):
+        self.size = size  # 地图格数：时空下标 = t*size + 格下标
+        self.paths: Dict[int, List[int]] = {}
+        self._vertex: Dict[int, List[int]] = {}  # 时空下标 -> 占用的智能体
+        self._edges: Dict[Tuple[int, int, int], List[int]] = {}  # (到达时刻, 起点格, 终点格) -> 智能体
+        self._parked: Dict[int, List[Tuple[int, int]]] = {}  # 终点格 -> [(开始停留的时刻, 智能体)]
+
+    def add(self, agent: int, path: List[int]):
+        size = self.size
+        self.paths[agent] = path
+        for t, cell in enumerate(path):
+            self._vertex.setdefault(t * size + cell, []).append(agent)
+            if t and path[t - 1] != cell:
+                self._edges.setdefault((t, path[t - 1], cell), []).append(agent)
+        self._parked.setdefault(path[-1], []).append((len(path), agent))
+
+    def remove(self, agent: int):
+        path = self.paths.pop(agent, None)
+        if path is None:
+            return
+        size = self.size
+        for t, cell in enumerate(path):
+            _discard(self._vertex, t * size + cell, agent)
+            if t and path[t - 1] != cell:
+                _discard(self._edges, (t, path[t - 1], cell), agent)
+        _discard(self._parked, path[-1], (len(path), agent))
+
+    def sync(self, paths: Sequence[Optional[List[int]]]):
+        """让表中的内容与 paths 一致：只重新登记与当前登记对象不同的路径"""
+        for agent, path in enumerate(paths):
+            current = self.paths.get(agent)
+            if current is path:
+                continue
+            self.remove(agent)
+            if path is not None:
+                self.add(agent, path)
+
+    def clear(self):
+        self.paths.clear()
+        self._vertex.clear()
+        self._edges.clear()
+        self._parked.clear()
+
+    def count(self, agent: int, source: int, target: int, t: int) -> int:
+        """agent 在时刻 t 从 source 走到（或停在）target 时，与其他智能体的冲突次数"""
+        n = 0
+        for other in self._vertex.get(t * self.size + target, ()):
+            n += other != agent
+        if source != target:
+            for other in self._edges.get((t, target, source), ()):
+                n += other != agent
+        for since, other in self._parked.get(target, ()):
+            n += other != agent and since <= t
+        return n
+
+
+def _discard(index: dict, key, value):
+    values = index.get(key)
+    if values is not None:
+        values.remove(value)
+        if not values:
+            del index[key]
+
+
+class _Constraints(NamedTuple):
+    """约束树节点上某个智能体的硬约束"""
+    vertex: FrozenSet[int]  # 禁止的时空下标 t*size+cell
+    edges: FrozenSet[Tuple[int, int, int]]  # 禁止的 (到达时刻, 起点格, 终点格)
+
+
+_NO_CONSTRAINTS = _Constraints(frozenset(), frozenset())
+
+
+class _Node(NamedTuple):
+    """约束树节点"""
+    cost: int
+    lower_bound: float
+    conflicts: int
+    seq: int
+    paths: List[Optional[List[int]]]
+    lower_bounds: List[float]
+    constraints: Dict[int, _Constraints]
+    first_conflict: Optional[tuple]
+
+
+class MultiAgentPlanner:
+    """
+    多智能体规划（ECBS 式）：高层在约束树上搜索，低层对单个智能体做时空 focal 搜索。
+
+    - 低层：状态为 (栅格, 时刻)，动作为四方向移动或原地等待，代价为到达时刻；启发式取终点的精确 BFS 距离表
+      （每个终点只算一次，跨多次规划复用）。OPEN/FOCAL 与 FocalSearch 相同，二次排序值是与共享预约表中
+      其他智能体路径的累计冲突数，因此在界限 (1+w)·f_min 之内优先选冲突最少的路径。
+    - 高层：根节点按顺序为各智能体规划，每条路径都登记进同一张预约表，后规划的智能体主动避开先规划的；
+      之后每次取出一个冲突，分别给冲突双方加约束、只重规划该智能体。FOCAL 取代价不超过 (1+w)·下界 的节点中
+      冲突最少者，因此解的总代价不超过 (1+w) 倍最优。
+    - 每个智能体的搜索上下文（时空节点存储 + OPEN/FOCAL 队列）在各次重规划之间复用。
+    """
+
+    def __init__(self, grid_map: GridMap, w: float = 0.2):
+        """:param w: 高层与低层共同的次优系数，解的总代价不超过 (1+w) 倍最优"""
+        self.grid_map = grid_map
+        self.w = w
+        self.table = ReservationTable(grid_map.width * grid_map.height)
+        self._contexts: List[SearchContext] = []  # 按智能体编号复用的搜索上下文
+        self._goal_tables: Dict[int, array] = {}  # 终点下标 -> 到该终点的 BFS 距离表
+        self._version = grid_map.version
+        self.low_level_expansions = 0
+
+    def _distances(self, goal: int) -> array:
+        if self._version != self.grid_map.version:
+            self._goal_tables.clear()
+            self._version = self.grid_map.version
+        table = self._goal_tables.get(goal)
+        if table is None:
+            table = self._goal_tables[goal] = bfs_distances(self.grid_map, goal)
+        return table
+
+    def _context(self, agent: int) -> SearchContext:
+        while len(self._contexts) <= agent:
+            self._contexts.append(SearchContext(0, 0, _SpaceTimeState()))
+        context = self._contexts[agent]
+        context.reset()
+        return context
+
+    def _plan_agent(
+        self,
+        agent: int,
+        start: int,
+        goal: int,
+        constraints: _Constraints,
+        max_expansions: Optional[int] = None
+    ) -> Tuple[Optional[List[int]], float]:
+        """
+        单个智能体的时空 focal 搜索，返回 (路径的栅格下标序列, 代价下界)。
+        到达终点且此后终点上没有顶点约束时结束（之后一直停在终点）。
+        """
+        grid_map, w, table = self.grid_map, self.w, self.table
+        size = grid_map.width * grid_map.height
+        masks, deltas = grid_map.adjacency()
+        dist = self._distances(goal)
+        if dist[start] == INF:
+            return None, INF
+        vertex, edges = constraints
+        last_constraint = max([key // size for key in vertex] + [key[0] for key in edges] + [0])
+        goal_free_after = max([key // size for key in vertex if key % size == goal] + [-1])
+        horizon = last_constraint + dist[start] + grid_map.width + grid_map.height
+
+        context = self._context(agent)
+        state = context.state
+        g_arr, h_arr, f_arr = state.g, state.h, state.f
+        focal_arr, parent_arr, visited = state.focal_value, state.parent, state.visited
+        g_arr[start] = 0.0
+        h_arr[start] = f_arr[start] = dist[start]
+        focal_arr[start] = 0.0
+        parent_arr[start] = -1
+        context.f_min = f_arr[start]
+        context.bound = (w + 1) * context.f_min
+        context.push_open(start)
+        expansions = 0
+        path = None
+
+        while context.open:
+            if max_expansions is not None and expansions >= max_expansions:
+                break
+            context.update_focal(w)
+            current = context.pop_focal()
+            if current is None:
+                break
+            visited.add(current)
+            expansions += 1
+            t, cell = divmod(current, size)
+            if cell == goal and t > goal_free_after:
+                path = [key % size for key in state.backtrack(current)]
+                break
+            if t >= horizon:
+                continue
+
+            nt = t + 1
+            conflicts = focal_arr[current]
+            for target in (cell,) + tuple(cell + delta for delta in deltas[masks[cell]]):
+                key = nt * size + target
+                if key in visited or key in vertex or (nt, cell, target) in edges:
+                    continue
+                value = conflicts + table.count(agent, cell, target, nt)
+                if key not in g_arr:
+                    g_arr[key] = float(nt)
+                    h_arr[key] = dist[target]
+                    f_arr[key] = nt + dist[target]
+                elif value < focal_arr[key]:
+                    # 同一时空节点的代价总是 t：只有冲突更少时才改挂父节点
+                    context.remove_open(key)
+                else:
+                    continue
+                focal_arr[key] = value
+                parent_arr[key] = current
+                context.push_open(key)
+
+        self.low_level_expansions += expansions
+        return path, context.f_min
+
+    def plan(
+        self,
+        starts: Sequence[Tuple[int, int]],
+        goals: Sequence[Tuple[int, int]],
+        max_nodes: int = 1000,
+        time_limit: Optional[float] = None,
+        max_expansions: Optional[int] = None
+    ) -> MultiAgentResult:
+        """
+        为所有智能体一起规划无冲突路径。
+        :param max_nodes: 约束树展开节点数上限
+        :param time_limit: 时限（秒）
+        :param max_expansions: 单次低层搜索的扩展上限
+        预算用尽仍有冲突时返回 solved=False 与冲突最少的一组路径。
+        """
+        if len(starts) != len(goals):
+            raise ValueError("starts 与 goals 的数量必须相同")
+        if len(set(goals)) != len(goals) or len(set(starts)) != len(starts):
+            raise ValueError("各智能体的起点、终点必须互不相同")
+        t0 = time.perf_counter()
+        deadline = None if time_limit is None else time.monotonic() + time_limit
+        self.low_level_expansions = 0
+        index = self.grid_map.index
+        start_cells = [index(*s) for s in starts]
+        goal_cells = [index(*g) for g in goals]
+        table = self.table
+        table.clear()
+
+        # 根节点：依次规划，每条路径立即登记进预约表
+        paths: List[Optional[List[int]]] = []
+        lower_bounds: List[float] = []
+        for agent, (start, goal) in enumerate(zip(start_cells, goal_cells)):
+            path, lower_bound = self._plan_agent(agent, start, goal, _NO_CONSTRAINTS, max_expansions)
+            if path is not None:
+                table.add(agent, path)
+            paths.append(path)
+            lower_bounds.append(lower_bound)
+        if any(path is None for path in paths):
+            return self._result(paths, None, False, 0, t0)
+
+        seq = 0
+        root = self._make_node(paths, lower_bounds, {}, seq)
+        open_nodes = [root]
+        best = root
+        expanded = 0
+        while open_nodes and expanded < max_nodes:
+            if deadline is not None and time.monotonic() >= deadline:
+                break
+            bound = (1 + self.w) * min(node.lower_bound for node in open_nodes)
+            node = min(
+                (node for node in open_nodes if node.cost <= bound),
+                key=lambda node: (node.conflicts, node.cost, node.seq)
+            )
+            open_nodes.remove(node)
+            expanded += 1
+            if node.conflicts < best.conflicts:
+                best = node
+            if node.first_conflict is None:
+                return self._result(node.paths, node, True, expanded, t0)
+
+            table.sync(node.paths)
+            for agent, vertex, edge in self._split(node.first_conflict):
+                old = node.constraints.get(agent, _NO_CONSTRAINTS)
+                constraints = dict(node.constraints)
+                constraints[agent] = _Constraints(
+                    old.vertex | {vertex} if vertex is not None else old.vertex,
+                    old.edges | {edge} if edge is not None else old.edges
+                )
+                # 预约表里仍登记着该智能体的旧路径；count() 不计自身，无需移除
+                path, lower_bound = self._plan_agent(
+                    agent, start_cells[agent], goal_cells[agent], constraints[agent], max_expansions
+                )
+                if path is None:
+                    continue
+                child_paths = list(node.paths)
+                child_paths[agent] = path
+                child_bounds = list(node.lower_bounds)
+                child_bounds[agent] = lower_bound
+                seq += 1
+                open_nodes.append(self._make_node(child_paths, child_bounds, constraints, seq))
+        return self._result(best.paths, best, False, expanded, t0)
+
+    def _make_node(
+        self, paths: List[List[int]], lower_bounds: List[float], constraints: Dict[int, _Constraints], seq: int
+    ) -> _Node:
+        conflicts, first = _find_conflicts(paths)
+        cost = sum(len(path) - 1 for path in paths)
+        return _Node(cost, sum(lower_bounds), conflicts, seq, paths, lower_bounds, constraints, first)
+
+    def _split(self, conflict: tuple) -> List[Tuple[int, Optional[int], Optional[Tuple[int, int, int]]]]:
+        """把冲突拆成给双方各加的一条约束：[(智能体, 顶点约束, 边约束), ...]"""
+        size = self.table.size
+        kind, a, b, t, cell_a, cell_b = conflict
+        if kind == "vertex":
+            key = t * size + cell_a
+            return [(a, key, None), (b, key, None)]
+        # 对穿：a 在时刻 t 从 cell_a 走到 cell_b，b 反向
+        return [(a, None, (t, cell_a, cell_b)), (b, None, (t, cell_b, cell_a))]
+
+    def _result(
+        self, paths: List[Optional[List[int]]], node: Optional[_Node], solved: bool, expanded: int, t0: float
+    ) -> MultiAgentResult:
+        coord = self.grid_map.coord
+        cells = [None if path is None else [coord(i) for i in path] for path in paths]
+        cost = sum(len(path) - 1 for path in paths if path is not None)
+        conflicts = node.conflicts if node is not None else 0
+        return MultiAgentResult(
+            cells, solved, cost, conflicts, expanded, self.low_level_expansions, time.perf_counter() - t0
+        )
+
+
+def _find_conflicts(paths: List[List[int]]) -> Tuple[int, Optional[tuple]]:
+    """
+    统计一组路径之间的冲突数，并返回最早的一个冲突：
+    ("vertex", a, b, t, cell, cell) 同一时刻占用同一格（含停在终点的智能体）；("edge", a, b, t, u, v) 相向对穿。
+    """
+    count, first = 0, None
+    horizon = max(len(path) for path in paths)
+    for t in range(horizon):
+        occupied: Dict[int, int] = {}
+        moves: Dict[Tuple[int, int], int] = {}
+        for agent, path in enumerate(paths):
+            cell = path[t] if t < len(path) else path[-1]
+            other = occupied.get(cell)
+            if other is not None:
+                count += 1
+                if first is None:
+                    first = ("vertex", other, agent, t, cell, cell)
+            else:
+                occupied[cell] = agent
+            if 0 < t < len(path) and path[t - 1] != cell:
+                other = moves.get((cell, path[t - 1]))
+                if other is not None:
+                    count += 1
+                    if first is None:
+                        first = ("edge", other, agent, t, cell, path[t - 1])
+                moves[(path[t - 1], cell)] = agent
+    return count, first
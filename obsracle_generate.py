@@ -1,6 +1,8 @@
 import random
 from typing import List, Tuple, Optional, Union
 
+import numpy as np
+
 class ObstacleGenerator:
     def __init__(
         self,
@@ -24,7 +26,15 @@ class ObstacleGenerator:
         # 预计算关键参数
         self.total_grids = self.map_width * self.map_height
         self.max_obstacle_count = self.total_grids - 2  # 避开创点/终点
-        self.valid_grids = self._get_all_valid_grids()  # 预生成可行栅格列表
+        self._valid_grids: Optional[List[Tuple[int, int]]] = None  # 可行栅格列表，首次使用时生成
+        self._valid_grid_set: Optional[set] = None
+
+    @property
+    def valid_grids(self) -> List[Tuple[int, int]]:
+        """所有“非起点/非终点”栅格的列表（仅列表接口使用；掩码接口不需要，大地图上不会生成）"""
+        if self._valid_grids is None:
+            self._valid_grids = self._get_all_valid_grids()
+        return self._valid_grids
 
     def _validate_point(self, point: Tuple[int, int], point_name: str):
         x, y = point
@@ -83,6 +93,9 @@ class ObstacleGenerator:
         cluster_centers = random.sample(self.valid_grids, k=cluster_num)
         obstacles = set()
 
+        if self._valid_grid_set is None:
+            self._valid_grid_set = set(self.valid_grids)  # 集合成员判断，避免逐个扫描列表
+
         # 围绕中心生成聚类障碍物
         for (cx, cy) in cluster_centers:
             if len(obstacles) >= obstacle_count:
@@ -91,7 +104,7 @@ class ObstacleGenerator:
                 for dy in range(-cluster_radius, cluster_radius + 1):
                     x, y = cx + dx, cy + dy
                     grid = (x, y)
-                    if grid in self.valid_grids and grid not in obstacles:
+                    if grid in self._valid_grid_set and grid not in obstacles:
                         obstacles.add(grid)
                         if len(obstacles) >= obstacle_count:
                             break
@@ -106,3 +119,91 @@ class ObstacleGenerator:
         
         return list(obstacles)
 
+    # -------------------------- 掩码接口（NumPy 向量化，适用于大地图） --------------------------
+    # 直接生成形状为 (map_height, map_width) 的 bool 数组（True=障碍物），可交给 GridMap.from_mask，
+    # 全程不构造坐标元组列表。随机源为 np.random.default_rng(seed)，同一 seed 结果可复现
+    # （与上面列表接口的随机序列不同，两者结果不要求一致）。
+    def _excluded_indices(self) -> List[int]:
+        """起点/终点的扁平下标（升序、去重）"""
+        return sorted({
+            self.start[1] * self.map_width + self.start[0],
+            self.goal[1] * self.map_width + self.goal[0]
+        })
+
+    def _sample_valid_indices(self, rng: np.random.Generator, count: int, taken: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        从“非起点/非终点”（以及不在 taken 中）的栅格里无放回抽取 count 个扁平下标。
+        taken 为空时不物化候选集合：在缩小后的下标空间中抽样，再把下标平移跳过起终点。
+        """
+        if taken is None:
+            excluded = self._excluded_indices()
+            picks = rng.choice(self.total_grids - len(excluded), size=count, replace=False)
+            for index in excluded:  # 升序平移：跳过每个被排除的下标
+                picks += picks >= index
+            return picks
+        candidates = np.flatnonzero(~taken)
+        candidates = candidates[~np.isin(candidates, self._excluded_indices())]
+        return rng.choice(candidates, size=count, replace=False)
+
+    def generate_mask(self, obstacle_count: int, seed: Optional[int] = None) -> np.ndarray:
+        """按数量生成障碍物掩码"""
+        self._validate_obstacle_count(obstacle_count)
+        rng = np.random.default_rng(seed)
+        mask = np.zeros(self.total_grids, dtype=bool)
+        if obstacle_count:
+            mask[self._sample_valid_indices(rng, obstacle_count)] = True
+        return mask.reshape(self.map_height, self.map_width)
+
+    def generate_mask_by_density(self, density: float, seed: Optional[int] = None) -> np.ndarray:
+        """按密度生成障碍物掩码（数量取法与 generate_by_density 一致）"""
+        if not (0.0 <= density <= 1.0):
+            raise ValueError(f"密度必须在 [0.0,1.0] 内，当前：{density}")
+        target_count = min(int(self.max_obstacle_count * density), self.max_obstacle_count)
+        return self.generate_mask(obstacle_count=target_count, seed=seed)
+
+    def generate_clustered_mask(
+        self,
+        obstacle_count: int,
+        cluster_num: int = 3,
+        cluster_radius: int = 2,
+        seed: Optional[int] = None
+    ) -> np.ndarray:
+        """
+        聚类障碍物掩码：语义同 generate_clustered——依次用以聚类中心为心、边长 2r+1 的方块填充，
+        数量达到上限时最后一块只填一部分（按 x 优先、y 次之的顺序），不足部分再随机补齐。
+        每个聚类块用数组切片一次写入。
+        """
+        self._validate_obstacle_count(obstacle_count)
+        if cluster_num <= 0 or cluster_radius <= 0:
+            raise ValueError("聚类数量/半径必须为正整数")
+        rng = np.random.default_rng(seed)
+        width, height = self.map_width, self.map_height
+        mask = np.zeros((height, width), dtype=bool)
+        keep_free = np.zeros((height, width), dtype=bool)  # 起点/终点不可被占
+        for index in self._excluded_indices():
+            keep_free[index // width, index % width] = True
+
+        placed = 0
+        for center in self._sample_valid_indices(rng, cluster_num):
+            if placed >= obstacle_count:
+                break
+            cx, cy = int(center % width), int(center // width)
+            x0, x1 = max(cx - cluster_radius, 0), min(cx + cluster_radius + 1, width)
+            y0, y1 = max(cy - cluster_radius, 0), min(cy + cluster_radius + 1, height)
+            fresh = ~(mask[y0:y1, x0:x1] | keep_free[y0:y1, x0:x1])
+            new_count = int(fresh.sum())
+            if placed + new_count > obstacle_count:
+                # 只取前 remaining 个新格子：按列（x）优先展开，与列表接口的 dx 外层循环顺序一致
+                order = np.flatnonzero(fresh.T.ravel())[:obstacle_count - placed]
+                fresh = np.zeros(fresh.size, dtype=bool)
+                fresh[order] = True
+                fresh = fresh.reshape(x1 - x0, y1 - y0).T
+                new_count = obstacle_count - placed
+            mask[y0:y1, x0:x1] |= fresh
+            placed += new_count
+
+        # 补充不足数量的随机障碍物
+        if placed < obstacle_count:
+            flat = mask.ravel()
+            flat[self._sample_valid_indices(rng, obstacle_count - placed, taken=flat)] = True
+        return mask
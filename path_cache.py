@@ -0,0 +1,93 @@
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional
+
+MISS = object()  # get() 未命中时的返回值（与缓存的 None 结果区分）
+
+
+class PathCache:
+    """
+    规划结果的 LRU 缓存：键为 (地图摘要, 查询类型, 起点, 终点, 参数...)，值为路径或候选路径列表。
+
+    条目数超过 max_entries 或近似内存占用超过 max_bytes 时淘汰最久未使用的条目。
+    地图内容变化后（validate 收到新的摘要），旧地图的条目全部失效；障碍物先加后删恢复原状时摘要不变，缓存继续有效。
+    一个缓存对应一张地图：可以被同一地图上的多个规划器、多个线程共享。
+    """
+
+    def __init__(self, max_entries: int = 1024, max_bytes: int = 64 << 20):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()  # key -> (value, size)
+        self._lock = threading.Lock()
+        self._map_hash: Optional[bytes] = None
+        self.nbytes = 0  # 当前条目的近似内存占用
+        self.hits = 0
+        self.misses = 0
+        self.bypassed = 0  # 不可缓存的查询（自定义启发式、未给定种子的随机候选生成等）
+        self.evictions = 0  # 因容量淘汰的条目数
+        self.invalidations = 0  # 因地图变化失效的条目数
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def validate(self, map_hash: bytes):
+        """地图摘要与缓存内容所属的地图不同时清空缓存"""
+        with self._lock:
+            if map_hash != self._map_hash:
+                self.invalidations += len(self._entries)
+                self._entries.clear()
+                self.nbytes = 0
+                self._map_hash = map_hash
+
+    def bypass(self):
+        """记录一次未经缓存的查询"""
+        with self._lock:
+            self.bypassed += 1
+
+    def get(self, key: Hashable) -> Any:
+        """命中时返回缓存值并将其标记为最近使用，未命中返回 MISS"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return MISS
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key: Hashable, value: Any, size: int):
+        """写入条目；size 为其近似内存占用，单个条目超过 max_bytes 时不缓存"""
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self.nbytes -= old[1]
+            self._entries[key] = (value, size)
+            self.nbytes += size
+            while len(self._entries) > self.max_entries or self.nbytes > self.max_bytes:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self.nbytes -= evicted_size
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.nbytes = 0
+
+    def as_dict(self) -> Dict:
+        return {
+            "entries": len(self._entries),
+            "nbytes": self.nbytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "bypassed": self.bypassed,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+            "hit_rate": self.hit_rate,
+        }
@@ -0,0 +1,169 @@
+import struct
+import sys
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+# 移动码与 GridMap 邻接掩码的位序一致：0 向左(-x)、1 向右(+x)、2 向上(-y)、3 向下(+y)
+_STEPS = ((-1, 0), (1, 0), (0, -1), (0, 1))
+_STEP_CODES = {step: code for code, step in enumerate(_STEPS)}
+# 一个字节（4 个移动码，低位在前）对应的 4 步位移
+_BYTE_STEPS = tuple(tuple(_STEPS[byte >> shift & 3] for shift in (0, 2, 4, 6)) for byte in range(256))
+
+# 批量导出格式（全部小端）：路径数 u32；随后每条路径为 起点 x i32、y i32、步数 u32 + ceil(步数/4) 字节的移动码
+_EXPORT_HEADER = struct.Struct("<I")
+_PATH_HEADER = struct.Struct("<iiI")
+
+
+class PackedPath:
+    """
+    紧凑路径：起点 + 每步 2 位的移动码，每字节 4 步。
+    一条 n 格的路径约占 n/4 字节（坐标元组列表约 70n 字节）；可哈希，相等即路径相同，可直接作去重的键。
+    """
+    __slots__ = ("start", "moves", "data", "_hash")
+
+    def __init__(self, start: Tuple[int, int], moves: int, data: bytes):
+        self.start = start
+        self.moves = moves  # 步数（格数 - 1）
+        self.data = data
+        self._hash = hash((start, moves, data))
+
+    @staticmethod
+    def from_cells(path: Sequence[Tuple[int, int]]) -> "PackedPath":
+        """由坐标序列编码；相邻两格必须四连通相邻，否则抛出 ValueError"""
+        codes = []
+        for (x0, y0), (x1, y1) in zip(path, path[1:]):
+            code = _STEP_CODES.get((x1 - x0, y1 - y0))
+            if code is None:
+                raise ValueError(f"({x0},{y0}) 与 ({x1},{y1}) 不相邻，无法编码")
+            codes.append(code)
+        codes += [0] * (-len(codes) % 4)
+        data = bytes(
+            codes[i] | codes[i + 1] << 2 | codes[i + 2] << 4 | codes[i + 3] << 6 for i in range(0, len(codes), 4)
+        )
+        return PackedPath(tuple(path[0]), len(path) - 1, data)
+
+    def __len__(self) -> int:
+        """格数（与坐标列表的长度一致）"""
+        return self.moves + 1
+
+    def __iter__(self) -> Iterator[Tuple[int, int]]:
+        x, y = self.start
+        yield x, y
+        remaining = self.moves
+        for byte in self.data:
+            for dx, dy in _BYTE_STEPS[byte][:remaining]:
+                x += dx
+                y += dy
+                yield x, y
+            remaining -= 4
+
+    def cells(self) -> List[Tuple[int, int]]:
+        """解码为坐标列表"""
+        return list(self)
+
+    def __eq__(self, other) -> bool:
+        return (
+            isinstance(other, PackedPath) and self._hash == other._hash
+            and self.moves == other.moves and self.start == other.start and self.data == other.data
+        )
+
+    def __hash__(self) -> int:
+        return self._hash
+
+    def __repr__(self) -> str:
+        return f"PackedPath(start={self.start}, moves={self.moves})"
+
+    @property
+    def nbytes(self) -> int:
+        """近似内存占用（字节）"""
+        return sys.getsizeof(self) + sys.getsizeof(self.data) + sys.getsizeof(self.start)
+
+
+def export_paths(paths: Iterable[PackedPath]) -> bytes:
+    """批量导出为一段连续字节（格式见 _EXPORT_HEADER 注释），下游可以直接按格式读取移动码，不必还原为坐标"""
+    paths = list(paths)
+    chunks = [_EXPORT_HEADER.pack(len(paths))]
+    for path in paths:
+        chunks.append(_PATH_HEADER.pack(path.start[0], path.start[1], path.moves))
+        chunks.append(path.data)
+    return b"".join(chunks)
+
+
+def import_paths(data) -> List[PackedPath]:
+    """export_paths 的逆过程"""
+    view = memoryview(data)
+    (count,) = _EXPORT_HEADER.unpack_from(view, 0)
+    offset = _EXPORT_HEADER.size
+    paths = []
+    for _ in range(count):
+        x, y, moves = _PATH_HEADER.unpack_from(view, offset)
+        offset += _PATH_HEADER.size
+        size = (moves + 3) // 4
+        paths.append(PackedPath((x, y), moves, bytes(view[offset:offset + size])))
+        offset += size
+    return paths
+
+
+class DiversityIndex:
+    """
+    候选路径的去重与多样性索引。
+      - 精确重复：按 PackedPath 哈希判定；
+      - 近似重复：候选路径的栅格中，落在某一条已收录路径上的比例达到 max_overlap 即视为近似重复。
+    每个栅格记下经过它的已收录路径（整数位集，第 k 位为第 k 条），计算重叠率只需遍历一次候选路径的栅格。
+    max_overlap=1.0 时只拒绝精确重复（与原先按完整坐标元组去重的行为一致），此时不建栅格索引，
+    shared / overlap 恒为 0；max_overlap 在构造后不应再修改。
+    """
+
+    def __init__(self, max_overlap: float = 1.0):
+        self.max_overlap = max_overlap
+        self.paths: List[PackedPath] = []
+        self._keys = set()
+        self._cover: Optional[Dict[Tuple[int, int], int]] = {} if max_overlap < 1.0 else None  # 栅格 -> 已收录路径位集
+
+    def __len__(self) -> int:
+        return len(self.paths)
+
+    def shared(self, cells: Iterable[Tuple[int, int]]) -> int:
+        """cells（去重后）与单条已收录路径共有栅格数的最大值"""
+        cover = self._cover
+        if cover is None:
+            return 0
+        counts = [0] * len(self.paths)
+        for cell in set(cells):
+            mask = cover.get(cell, 0)
+            while mask:
+                low = mask & -mask
+                counts[low.bit_length() - 1] += 1
+                mask ^= low
+        return max(counts, default=0)
+
+    def overlap(self, cells: Sequence[Tuple[int, int]]) -> float:
+        """候选路径与已收录路径的最大重叠率（共有栅格数 / 候选路径的不同栅格数）"""
+        distinct = len(set(cells))
+        return self.shared(cells) / distinct if distinct else 0.0
+
+    def check(self, cells: Sequence[Tuple[int, int]], packed: Optional[PackedPath] = None) -> str:
+        """判定候选路径："new" / "duplicate"（精确重复）/ "near_duplicate"（重叠率达到 max_overlap）"""
+        if packed is None:
+            packed = PackedPath.from_cells(cells)
+        if packed in self._keys:
+            return "duplicate"
+        if self._cover is not None and self.paths and self.overlap(cells) >= self.max_overlap:
+            return "near_duplicate"
+        return "new"
+
+    def add(self, cells: Sequence[Tuple[int, int]], packed: Optional[PackedPath] = None):
+        """收录一条路径（调用方应先用 check 判定为 "new"）"""
+        if packed is None:
+            packed = PackedPath.from_cells(cells)
+        bit = 1 << len(self.paths)
+        self.paths.append(packed)
+        self._keys.add(packed)
+        cover = self._cover
+        if cover is None:
+            return
+        for cell in cells:
+            cover[cell] = cover.get(cell, 0) | bit
+
+    def export(self) -> bytes:
+        """按收录顺序批量导出已收录路径（export_paths 格式）"""
+        return export_paths(self.paths)
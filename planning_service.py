@@ -0,0 +1,521 @@
+import asyncio
+import itertools
+import json
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from env import GridMap
+from focal_search import FocalSearch
+
+# 各类请求允许的参数（其余参数在提交时即被拒绝）
+REQUEST_PARAMS = {
+    "plan": {"w"},
+    "candidates": {
+        "candidate_num", "max_tries", "w_min", "w_max", "noise_strength", "seed", "max_expansions", "incremental",
+        "max_overlap"
+    },
+}
+
+
+class PlanResponse(NamedTuple):
+    """
+    一个规划请求的结果。status：
+      "ok"：找到路径；"no_path"：不可达；
+      "timeout"：截止时刻前未完成（到期时由事件循环直接答复，paths 为空；工作池恰在到期时完成的候选请求可能带有部分路径）；
+      "cancelled"：请求在执行前被取消
+    """
+    status: str
+    paths: List[List[Tuple[int, int]]]  # plan 请求至多一条
+    expansions: Optional[int]  # plan 请求的扩展节点数；候选请求为 None
+    latency: float  # 从提交到完成的耗时（秒），含排队时间
+
+
+class ServiceClosed(RuntimeError):
+    """服务已关闭或尚未启动"""
+
+
+class _Request:
+    __slots__ = ("op", "map_name", "start", "goal", "params", "deadline", "future", "submitted", "cancelled")
+
+    def __init__(self, op, map_name, start, goal, params, deadline, future):
+        self.op = op
+        self.map_name = map_name
+        self.start = start
+        self.goal = goal
+        self.params = params
+        self.deadline = deadline  # time.monotonic() 时间戳；None 表示不限时
+        self.future = future
+        self.submitted = time.monotonic()
+        self.cancelled = False  # Future 已完成（取消或超时）时由事件循环线程置位，工作线程在开始执行前及候选尝试之间检查
+
+    def item(self) -> tuple:
+        """发往工作进程的可序列化描述"""
+        return self.op, self.map_name, self.start, self.goal, self.params, self.deadline
+
+
+class PlanningService:
+    """
+    基于 asyncio 的规划服务：在已加载的 GridMap 上并发接受 路径 / 候选路径 请求。
+
+      - 微批处理：批处理协程取到第一个请求后再等待 batch_window 秒，把期间到达的请求（至多 max_batch 个）
+        打成一批交给工作池，一次调度摊薄线程/进程间的往返开销；
+      - 工作池：executor="thread" 时各线程共享每张地图上的 FocalSearch（GIL 下主要用于不阻塞事件循环），
+        executor="process" 时每个工作进程各持一份地图与规划器，可真正并行；同时在途的批数不超过 workers。
+        进程池模式下地图经 add_obstacles / remove_obstacles 变更后，下一批调度前重启工作池以同步新地图
+        （已在执行的批仍用旧地图完成）；
+      - 背压：排队请求数达到 max_pending 后 submit 挂起，直到队列有空位；
+      - 截止时刻：timeout 换算为 time.monotonic() 截止时刻，到期即答复 "timeout"（不等排在前面的批），
+        排队中到期的请求不再执行，执行中的搜索按截止时刻放弃；
+      - 取消：等待结果的协程被取消时请求随之取消，尚未开始执行的请求会被跳过；线程模式下已开始的候选请求在下一次尝试前停止
+        （单条路径的搜索执行到底或到截止时刻）。
+
+    用法：
+        async with PlanningService({"floor1": grid_map}) as service:
+            response = await service.plan("floor1", start, goal, timeout=0.5)
+    """
+
+    def __init__(
+        self,
+        maps: Optional[Dict[str, GridMap]] = None,
+        w: float = 1.2,
+        workers: int = 1,
+        executor: str = "thread",
+        batch_window: float = 0.002,
+        max_batch: int = 32,
+        max_pending: int = 1024
+    ):
+        if executor not in ("thread", "process"):
+            raise ValueError(f"不支持的 executor：{executor}，可选值：'thread'/'process'")
+        self.w = w
+        self.workers = workers
+        self.executor_kind = executor
+        self.batch_window = batch_window
+        self.max_batch = max_batch
+        self.max_pending = max_pending
+        self._planners: Dict[str, FocalSearch] = {}
+        for name, grid_map in (maps or {}).items():
+            self._planners[name] = FocalSearch(grid_map, w)
+        self._executor: Optional[Executor] = None
+        self._snapshot_versions: Dict[str, int] = {}  # 进程池模式：工作进程所持地图副本对应的 GridMap.version
+        self._queue: Optional[asyncio.Queue] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._batcher: Optional[asyncio.Task] = None
+        self._closed = False  # close() 开始后置位：此后完成入队的请求不会再被处理
+        self._inflight = set()  # 正在执行的批（_dispatch 任务）
+        self.batches = 0  # 已调度的批数
+        self.batched_requests = 0  # 已调度的请求数（batched_requests / batches 即平均批大小）
+
+    @property
+    def maps(self) -> Dict[str, GridMap]:
+        return {name: planner.grid_map for name, planner in self._planners.items()}
+
+    def load_map(self, name: str, grid_map: GridMap):
+        """加载（或替换）一张地图；进程池模式下会重启工作池，使新地图对所有工作进程可见"""
+        self._planners[name] = FocalSearch(grid_map, self.w)
+        if self._executor is not None and self.executor_kind == "process":
+            self._restart_executor()
+
+    def unload_map(self, name: str):
+        del self._planners[name]
+
+    # -------------------------- 生命周期 --------------------------
+    async def start(self):
+        if self._batcher is not None:
+            return
+        self._queue = asyncio.Queue(self.max_pending)
+        self._closed = False
+        self._slots = asyncio.Semaphore(self.workers)
+        self._executor = self._make_executor()
+        self._batcher = asyncio.create_task(self._batch_loop())
+
+    async def close(self):
+        """
+        停止接收请求，等待在途的批完成；仍在排队的请求被取消，
+        因背压挂起在 submit 中的调用方收到 ServiceClosed
+        """
+        if self._batcher is None:
+            return
+        self._closed = True
+        self._batcher.cancel()
+        try:
+            await self._batcher
+        except asyncio.CancelledError:
+            pass
+        self._batcher = None
+        await self._drain_queue()
+        if self._inflight:
+            await asyncio.gather(*self._inflight, return_exceptions=True)
+        await self._drain_queue()
+        self._executor.shutdown(wait=True)
+        self._executor = None
+
+    async def __aenter__(self) -> "PlanningService":
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    async def _drain_queue(self):
+        """
+        取消所有排队的请求。队列空出位置后，因背压挂起的 put 会陆续完成，
+        所以让出一次事件循环后再检查，直到不再有新入队的请求
+        """
+        queue = self._queue
+        while True:
+            while not queue.empty():
+                queue.get_nowait().future.cancel()
+            await asyncio.sleep(0)
+            if queue.empty():
+                return
+
+    def _make_executor(self) -> Executor:
+        if self.executor_kind == "thread":
+            return ThreadPoolExecutor(self.workers, thread_name_prefix="planner")
+        maps = {
+            name: (planner.grid_map.width, planner.grid_map.height, bytes(planner.grid_map.to_mask()))
+            for name, planner in self._planners.items()
+        }
+        self._snapshot_versions = {name: planner.grid_map.version for name, planner in self._planners.items()}
+        return ProcessPoolExecutor(self.workers, initializer=_worker_init, initargs=(maps, self.w))
+
+    def _maps_changed(self) -> bool:
+        """进程池模式：是否有地图在工作进程取得副本后经 add_obstacles / remove_obstacles 变更过"""
+        versions = self._snapshot_versions
+        return any(versions.get(name) != planner.grid_map.version for name, planner in self._planners.items())
+
+    def _restart_executor(self):
+        old, self._executor = self._executor, self._make_executor()
+        old.shutdown(wait=False)  # 已提交的批在旧进程池中照常完成
+
+    # -------------------------- 提交请求 --------------------------
+    async def submit(
+        self,
+        op: str,
+        map_name: str,
+        start: Tuple[int, int],
+        goal: Tuple[int, int],
+        timeout: Optional[float] = None,
+        **params
+    ) -> asyncio.Future:
+        """
+        提交请求并返回其 Future（结果为 PlanResponse）；队列已满时在此挂起（背压）。
+        参数不合法（含起终点超出地图）时在此直接抛出；执行中出错的请求，其 Future 以该异常结束，不影响同批的其他请求。
+        :param op: "plan"（单条路径，参数 w）或 "candidates"（候选路径，参数同 generate_candidate_paths）
+        :param timeout: 从现在起的时限（秒）
+        """
+        if self._batcher is None or self._closed:
+            raise ServiceClosed("规划服务未启动或已关闭")
+        if op not in REQUEST_PARAMS:
+            raise ValueError(f"不支持的请求类型：{op}，可选值：{tuple(REQUEST_PARAMS)}")
+        unknown = set(params) - REQUEST_PARAMS[op]
+        if unknown:
+            raise ValueError(f"{op} 请求不支持参数：{sorted(unknown)}")
+        if map_name not in self._planners:
+            raise KeyError(f"未加载的地图：{map_name}")
+        grid_map = self._planners[map_name].grid_map
+        for x, y in (start, goal):
+            if not grid_map.in_bounds(x, y):
+                raise ValueError(f"栅格 ({x},{y}) 超出地图 {map_name} 的范围 {grid_map.width}x{grid_map.height}")
+        deadline = None if timeout is None else time.monotonic() + timeout
+        future = asyncio.get_running_loop().create_future()
+        request = _Request(op, map_name, tuple(start), tuple(goal), params, deadline, future)
+        future.add_done_callback(lambda f: setattr(request, "cancelled", True))
+        if timeout is not None:
+            # 到期即以 "timeout" 答复，不必等排在前面的批或正在执行的搜索结束；迟到的结果被丢弃
+            timer = asyncio.get_running_loop().call_later(timeout, self._finish, request, ("timeout", [], None))
+            future.add_done_callback(lambda f: timer.cancel())
+        await self._queue.put(request)
+        if self._closed:
+            # 挂起期间服务被关闭：请求入队时已没有批处理协程读取队列
+            future.cancel()
+            raise ServiceClosed("规划服务已关闭")
+        return future
+
+    async def plan(
+        self,
+        map_name: str,
+        start: Tuple[int, int],
+        goal: Tuple[int, int],
+        w: Optional[float] = None,
+        timeout: Optional[float] = None
+    ) -> PlanResponse:
+        params = {} if w is None else {"w": w}
+        return await (await self.submit("plan", map_name, start, goal, timeout, **params))
+
+    async def candidates(
+        self,
+        map_name: str,
+        start: Tuple[int, int],
+        goal: Tuple[int, int],
+        timeout: Optional[float] = None,
+        **params
+    ) -> PlanResponse:
+        return await (await self.submit("candidates", map_name, start, goal, timeout, **params))
+
+    # -------------------------- 批处理与调度 --------------------------
+    async def _batch_loop(self):
+        queue = self._queue
+        while True:
+            first = await queue.get()
+            try:
+                # 先占到工作池的空位再组批：工作池忙时请求在队列中积累，空出后一次带走
+                await self._slots.acquire()
+                if self.batch_window > 0 and queue.qsize() < self.max_batch - 1:
+                    await asyncio.sleep(self.batch_window)
+            except asyncio.CancelledError:
+                first.future.cancel()
+                raise
+            batch = [first]
+            while len(batch) < self.max_batch and not queue.empty():
+                batch.append(queue.get_nowait())
+            task = asyncio.create_task(self._dispatch(batch))
+            self._inflight.add(task)
+            task.add_done_callback(self._inflight.discard)
+
+    async def _dispatch(self, batch: List[_Request]):
+        try:
+            now = time.monotonic()
+            live = []
+            for request in batch:
+                if request.future.done():
+                    continue
+                if request.deadline is not None and now >= request.deadline:
+                    self._finish(request, ("timeout", [], None))
+                else:
+                    live.append(request)
+            if not live:
+                return
+            self.batches += 1
+            self.batched_requests += len(live)
+            loop = asyncio.get_running_loop()
+            if self.executor_kind == "process" and self._maps_changed():
+                self._restart_executor()
+            items = [request.item() for request in live]
+            try:
+                if self.executor_kind == "thread":
+                    results = await loop.run_in_executor(self._executor, _run_batch, items, self._planners, live)
+                else:
+                    results = await loop.run_in_executor(self._executor, _run_batch, items)
+            except Exception as exc:
+                for request in live:
+                    if not request.future.done():
+                        request.future.set_exception(exc)
+                return
+            for request, result in zip(live, results):
+                self._finish(request, result)
+        finally:
+            self._slots.release()
+
+    @staticmethod
+    def _finish(request: _Request, result: tuple):
+        if request.future.done():
+            return
+        status, paths, expansions = result
+        if status == "cancelled":
+            request.future.cancel()
+            return
+        if status == "error":
+            request.future.set_exception(paths)
+            return
+        request.future.set_result(PlanResponse(status, paths, expansions, time.monotonic() - request.submitted))
+
+
+# -------------------------- 工作池中执行的部分 --------------------------
+_worker_planners: Dict[str, FocalSearch] = {}
+
+
+def _worker_init(maps: Dict[str, Tuple[int, int, bytes]], w: float):
+    global _worker_planners
+    _worker_planners = {
+        name: FocalSearch(GridMap.from_mask(width, height, mask), w) for name, (width, height, mask) in maps.items()
+    }
+
+
+def _run_batch(items: List[tuple], planners: Optional[Dict[str, FocalSearch]] = None, requests=None) -> List[tuple]:
+    """
+    依次执行一批请求，返回 [(status, paths, expansions), ...]。
+    线程模式下传入共享的 planners 与请求对象（用于检查取消标记）；进程模式下使用工作进程初始化时建好的规划器。
+    单个请求出错时该项为 ("error", 异常, None)，只让这一个请求失败，同批的其他请求照常执行。
+    """
+    planners = _worker_planners if planners is None else planners
+    results = []
+    for i, (op, map_name, start, goal, params, deadline) in enumerate(items):
+        if requests is not None and requests[i].cancelled:
+            results.append(("cancelled", [], None))
+            continue
+        if deadline is not None and time.monotonic() >= deadline:
+            results.append(("timeout", [], None))
+            continue
+        try:
+            planner = planners[map_name]
+            if op == "plan":
+                path, expansions = planner._search(start, goal, w=params.get("w"), deadline=deadline)
+                paths = [path] if path else []
+            else:
+                should_stop = None if requests is None else (lambda request=requests[i]: request.cancelled)
+                paths = list(planner.iter_candidate_paths(
+                    start, goal, deadline=deadline, should_stop=should_stop, **params
+                ))
+                expansions = None
+        except Exception as exc:
+            results.append(("error", exc, None))
+            continue
+        if deadline is not None and time.monotonic() >= deadline:
+            status = "timeout"
+        else:
+            status = "ok" if paths else "no_path"
+        results.append((status, paths, expansions))
+    return results
+
+
+# -------------------------- Unix 套接字接口 --------------------------
+# 协议：每行一个 JSON 对象。
+#   请求：{"id": 1, "op": "plan"|"candidates", "map": "floor1", "start": [x, y], "goal": [x, y],
+#          "timeout": 0.5, "params": {...}}；取消：{"id": 1, "op": "cancel"}
+#   响应：{"id": 1, "status": ..., "paths": [[[x, y], ...], ...], "expansions": ..., "latency": ...}；
+#          出错时 status 为 "error"，并带 "error" 字段说明原因
+async def serve_unix(service: PlanningService, path: str) -> asyncio.AbstractServer:
+    """在 Unix 套接字 path 上提供 service；每个连接上的请求并发处理，响应按完成顺序写回"""
+
+    async def handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        pending: Dict[object, asyncio.Task] = {}
+        write_lock = asyncio.Lock()
+
+        async def send(message: dict):
+            async with write_lock:
+                writer.write(json.dumps(message).encode() + b"\n")
+                await writer.drain()
+
+        async def respond(request_id, future: asyncio.Future):
+            try:
+                response = await future
+                message = {"id": request_id, **response._asdict()}
+            except asyncio.CancelledError:
+                message = {"id": request_id, "status": "cancelled"}
+            except Exception as exc:
+                message = {"id": request_id, "status": "error", "error": str(exc)}
+            finally:
+                pending.pop(request_id, None)
+            await send(message)
+
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                request_id = None
+                try:
+                    message = json.loads(line)
+                    request_id = message.get("id")
+                    if message.get("op") == "cancel":
+                        task = pending.get(request_id)
+                        if task is not None:
+                            task.cancel()
+                        continue
+                    # submit 在队列满时挂起，此时不再读取该连接，背压经套接字传递给客户端
+                    future = await service.submit(
+                        message["op"], message["map"], message["start"], message["goal"],
+                        message.get("timeout"), **message.get("params", {})
+                    )
+                except (ValueError, KeyError, TypeError, ServiceClosed) as exc:
+                    await send({"id": request_id, "status": "error", "error": str(exc)})
+                    continue
+                pending[request_id] = asyncio.create_task(respond(request_id, future))
+        except asyncio.CancelledError:
+            # 事件循环关闭时仍在等待读取的连接处理协程会被取消：正常收尾，不把取消作为错误抛给 asyncio 的流回调
+            pass
+        finally:
+            tasks = list(pending.values())
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except (ConnectionError, asyncio.CancelledError):
+                pass
+
+    return await asyncio.start_unix_server(handle, path)
+
+
+class PlanningClient:
+    """serve_unix 的客户端：同一连接上可并发发出多个请求"""
+
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self._reader = reader
+        self._writer = writer
+        self._ids = itertools.count()
+        self._waiters: Dict[int, asyncio.Future] = {}
+        self._receiver = asyncio.create_task(self._receive_loop())
+
+    @staticmethod
+    async def connect(path: str) -> "PlanningClient":
+        reader, writer = await asyncio.open_unix_connection(path)
+        return PlanningClient(reader, writer)
+
+    async def close(self):
+        self._writer.close()
+        await self._writer.wait_closed()
+        self._receiver.cancel()
+        try:
+            await self._receiver
+        except asyncio.CancelledError:
+            pass
+
+    async def request(
+        self,
+        op: str,
+        map_name: str,
+        start: Tuple[int, int],
+        goal: Tuple[int, int],
+        timeout: Optional[float] = None,
+        **params
+    ) -> PlanResponse:
+        """发出请求并等待响应；等待中被取消时通知服务端取消该请求"""
+        request_id = next(self._ids)
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters[request_id] = waiter
+        message = {"id": request_id, "op": op, "map": map_name, "start": start, "goal": goal, "params": params}
+        if timeout is not None:
+            message["timeout"] = timeout
+        self._writer.write(json.dumps(message).encode() + b"\n")
+        await self._writer.drain()
+        try:
+            return await waiter
+        except asyncio.CancelledError:
+            self._writer.write(json.dumps({"id": request_id, "op": "cancel"}).encode() + b"\n")
+            raise
+        finally:
+            self._waiters.pop(request_id, None)
+
+    async def plan(self, map_name, start, goal, w: Optional[float] = None, timeout: Optional[float] = None):
+        params = {} if w is None else {"w": w}
+        return await self.request("plan", map_name, start, goal, timeout, **params)
+
+    async def candidates(self, map_name, start, goal, timeout: Optional[float] = None, **params):
+        return await self.request("candidates", map_name, start, goal, timeout, **params)
+
+    async def _receive_loop(self):
+        try:
+            while True:
+                line = await self._reader.readline()
+                if not line:
+                    break
+                message = json.loads(line)
+                waiter = self._waiters.get(message.get("id"))
+                if waiter is None or waiter.done():
+                    continue
+                status = message["status"]
+                if status == "error":
+                    waiter.set_exception(RuntimeError(message["error"]))
+                elif status == "cancelled":
+                    waiter.cancel()
+                else:
+                    paths = [[tuple(cell) for cell in path] for path in message["paths"]]
+                    waiter.set_result(PlanResponse(status, paths, message["expansions"], message["latency"]))
+        finally:
+            for waiter in self._waiters.values():
+                if not waiter.done():
+                    waiter.set_exception(ConnectionError("与规划服务的连接已断开"))
@@ -1,5 +1,9 @@
 import matplotlib.pyplot as plt
 import colorsys
+import numpy as np
+from matplotlib.collections import LineCollection
+from matplotlib.figure import Figure
+from matplotlib.lines import Line2D
 from env import Node, GridMap
 from typing import List, Tuple, Optional, Union
 
@@ -16,7 +20,7 @@ def print_grid_map(grid_map: GridMap, start: Tuple[int, int], goal: Tuple[int, i
                 row.append("S")
             elif (x, y) == goal:
                 row.append("G")
-            elif not grid_map.grid[y][x]:
+            elif not grid_map.is_valid(x, y):
                 row.append("1")
             else:
                 row.append("0")
@@ -32,15 +36,33 @@ def visualize_grid_and_paths(
     save_path: Optional[str] = None,
     colormap: str = 'tab10',
     figsize: Tuple[float, float] = (20, 20),  # 增大画布尺寸（默认12×8英寸）
-    dpi: int = 600  # 保持高清分辨率，可根据需求调至400/600
+    dpi: int = 600,  # 保持高清分辨率，可根据需求调至400/600
+    mode: str = "scatter",
+    show: bool = True
 ):
+    """
+    :param mode: "scatter"：逐格散点绘制（原方式，适合几十格的小图）；
+        "raster"：整张占用栅格画成一幅图像、全部路径画成一个 LineCollection（见 render_grid_and_paths），大图上快几个数量级
+    :param show: 是否调用 plt.show()；批量出图时设为 False
+    """
+    if mode == "raster":
+        fig = plt.figure(figsize=figsize) if show else Figure(figsize=figsize)
+        _draw_raster(fig.add_subplot(), grid_map, start, goal, candidate_paths)
+        if save_path:
+            fig.savefig(save_path, dpi=dpi, bbox_inches='tight', facecolor='white')
+        if show:
+            plt.show()
+        return
+    if mode != "scatter":
+        raise ValueError(f"不支持的 mode：{mode}，可选值：'scatter'/'raster'")
+
     # 1. 创建更大的画布
     plt.figure(figsize=figsize)  # 关键：用传入的figsize（默认12×8）
 
     # 2. 绘制栅格（保持原逻辑，栅格大小可适当调大）
     for y in range(grid_map.height):
         for x in range(grid_map.width):
-            if not grid_map.grid[y][x]:
+            if not grid_map.is_valid(x, y):
                 # 障碍物：黑色方块，s=200（原s=100，调大更清晰）
                 plt.scatter(x, y, c='black', s=200, marker='s', edgecolors='gray')
             else:
@@ -81,4 +103,138 @@ def visualize_grid_and_paths(
             facecolor='white'  # 背景设为白色，避免透明背景
         )
 
-    plt.show()
\ No newline at end of file
+    if show:
+        plt.show()
+
+
+def _path_colors(num_paths: int) -> List[Tuple[float, float, float]]:
+    """与逐格绘制相同的配色：HSV 色相均匀分布，饱和度和亮度固定"""
+    return [colorsys.hsv_to_rgb(i / num_paths, 0.8, 0.9) for i in range(num_paths)]
+
+
+def occupancy_image(grid_map: GridMap, max_cells: Optional[int] = None) -> Tuple[np.ndarray, int]:
+    """
+    地图占用栅格转为灰度图像数组（1=障碍物），返回 (图像, 降采样倍数)。
+    max_cells 限制图像每边的像素数：超出时按 k×k 块取障碍物占比（块内越密越黑），k 为降采样倍数。
+    """
+    width, height = grid_map.width, grid_map.height
+    image = np.frombuffer(grid_map.to_mask(), dtype=np.uint8).reshape(height, width)
+    k = 1 if not max_cells else max(1, -(-max(width, height) // max_cells))
+    if k == 1:
+        return image.astype(np.float32), 1
+    # 右、下边缘补成 k 的整数倍（补的格按可行处理），再按块求均值
+    padded = np.zeros((-(-height // k) * k, -(-width // k) * k), dtype=np.float32)
+    padded[:height, :width] = image
+    blocks = padded.reshape(padded.shape[0] // k, k, padded.shape[1] // k, k)
+    return blocks.mean(axis=(1, 3)), k
+
+
+def render_grid_and_paths(
+    grid_map: GridMap,
+    start: Tuple[int, int],
+    goal: Tuple[int, int],
+    candidate_paths: List[List[Tuple[int, int]]],
+    figsize: Tuple[float, float] = (10, 10),
+    dpi: int = 150,
+    max_cells: Optional[int] = 2048,
+    linewidth: float = 1.5,
+    legend: bool = True
+) -> Figure:
+    """
+    光栅化绘制：占用栅格是一次 imshow 的图像（按 max_cells 降采样），全部路径是一个 LineCollection，
+    起终点各一个标记。坐标仍以栅格为单位，与逐格绘制一致（y 轴向上）。
+    不经过 pyplot，返回独立的 Figure，可在无显示环境中批量 fig.savefig(...)；用完后不需要 plt.close。
+    """
+    fig = Figure(figsize=figsize, dpi=dpi)
+    _draw_raster(fig.add_subplot(), grid_map, start, goal, candidate_paths, max_cells, linewidth, legend)
+    return fig
+
+
+def _draw_raster(
+    ax,
+    grid_map: GridMap,
+    start: Tuple[int, int],
+    goal: Tuple[int, int],
+    candidate_paths: List[List[Tuple[int, int]]],
+    max_cells: Optional[int] = 2048,
+    linewidth: float = 1.5,
+    legend: bool = True
+):
+    """在给定坐标轴上做光栅化绘制（render_grid_and_paths 与 visualize_grid_and_paths(mode="raster") 共用）"""
+    image, _ = occupancy_image(grid_map, max_cells)
+    width, height = grid_map.width, grid_map.height
+    # 降采样后的图像仍铺满整张地图的坐标范围
+    ax.imshow(
+        image, cmap='gray_r', vmin=0.0, vmax=1.0, origin='lower', interpolation='nearest',
+        extent=(-0.5, width - 0.5, -0.5, height - 0.5)
+    )
+    colors = _path_colors(len(candidate_paths))
+    segments = [np.asarray(path, dtype=np.float32) for path in candidate_paths if path]
+    if segments:
+        lines = LineCollection(segments, colors=colors, linewidths=linewidth, alpha=0.85)
+        ax.add_collection(lines)
+    ax.scatter([start[0]], [start[1]], c='red', s=80, marker='*', label='Start', edgecolors='darkred', zorder=3)
+    ax.scatter([goal[0]], [goal[1]], c='green', s=80, marker='P', label='Goal', edgecolors='darkgreen', zorder=3)
+    ax.set_xlim(-0.5, width - 0.5)
+    ax.set_ylim(-0.5, height - 0.5)
+    if legend:
+        # 路径较多时图例只列前 10 条
+        handles = [Line2D([], [], color=color, linewidth=linewidth) for color in colors[:10]]
+        labels = [f'Path {i + 1}' for i in range(len(handles))]
+        starts_goals, names = ax.get_legend_handles_labels()
+        ax.legend(starts_goals + handles, names + labels, loc='upper right', fontsize=8)
+    ax.set_title('Focal Search Candidate Paths')
+
+
+def render_tiles(
+    grid_map: GridMap,
+    start: Tuple[int, int],
+    goal: Tuple[int, int],
+    candidate_paths: List[List[Tuple[int, int]]],
+    save_pattern: str,
+    tile_size: int = 512,
+    figsize: Tuple[float, float] = (10, 10),
+    dpi: int = 150,
+    only_paths: bool = True
+) -> List[str]:
+    """
+    超大地图分块出图：按 tile_size×tile_size 格切块，每块不降采样地渲染并保存为
+    save_pattern.format(tx=块列号, ty=块行号)（如 "out/tile_{ty}_{tx}.png"）。
+    所有块共用一个 Figure，逐块换图像数据与视窗；only_paths=True 时跳过没有路径经过、也不含起终点的块。
+    返回写出的文件名。
+    """
+    width, height = grid_map.width, grid_map.height
+    mask = np.frombuffer(grid_map.to_mask(), dtype=np.uint8).reshape(height, width)
+    wanted = None
+    if only_paths:
+        wanted = {(x // tile_size, y // tile_size) for path in candidate_paths for x, y in path}
+        wanted |= {(start[0] // tile_size, start[1] // tile_size), (goal[0] // tile_size, goal[1] // tile_size)}
+
+    fig = Figure(figsize=figsize, dpi=dpi)
+    ax = fig.add_subplot()
+    image = ax.imshow(
+        mask[:1, :1], cmap='gray_r', vmin=0, vmax=1, origin='lower', interpolation='nearest'
+    )
+    colors = _path_colors(len(candidate_paths))
+    segments = [np.asarray(path, dtype=np.float32) for path in candidate_paths if path]
+    if segments:
+        ax.add_collection(LineCollection(segments, colors=colors, linewidths=1.5, alpha=0.85))
+    ax.scatter([start[0]], [start[1]], c='red', s=80, marker='*', edgecolors='darkred', zorder=3)
+    ax.scatter([goal[0]], [goal[1]], c='green', s=80, marker='P', edgecolors='darkgreen', zorder=3)
+
+    written = []
+    for ty in range(-(-height // tile_size)):
+        for tx in range(-(-width // tile_size)):
+            if wanted is not None and (tx, ty) not in wanted:
+                continue
+            x0, y0 = tx * tile_size, ty * tile_size
+            x1, y1 = min(x0 + tile_size, width), min(y0 + tile_size, height)
+            image.set_data(mask[y0:y1, x0:x1])
+            image.set_extent((x0 - 0.5, x1 - 0.5, y0 - 0.5, y1 - 0.5))
+            ax.set_xlim(x0 - 0.5, x1 - 0.5)
+            ax.set_ylim(y0 - 0.5, y1 - 0.5)
+            ax.set_title(f'tile ({tx}, {ty}): x {x0}-{x1 - 1}, y {y0}-{y1 - 1}')
+            path = save_pattern.format(tx=tx, ty=ty)
+            fig.savefig(path, facecolor='white')
+            written.append(path)
+    return written
\ No newline at end of file
@@ -0,0 +1,111 @@
+from typing import List, Optional, Set, Tuple
+
+from env import GridMap
+from focal_search import FocalSearch
+
+
+class IncrementalReplanner:
+    """
+    障碍物变化后的增量重规划：修补上一次的候选路径集合，而不是从头重新生成。
+
+    plan() 做一次完整规划并记下地图版本；之后地图经 add_obstacles / remove_obstacles 变化，
+    replan() 通过 GridMap.changes_since 取得净变更：
+      - 只移除障碍物时，原有路径仍然可行，直接沿用；
+      - 新增障碍物只影响压到它们的路径：对每段被挡住的连续路段，从其前一格到后一格做一次
+        局部 focal 搜索（屏蔽路径的其余部分以免成环），把绕行段拼回原路径；
+        局部搜索失败时逐步放宽修补窗口，仍失败则丢弃该候选；
+      - 所有候选都无法修补时，退回完整规划。
+    局部搜索只覆盖障碍物附近的一小块区域，小改动下的重规划耗时远低于完整规划。
+    """
+
+    def __init__(self, planner: FocalSearch, repair_budget: int = 5000, repair_margins: Tuple[int, ...] = (0, 4, 16)):
+        """
+        :param planner: 所用规划器（其 grid_map 即被监视变化的地图）
+        :param repair_budget: 单次局部修补搜索的扩展上限
+        :param repair_margins: 依次尝试的修补窗口外扩格数（在被挡路段两端各外扩这么多格）
+        """
+        self.planner = planner
+        self.grid_map: GridMap = planner.grid_map
+        self.repair_budget = repair_budget
+        self.repair_margins = repair_margins
+        self.start: Optional[Tuple[int, int]] = None
+        self.goal: Optional[Tuple[int, int]] = None
+        self.paths: List[List[Tuple[int, int]]] = []
+        self.last_replan_full = False  # 最近一次 replan 是否退回了完整规划
+        self._version: Optional[int] = None
+        self._candidate_kwargs: dict = {}
+
+    def plan(self, start: Tuple[int, int], goal: Tuple[int, int], **candidate_kwargs) -> List[List[Tuple[int, int]]]:
+        """完整规划：参数同 FocalSearch.generate_candidate_paths，结果与地图版本被记下供 replan 使用"""
+        self.start, self.goal = start, goal
+        self._candidate_kwargs = candidate_kwargs
+        self._version = self.grid_map.version
+        self.paths = self.planner.generate_candidate_paths(start, goal, **candidate_kwargs)
+        return self.paths
+
+    def replan(self) -> List[List[Tuple[int, int]]]:
+        """根据上次规划以来的地图变更修补候选路径集合"""
+        if self._version is None:
+            raise RuntimeError("请先调用 plan() 完成一次完整规划")
+        if self._version < self.grid_map.oldest_version:
+            # 所需的变更日志已被 GridMap.trim_changes 丢弃，无法得知哪些路径受影响
+            self.last_replan_full = True
+            return self.plan(self.start, self.goal, **self._candidate_kwargs)
+        changes = self.grid_map.changes_since(self._version)
+        self._version = changes.version
+        self.last_replan_full = False
+        if not changes.added and self.paths:
+            return self.paths
+
+        added = set(changes.added)
+        repaired: List[List[Tuple[int, int]]] = []
+        seen: Set[Tuple[Tuple[int, int], ...]] = set()
+        for path in self.paths:
+            if added.isdisjoint(path):
+                new_path = path
+            else:
+                new_path = self._repair(path, added)
+            if new_path is not None and tuple(new_path) not in seen:
+                seen.add(tuple(new_path))
+                repaired.append(new_path)
+
+        if not repaired:
+            self.last_replan_full = True
+            return self.plan(self.start, self.goal, **self._candidate_kwargs)
+        self.paths = repaired
+        return repaired
+
+    def _repair(
+        self, path: List[Tuple[int, int]], added: Set[Tuple[int, int]]
+    ) -> Optional[List[Tuple[int, int]]]:
+        """
+        逐段修补：每次取最靠前的一段连续被挡路段，在其两端之间局部搜索绕行段并拼接，
+        直到路径不再穿过新增障碍物。起点或终点本身被占时无法修补。
+        """
+        while True:
+            hit = [i for i, cell in enumerate(path) if cell in added]
+            if not hit:
+                return path
+            first = last = hit[0]
+            while last + 1 < len(path) and path[last + 1] in added:
+                last += 1
+            if first == 0 or last == len(path) - 1:
+                return None
+            path = self._repair_segment(path, first, last)
+            if path is None:
+                return None
+
+    def _repair_segment(self, path: List[Tuple[int, int]], first: int, last: int) -> Optional[List[Tuple[int, int]]]:
+        """替换 path[first..last]：从 path[first-1] 搜到 path[last+1]，失败时按 repair_margins 放宽窗口"""
+        for margin in self.repair_margins:
+            a = max(first - 1 - margin, 0)
+            b = min(last + 1 + margin, len(path) - 1)
+            avoid = path[:a] + path[b + 1:]
+            detour, _ = self.planner._search(
+                path[a], path[b], max_expansions=self.repair_budget, start_g=float(a), blocked=avoid
+            )
+            if detour is not None:
+                return path[:a] + detour + path[b + 1:]
+            if a == 0 and b == len(path) - 1:
+                break
+        return None
@@ -0,0 +1,86 @@
+import random
+from collections import deque
+from typing import Iterator, NamedTuple, Optional, Sequence, Tuple
+
+from env import GridMap
+from obsracle_generate import ObstacleGenerator
+
+
+class Scenario(NamedTuple):
+    """一个可复现的测试场景：地图 + 起终点，由 (布局, 尺寸, 密度, 种子) 唯一确定"""
+    name: str
+    layout: str  # "uniform"（按密度随机）或 "clustered"（聚类）
+    size: int
+    density: float
+    seed: int
+    grid_map: GridMap
+    start: Tuple[int, int]
+    goal: Tuple[int, int]
+
+
+def shortest_path_length(grid_map: GridMap, start: Tuple[int, int], goal: Tuple[int, int]) -> Optional[int]:
+    """四连通单位代价下的最短路径长度（BFS）；不可达时返回 None"""
+    masks, deltas = grid_map.adjacency()
+    start_index, goal_index = grid_map.index(*start), grid_map.index(*goal)
+    dist = {start_index: 0}
+    queue = deque([start_index])
+    while queue:
+        current = queue.popleft()
+        if current == goal_index:
+            return dist[current]
+        for delta in deltas[masks[current]]:
+            neighbor = current + delta
+            if neighbor not in dist:
+                dist[neighbor] = dist[current] + 1
+                queue.append(neighbor)
+    return None
+
+
+def make_scenario(
+    size: int,
+    density: float,
+    layout: str = "uniform",
+    seed: int = 0,
+    cluster_radius: int = 2,
+    max_attempts: int = 20
+) -> Scenario:
+    """
+    生成一个起终点连通的场景：起终点在地图两端附近随机选取，障碍物用 ObstacleGenerator 的掩码接口生成；
+    不连通时换下一个子种子重试。同一组参数总是得到同一个场景。
+    """
+    if layout not in ("uniform", "clustered"):
+        raise ValueError(f"不支持的 layout：{layout}，可选值：'uniform'/'clustered'")
+    for attempt in range(max_attempts):
+        rng = random.Random(seed * 1000003 + attempt)
+        margin = max(size // 8, 1)
+        start = (rng.randrange(margin), rng.randrange(size))
+        goal = (size - 1 - rng.randrange(margin), rng.randrange(size))
+        generator = ObstacleGenerator(size, size, start, goal)
+        sub_seed = rng.getrandbits(32)
+        if layout == "uniform":
+            grid_map = GridMap.from_obstacle_generator(generator, "density", float(density), seed=sub_seed, vectorized=True)
+        else:
+            count = int(generator.max_obstacle_count * density)
+            cluster_num = max(count // (2 * cluster_radius + 1) ** 2, 1)
+            grid_map = GridMap.from_obstacle_generator(
+                generator, "clustered", count, seed=sub_seed, vectorized=True,
+                cluster_num=cluster_num, cluster_radius=cluster_radius
+            )
+        if shortest_path_length(grid_map, start, goal) is not None:
+            name = f"{layout}-{size}-d{density:g}-s{seed}"
+            return Scenario(name, layout, size, density, seed, grid_map, start, goal)
+    raise RuntimeError(f"{max_attempts} 次尝试都未生成连通场景：size={size}, density={density}, layout={layout}")
+
+
+def generate_scenarios(
+    sizes: Sequence[int],
+    densities: Sequence[float],
+    layouts: Sequence[str] = ("uniform", "clustered"),
+    seeds: Sequence[int] = (0,)
+) -> Iterator[Scenario]:
+    """按 布局 × 尺寸 × 密度 × 种子 的笛卡尔积批量生成场景"""
+    for layout in layouts:
+        for size in sizes:
+            for density in densities:
+                for seed in seeds:
+                    yield make_scenario(size, density, layout, seed)
@@ -0,0 +1,139 @@
+from array import array
+from typing import List, Optional
+
+from indexed_heap import IndexedHeap
+
+INF = float('inf')
+
+
+class SearchState:
+    """
+    紧凑的搜索状态存储：用扁平预分配数组代替每个栅格一个 Node 对象 + node_map 字典。
+
+    栅格 (x, y) 的下标为 y*width+x。g/h/f/focal_value 存在 array('d') 中，父节点下标存在
+    array('i') 中（-1 表示无父节点），visited 存在 bytearray 中。g == INF 表示本次搜索尚未
+    生成该节点（相当于不在 node_map 中）。
+
+    搜索之间通过 reset() 复用：只恢复本次搜索触碰过的下标，代价 O(touched) 而非 O(width*height)。
+    """
+
+    def __init__(self, width: int, height: int):
+        self.width = width
+        self.height = height
+        size = width * height
+        self.g = array('d', [INF]) * size
+        self.h = array('d', [0.0]) * size
+        self.f = array('d', [0.0]) * size
+        self.focal_value = array('d', [0.0]) * size
+        self.parent = array('i', [-1]) * size
+        self.visited = bytearray(size)
+        self.touched: List[int] = []  # 本次搜索生成过的下标
+
+    def fits(self, width: int, height: int) -> bool:
+        return self.width == width and self.height == height
+
+    def reset(self):
+        """只清理触碰过的下标；h/f/focal_value 在生成节点时总会被重写，无需清理"""
+        g, parent, visited = self.g, self.parent, self.visited
+        for i in self.touched:
+            g[i] = INF
+            parent[i] = -1
+            visited[i] = 0
+        self.touched.clear()
+
+    def is_generated(self, index: int) -> bool:
+        return self.g[index] != INF
+
+    def generate(self, index: int, g: float):
+        """首次生成节点：登记到 touched 并写入 g"""
+        self.g[index] = g
+        self.touched.append(index)
+
+    def backtrack(self, index: int) -> List[int]:
+        """沿 parent 回溯，返回从起点到 index 的下标序列"""
+        indices = []
+        parent = self.parent
+        while index != -1:
+            indices.append(index)
+            index = parent[index]
+        return indices[::-1]
+
+
+class SearchContext:
+    """
+    单次搜索的全部可变状态：节点数组（SearchState）+ OPEN/FOCAL 队列 + f_min/界限。
+
+    规划器（FocalSearch）本身不再保存任何搜索中间状态，每次调用各持有一个 SearchContext，
+    因此同一规划器可以被多个线程同时调用。上下文可在调用结束后归还、供下一次搜索复用。
+
+    平局裁决：OPEN 与 waiting 按 (f, -g, 入堆序号)；FOCAL 按 (focal_value, f, -g, 入堆序号)。
+    FOCAL 只在 f_min 或界限变化时增删成员，每次扩展的代价为 O(log n)。
+    """
+
+    def __init__(self, width: int, height: int, state=None):
+        """state 缺省为 width*height 的 SearchState；也可以传入接口相同的其他节点存储（如时空搜索用的字典存储）"""
+        self.state = SearchState(width, height) if state is None else state
+        self.open = IndexedHeap()  # OPEN：全部待扩展节点（栅格下标），按 (f, -g) 排序
+        self.focal = IndexedHeap()  # FOCAL：OPEN 中 f <= (1+w)*f_min 的节点，按 focal_value 排序
+        self.waiting = IndexedHeap()  # OPEN 中暂不在 FOCAL 内（f 超出界限）的节点，按 f 排序
+        self.f_min = INF
+        self.bound = INF  # 当前 FOCAL 界限 (1+w)*f_min
+        self.seq = 0  # 入堆序号：键完全相同时按入堆先后裁决，保证结果确定
+
+    def fits(self, width: int, height: int) -> bool:
+        return self.state.fits(width, height)
+
+    def reset(self):
+        self.state.reset()
+        self.open.clear()
+        self.focal.clear()
+        self.waiting.clear()
+        self.f_min = INF
+        self.bound = INF
+        self.seq = 0
+
+    def push_open(self, index: int):
+        """节点进入 OPEN，并按当前界限放入 FOCAL 或 waiting"""
+        state = self.state
+        f, g = state.f[index], state.g[index]
+        self.seq += 1
+        self.open.push(index, (f, -g, self.seq))
+        if f <= self.bound:
+            self.focal.push(index, (state.focal_value[index], f, -g, self.seq))
+        else:
+            self.waiting.push(index, (f, -g, self.seq))
+
+    def remove_open(self, index: int):
+        """节点离开 OPEN（即将以新代价重新入堆）"""
+        self.open.remove(index)
+        if self.focal.remove(index) is None:
+            self.waiting.remove(index)
+
+    def update_focal(self, w: float):
+        """更新 Focal 集合：f_min 上升使界限放宽时，把 waiting 中进入界限的节点移入 FOCAL"""
+        if not self.open:
+            return
+        self.f_min = self.open.peek_key()[0]
+        bound = (w + 1) * self.f_min
+        if bound > self.bound:
+            focal_value = self.state.focal_value
+            while self.waiting and self.waiting.peek_key()[0] <= bound:
+                index = self.waiting.pop()
+                self.focal.push(index, (focal_value[index],) + self.open.key(index))
+        self.bound = bound
+
+    def pop_focal(self) -> Optional[int]:
+        """
+        弹出 FOCAL 中 focal_value 最小且满足界限的节点，并将其移出 OPEN。
+        f_min 下降导致界限收紧时，超出界限的成员在这里被惰性移回 waiting。
+        """
+        while self.focal:
+            index = self.focal.peek()
+            open_key = self.open.key(index)
+            if open_key[0] <= self.bound:
+                self.focal.pop()
+                self.open.remove(index)
+                return index
+            self.focal.pop()
+            self.waiting.push(index, open_key)
+        return None
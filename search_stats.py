@@ -0,0 +1,61 @@
+from typing import Dict, List, NamedTuple, Optional
+
+
+class TryStats(NamedTuple):
+    """generate_candidate_paths / iter_candidate_paths 中单次随机化尝试的统计"""
+    index: int  # 第几次尝试（从 0 开始）
+    w: float
+    dir_weight: float
+    branched: bool  # 是否为增量模式下的前缀分叉尝试
+    expansions: int
+    path_length: Optional[int]  # 找到的路径长度（步数）；未找到为 None
+    outcome: str  # "new"：新候选；"duplicate"：与已有候选重复；"near_duplicate"：与已有候选重叠率超过阈值；
+    #               "rejected"：超出代价界限；"failed"：未找到路径
+    elapsed: float  # 耗时（秒），进程池模式下为等待该结果的时间
+
+
+class SearchStats:
+    """
+    FocalSearch 的可选统计：把实例挂到 FocalSearch.stats 上即开始累计，置为 None 即关闭。
+    关闭时搜索热循环只多一次布尔判断；开启后额外记录 OPEN/FOCAL 规模峰值与分阶段耗时（每次扩展两次计时）。
+    进程池模式（workers > 1）下只记录每次尝试的 TryStats，各工作进程内部的搜索计数不回传。
+    """
+
+    def __init__(self):
+        self.searches = 0  # 搜索次数
+        self.solved = 0  # 找到路径的搜索次数
+        self.expansions = 0  # 扩展（出 FOCAL）的节点数
+        self.generated = 0  # 生成的节点数（首次进入 OPEN）
+        self.reopenings = 0  # 已在 OPEN 中的节点因找到更短路径而更新的次数
+        self.open_high_water = 0  # 单次搜索中 OPEN 规模的最大值
+        self.focal_high_water = 0  # 单次搜索中 FOCAL 规模的最大值
+        self.focal_time = 0.0  # 维护 OPEN/FOCAL（update_focal + pop_focal）的累计耗时（秒）
+        self.expand_time = 0.0  # 邻居展开的累计耗时（秒）
+        self.tries: List[TryStats] = []
+
+    def merge_search(
+        self,
+        solved: bool,
+        expansions: int,
+        generated: int,
+        reopenings: int,
+        open_high_water: int,
+        focal_high_water: int,
+        focal_time: float,
+        expand_time: float
+    ):
+        self.searches += 1
+        self.solved += solved
+        self.expansions += expansions
+        self.generated += generated
+        self.reopenings += reopenings
+        self.open_high_water = max(self.open_high_water, open_high_water)
+        self.focal_high_water = max(self.focal_high_water, focal_high_water)
+        self.focal_time += focal_time
+        self.expand_time += expand_time
+
+    def as_dict(self) -> Dict:
+        """导出为可 JSON 序列化的字典"""
+        data = {k: v for k, v in vars(self).items() if k != "tries"}
+        data["tries"] = [t._asdict() for t in self.tries]
+        return data